@@ -0,0 +1,123 @@
+"""
+Runtime configuration for the prediction API.
+Values are read from environment variables once at import time.
+"""
+import os
+
+
+def _env_str(name: str, default: str) -> str:
+    value = os.getenv(name)
+    return value.strip() if value is not None and value.strip() else default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class Settings:
+    """
+    Settings for model serving
+    """
+    
+    def __init__(self):
+        # Trained pipeline to serve (empty = backend/models/cricket_model.pkl)
+        self.model_path = _env_str("MODEL_PATH", "") or None
+        
+        # Versioned model registry (app/ml/model_registry.py); when set, its
+        # active version is served instead of MODEL_PATH
+        self.model_registry_dir = _env_str("MODEL_REGISTRY_DIR", "") or None
+        # Seconds between checks of the registry manifest for a new active version (0 disables)
+        self.model_watch_interval = _env_float("MODEL_WATCH_INTERVAL", 10.0)
+        # Token required in the X-Admin-Token header by /api/models endpoints (empty disables them)
+        self.admin_token = _env_str("ADMIN_TOKEN", "")
+        
+        # Memory-map model arrays and the compiled forest sidecar file so
+        # worker processes share one physical copy (the sidecar is only used
+        # with INFERENCE_ENGINE=compiled; sklearn copies its trees on load)
+        self.model_mmap = _env_bool("MODEL_MMAP", False)
+        # Load the model at import time, before a pre-forking server
+        # (gunicorn --preload, see gunicorn.conf.py) starts its workers
+        self.preload_model = _env_bool("PRELOAD_MODEL", False)
+        
+        # Inference backend for the forest: "sklearn" runs the fitted Pipeline,
+        # "compiled" evaluates the flattened array-backed forest (app/ml/forest_engine.py)
+        self.inference_engine = _env_str("INFERENCE_ENGINE", "sklearn").lower()
+        # Encode requests with the precomputed FeatureEncoder instead of
+        # building a DataFrame and running the ColumnTransformer per call
+        self.fast_encoder = _env_bool("FAST_ENCODER", True)
+        
+        # Explanation backend: "shap" (TreeExplainer), "tree-path" (built-in
+        # Saabas attribution) or "auto" (shap when installed, else tree-path)
+        self.explainer = _env_str("EXPLAINER", "auto").lower()
+        
+        # Map team/venue aliases and case or punctuation variants ("IND", "lord's",
+        # "Eden Gardens, Kolkata") to the model's category names before encoding
+        self.resolve_names = _env_bool("RESOLVE_NAMES", True)
+        # JSON alias table {"teams": {alias: name}, "venues": {...}} (empty = backend/name_aliases.json)
+        self.name_aliases_path = _env_str("NAME_ALIASES", "") or None
+        # Cache-Control max-age in seconds for /api/metadata
+        self.metadata_max_age = _env_int("METADATA_MAX_AGE", 300)
+        
+        # Directory of precomputed win-probability tables (build_lookup_tables.py);
+        # probability-only requests on a configured key skip the model (empty disables)
+        self.lookup_tables_dir = _env_str("LOOKUP_TABLES_DIR", "") or None
+        
+        # Where predictor calls run: "thread" or "process" pool, or "inline" on the event loop
+        self.inference_executor = _env_str("INFERENCE_EXECUTOR", "thread").lower()
+        # Pool size (0 = one worker per CPU core)
+        self.inference_workers = _env_int("INFERENCE_WORKERS", 0)
+        # Maximum calls pending or running before requests are rejected (0 = 32 per worker)
+        self.inference_max_queue = _env_int("INFERENCE_MAX_QUEUE", 0)
+        # Per-call timeout in seconds (0 disables the timeout)
+        self.inference_timeout = _env_float("INFERENCE_TIMEOUT", 10.0)
+        # Sampling interval for the event-loop lag monitor in seconds
+        self.loop_lag_interval = _env_float("LOOP_LAG_INTERVAL", 0.05)
+        
+        # Micro-batching of concurrent /api/predict calls (opt-in)
+        self.micro_batching = _env_bool("MICRO_BATCHING", False)
+        self.micro_batch_window_ms = _env_float("MICRO_BATCH_WINDOW_MS", 2.0)
+        self.micro_batch_max_size = _env_int("MICRO_BATCH_MAX_SIZE", 64)
+        
+        # Response cache for repeated identical /api/predict requests
+        self.prediction_cache = _env_bool("PREDICTION_CACHE", True)
+        self.prediction_cache_size = _env_int("PREDICTION_CACHE_SIZE", 10000)
+        self.prediction_cache_ttl = _env_float("PREDICTION_CACHE_TTL", 30.0)
+        
+        # Server-Timing header with stage durations on every response
+        self.server_timing = _env_bool("SERVER_TIMING", True)
+        # Request profiling: the predictor call of a request is profiled when it sends
+        # "X-Profile: 1" (or ?profile=1) with a valid X-Admin-Token, or at random with
+        # this probability
+        self.profile_sample_rate = _env_float("PROFILE_SAMPLE_RATE", 0.0)
+        # Profiles kept in memory for /api/profiles, and an optional directory
+        # where each is also written as a .prof file (pstats / snakeviz)
+        self.profile_keep = _env_int("PROFILE_KEEP", 20)
+        self.profile_dir = _env_str("PROFILE_DIR", "") or None
+        
+        # Live ball-by-ball sessions (/api/live WebSocket) per process, and
+        # seconds without a message before an idle session is closed
+        self.live_max_sessions = _env_int("LIVE_MAX_SESSIONS", 5000)
+        self.live_idle_timeout = _env_float("LIVE_IDLE_TIMEOUT", 900.0)
+        
+        # Synthetic warm-up rounds run at startup before readiness is reported
+        self.warmup_rounds = _env_int("WARMUP_ROUNDS", 3)
+
+
+settings = Settings()
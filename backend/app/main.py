@@ -1,8 +1,31 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from app.config import settings
+from app import metrics
 from app.routers import prediction
+from app.services.inference_executor import loop_lag_monitor
 
-app = FastAPI(title="Win Wise Cricket Insight API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Track event-loop blocking so the effect of the inference executor is measurable
+    loop_lag_monitor.start()
+    # Load and warm up the model in the background; /api/health reports
+    # not-ready until it finishes while /health stays live
+    startup_task = asyncio.create_task(prediction.startup())
+    yield
+    if not startup_task.done():
+        startup_task.cancel()
+    await loop_lag_monitor.stop()
+    prediction.shutdown()
+
+app = FastAPI(title="Win Wise Cricket Insight API", lifespan=lifespan)
+
+if settings.preload_model:
+    # Runs in the parent process when the server imports the app before forking
+    prediction.preload()
 
 # Configure CORS
 app.add_middleware(
@@ -12,6 +35,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so request latency covers every other middleware
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
 # Include routers
 app.include_router(prediction.router, prefix="/api", tags=["prediction"])
@@ -23,3 +48,8 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (per worker process)"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,383 @@
+import contextvars
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import settings
+from app.profiling import wants_profile
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Stage latencies range from microseconds (lookup tables) to seconds (SHAP on big batches)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic total per label set"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def set(self, *labels, value: float):
+        """Mirror a total kept elsewhere (e.g. the prediction cache's own counters)"""
+        with self._lock:
+            self._values[labels] = float(value)
+    
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+                     for labels, value in values)
+        return lines
+
+
+class Gauge(Counter):
+    """Current value per label set"""
+    
+    kind = "gauge"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set
+    
+    ``observe`` is a bisect and three additions under an uncontended lock,
+    cheap enough for every stage of every request.
+    """
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, [list(counts), total, count])
+                            for labels, (counts, total, count) in self._series.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered for a Prometheus scrape"""
+    
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], None]] = []
+    
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    def add_collector(self, collector: Callable[[], None]):
+        """Run ``collector`` before each scrape to refresh mirrored values"""
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.register(Histogram(
+    "winwise_stage_duration_seconds",
+    "Time spent in each stage of a prediction",
+    ("endpoint", "stage"),
+))
+request_seconds = registry.register(Histogram(
+    "winwise_http_request_duration_seconds",
+    "HTTP request latency from first byte received to response start",
+    ("method", "route"),
+))
+requests_total = registry.register(Counter(
+    "winwise_http_requests_total", "HTTP responses by route and status code", ("method", "route", "status"),
+))
+predictions_total = registry.register(Counter(
+    "winwise_predictions_total",
+    "Predictions by source: model, lookup (precomputed tables), mock (no model loaded), "
+    "fallback (no predictor)",
+    ("endpoint", "source"),
+))
+errors_total = registry.register(Counter(
+    "winwise_prediction_errors_total", "Failed prediction requests by endpoint and kind", ("endpoint", "kind"),
+))
+cache_events_total = registry.register(Counter(
+    "winwise_prediction_cache_events_total", "Prediction cache lookups by outcome", ("event",),
+))
+model_load_seconds = registry.register(Gauge(
+    "winwise_model_load_seconds", "Time taken to load the model being served",
+))
+model_info = registry.register(Gauge(
+    "winwise_model_info", "Model being served (value is 1 when it loaded, 0 when predictions are mocked)",
+    ("version",),
+))
+
+
+# --- Per-call stage recording -------------------------------------------------
+#
+# The predictor runs inline, in a thread pool or in a process pool. It
+# records its stages into a thread-local CallMetrics opened by the inference
+# executor around each call; the executor hands the collected stages back to
+# the event loop, which observes them (and adds them to the request's
+# Server-Timing). Outside such a call, record_stage is a single getattr.
+
+_call = threading.local()
+
+
+class CallMetrics:
+    __slots__ = ("stages", "events", "profile")
+    
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.events: Dict[str, int] = {}
+        # Marshalled cProfile data when the call was profiled
+        self.profile: Optional[bytes] = None
+
+
+class collect_call_metrics:
+    """Collect record_stage/record_event calls made on this thread"""
+    
+    __slots__ = ("metrics", "previous")
+    
+    def __enter__(self) -> CallMetrics:
+        self.previous = getattr(_call, "metrics", None)
+        self.metrics = _call.metrics = CallMetrics()
+        return self.metrics
+    
+    def __exit__(self, *exc):
+        _call.metrics = self.previous
+        return False
+
+
+def record_stage(name: str, seconds: float):
+    metrics = getattr(_call, "metrics", None)
+    if metrics is not None:
+        metrics.stages[name] = metrics.stages.get(name, 0.0) + seconds
+
+
+def record_event(name: str, count: int = 1):
+    metrics = getattr(_call, "metrics", None)
+    if metrics is not None:
+        metrics.events[name] = metrics.events.get(name, 0) + count
+
+
+class stage:
+    """``with stage("predict_proba"):`` times the block into the current call's metrics"""
+    
+    __slots__ = ("name", "started")
+    
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        record_stage(self.name, time.perf_counter() - self.started)
+        return False
+
+
+# --- Per-request timing -------------------------------------------------------
+
+class RequestTiming:
+    """Stage durations of one HTTP request, set up by RequestMetricsMiddleware"""
+    
+    __slots__ = ("started", "endpoint", "handler_started", "handler_done", "stages", "profile", "profile_id")
+    
+    def __init__(self, started: float, profile: bool = False):
+        self.started = started
+        self.endpoint: Optional[str] = None
+        self.handler_started: Optional[float] = None
+        self.handler_done: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        # Run this request's predictor call (not the whole request) under the profiler
+        self.profile = profile
+        self.profile_id: Optional[str] = None
+    
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    def server_timing(self, total: float) -> bytes:
+        """Server-Timing header value: every recorded stage plus the total, in ms"""
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        if self.profile_id is not None:
+            entries.append(f'predictor-profile;desc="{self.profile_id}"')
+        return ", ".join(entries).encode("latin-1")
+
+
+_request_timing: contextvars.ContextVar = contextvars.ContextVar("request_timing", default=None)
+
+
+def current_request() -> Optional[RequestTiming]:
+    return _request_timing.get()
+
+
+def observe_stage(endpoint: str, name: str, seconds: float):
+    """Record a stage in the histogram and in the current request's timing"""
+    stage_seconds.observe(seconds, endpoint, name)
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+
+def observe_call(endpoint: str, call: CallMetrics):
+    """Record what a predictor call collected (run on the event loop)"""
+    for name, seconds in call.stages.items():
+        observe_stage(endpoint, name, seconds)
+    for source, count in call.events.items():
+        predictions_total.inc(endpoint, source, amount=count)
+
+
+def handler_started(endpoint: str):
+    """
+    Mark entry into a route handler. Everything before it (reading the
+    body, JSON parsing, pydantic validation) is the validation stage.
+    """
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.handler_started = time.perf_counter()
+        observe_stage(endpoint, "validation", timing.handler_started - timing.started)
+
+
+def handler_done(endpoint: str):
+    """Mark the handler's return; the time to the response start is serialization"""
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.handler_done = time.perf_counter()
+        timing.endpoint = endpoint
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request
+    
+    Opens a RequestTiming for route handlers to fill in, and on response
+    start records the request latency, the status counter and, for
+    handlers that marked their return, the serialization stage. The
+    stages are also sent back in a Server-Timing header, with the id of
+    the predictor profile when the request was profiled (X-Profile-Id).
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        timing = RequestTiming(time.perf_counter(), wants_profile(scope))
+        token = _request_timing.set(timing)
+        
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                headers = self._finish(scope, timing, message["status"])
+                if headers:
+                    message = dict(message, headers=list(message.get("headers", ())) + headers)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_timing.reset(token)
+    
+    def _finish(self, scope, timing: RequestTiming, status: int) -> List[Tuple[bytes, bytes]]:
+        now = time.perf_counter()
+        if timing.handler_done is not None:
+            observe_stage(timing.endpoint, "serialization", now - timing.handler_done)
+        route = _route_template(scope)
+        request_seconds.observe(now - timing.started, scope["method"], route)
+        requests_total.inc(scope["method"], route, str(status))
+        
+        headers = []
+        if settings.server_timing:
+            headers.append((b"server-timing", timing.server_timing(now - timing.started)))
+            # Lets the (cross-origin) frontend read the header through the Resource Timing API
+            headers.append((b"timing-allow-origin", b"*"))
+        if timing.profile_id is not None:
+            headers.append((b"x-profile-id", timing.profile_id.encode("latin-1")))
+        return headers
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route (set by the router), keeping label values bounded"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return template
+    # Routes of an included router may carry only their own path; the
+    # router prefix is the leading part of the request path they did not match
+    prefix = ""
+    for part in path.split("/")[1:]:
+        prefix += f"/{part}"
+        if regex.match(path[len(prefix):]):
+            return prefix + template
+    return template
@@ -0,0 +1,149 @@
+import json
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional
+import logging
+from app.ml.feature_encoder import FeatureEncoder
+from app.ml.forest_engine import CompiledForest
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the array layout below changes
+FORMAT_VERSION = 1
+COMPACT_SUFFIX = ".npz"
+
+# Probabilities from a compact artifact match the pickled pipeline within this bound
+# (node probabilities are stored as float32; split decisions are exact)
+PROBABILITY_TOLERANCE = 1e-6
+
+
+class CompactModel:
+    """
+    Pickle-free model artifact: encoder constants plus the flattened forest
+    
+    Everything needed to serve predictions lives in one ``.npz`` file of
+    typed arrays and is loaded with ``allow_pickle=False``, so loading does
+    not depend on the scikit-learn version the model was trained with.
+    """
+    
+    def __init__(self, forest: CompiledForest, encoder: FeatureEncoder,
+                 feature_names: List[str], model_info: Dict[str, Any]):
+        self.forest = forest
+        self.encoder = encoder
+        self.feature_names = feature_names
+        self.model_info = model_info
+    
+    @classmethod
+    def from_pipeline(cls, pipeline, model_info: Optional[Dict[str, Any]] = None) -> "CompactModel":
+        """Extract a compact model from a fitted preprocessor + RandomForest Pipeline"""
+        preprocessor = pipeline.named_steps['preprocessor']
+        encoder = FeatureEncoder.from_preprocessor(preprocessor)
+        forest = CompiledForest.from_sklearn(pipeline.named_steps['classifier'])
+        
+        feature_names = list(encoder.numerical_features)
+        for name, index in zip(encoder.categorical_features, encoder.category_index):
+            feature_names.extend(f"{name}_{value}" for value in index)
+        
+        info = dict(model_info or {})
+        info.setdefault('categorical_features', encoder.categorical_features)
+        info.setdefault('numerical_features', encoder.numerical_features)
+        return cls(forest, encoder, feature_names, info)
+    
+    def save(self, path: str) -> str:
+        """Write the artifact with reduced-precision typed arrays"""
+        forest = self.forest
+        encoder = self.encoder
+        
+        for index in encoder.category_index:
+            if not all(isinstance(value, str) for value in index):
+                raise ValueError("Compact format only supports string categories")
+        
+        if forest.n_features > np.iinfo(np.int16).max:
+            raise ValueError("Too many features for int16 feature indices")
+        
+        arrays = {
+            'format_version': np.array(FORMAT_VERSION, dtype=np.int32),
+            'metadata': np.array(json.dumps(self.model_info, default=str)),
+            # Forest
+            'feature': forest.feature.astype(np.int16),
+            'threshold': _floor_to_float32(forest.threshold),
+            'children_left': forest.children_left.astype(np.int32),
+            'children_right': forest.children_right.astype(np.int32),
+            'node_values': forest.node_values.astype(np.float32),
+            'roots': forest.roots.astype(np.int32),
+            'classes': np.asarray(forest.classes).astype(np.int64),
+            'max_depth': np.array(forest.max_depth, dtype=np.int32),
+            # Encoder
+            'numerical_features': np.array(encoder.numerical_features),
+            'categorical_features': np.array(encoder.categorical_features),
+            'medians': encoder.medians.astype(np.float64),
+            'means': encoder.means.astype(np.float64),
+            'scales': encoder.scales.astype(np.float64),
+            'modes': np.array([str(mode) for mode in encoder.modes]),
+            'feature_names': np.array(self.feature_names),
+        }
+        for i, index in enumerate(encoder.category_index):
+            arrays[f'vocabulary_{i}'] = np.array(list(index), dtype=str)
+        
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> "CompactModel":
+        """Load an artifact written by ``save`` without unpickling anything"""
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact model format {version} (expected {FORMAT_VERSION})")
+            
+            numerical_features = [str(name) for name in data['numerical_features']]
+            categorical_features = [str(name) for name in data['categorical_features']]
+            
+            # Rebuild absolute one-hot column indices from the vocabularies
+            category_index = []
+            offset = len(numerical_features)
+            for i in range(len(categorical_features)):
+                vocabulary = [str(value) for value in data[f'vocabulary_{i}']]
+                category_index.append({value: offset + j for j, value in enumerate(vocabulary)})
+                offset += len(vocabulary)
+            
+            encoder = FeatureEncoder(
+                numerical_features=numerical_features,
+                categorical_features=categorical_features,
+                medians=data['medians'],
+                means=data['means'],
+                scales=data['scales'],
+                modes=[str(mode) for mode in data['modes']],
+                category_index=category_index,
+                n_features=offset,
+            )
+            forest = CompiledForest(
+                feature=data['feature'],
+                threshold=data['threshold'],
+                children_left=data['children_left'],
+                children_right=data['children_right'],
+                node_values=data['node_values'],
+                roots=data['roots'],
+                classes=data['classes'],
+                max_depth=int(data['max_depth']),
+                n_features=offset,
+            )
+            feature_names = [str(name) for name in data['feature_names']]
+            model_info = json.loads(str(data['metadata']))
+        
+        return cls(forest, encoder, feature_names, model_info)
+
+
+def _floor_to_float32(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 not above each float64 threshold
+    
+    Inputs are compared as float32, so ``x <= t`` and ``x <= floor32(t)``
+    agree for every float32 ``x``: storing thresholds this way is lossless.
+    """
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
@@ -0,0 +1,239 @@
+import csv
+import io
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Column order of cricket_features.csv; CricketModelTrainer selects by name
+FEATURE_COLUMNS = [
+    'batting_team', 'bowling_team', 'venue', 'runs_required', 'balls_remaining',
+    'wickets_in_hand', 'target_match', 'current_run_rate', 'required_run_rate',
+    'toss_winner', 'toss_decision', 'win',
+]
+MANIFEST_SUFFIX = ".manifest.jsonl"
+# Deliveries that are bowled again and do not count towards the innings
+UNCOUNTED_EXTRAS = ('wides', 'noballs')
+# Batters leaving without being dismissed; the side does not lose a wicket
+NOT_OUT_KINDS = ('retired hurt', 'retired not out')
+
+
+def match_rows(path: str) -> List[list]:
+    """
+    Feature rows for one Cricsheet JSON match: one per second-innings
+    delivery, describing the chase state after that delivery
+    
+    Matches without a result, or without a second innings, yield no rows.
+    """
+    with open(path) as f:
+        match = json.load(f)
+    
+    info = match.get('info', {})
+    innings = [inning for inning in match.get('innings', []) if not inning.get('super_over')]
+    outcome = info.get('outcome', {})
+    winner = outcome.get('winner') or outcome.get('eliminator')
+    if len(innings) < 2 or winner is None:
+        return []
+    
+    first, chase = innings[0], innings[1]
+    batting_team = chase['team']
+    bowling_team = first['team']
+    balls_per_over = info.get('balls_per_over', 6)
+    
+    # Revised targets (rain rules) are recorded on the chasing innings
+    revised = chase.get('target', {})
+    target = revised.get('runs') or sum(delivery['runs']['total'] for delivery in _deliveries(first)) + 1
+    overs = revised.get('overs') or info.get('overs')
+    if overs is None:
+        # Unlimited innings (Test matches) have no balls-remaining state
+        return []
+    # Overs are written as overs.balls (e.g. 17.3)
+    whole_overs, extra_balls = divmod(round(float(overs) * 10), 10)
+    innings_balls = whole_overs * balls_per_over + extra_balls
+    
+    toss = info.get('toss', {})
+    common = (batting_team, bowling_team, info.get('venue'))
+    toss_part = (toss.get('winner'), toss.get('decision'))
+    win = int(winner == batting_team)
+    
+    rows = []
+    score, wickets, legal_balls = 0, 0, 0
+    for delivery in _deliveries(chase):
+        score += delivery['runs']['total']
+        wickets += sum(wicket.get('kind') not in NOT_OUT_KINDS for wicket in delivery.get('wickets', []))
+        if not any(kind in delivery.get('extras', {}) for kind in UNCOUNTED_EXTRAS):
+            legal_balls += 1
+        
+        runs_required = target - score
+        balls_remaining = innings_balls - legal_balls
+        current_run_rate = score * 6.0 / legal_balls if legal_balls else 0.0
+        required_run_rate = runs_required * 6.0 / balls_remaining if balls_remaining > 0 else None
+        rows.append([*common, runs_required, balls_remaining, 10 - wickets, target,
+                     current_run_rate, required_run_rate, *toss_part, win])
+    return rows
+
+
+def _deliveries(inning: Dict) -> Iterator[Dict]:
+    for over in inning.get('overs', []):
+        yield from over.get('deliveries', [])
+
+
+def _file_rows(path: str) -> Tuple[str, Optional[List[list]], Optional[str]]:
+    """Process-pool task: rows of one file, or the error that prevented it"""
+    try:
+        return path, match_rows(path), None
+    except Exception as e:
+        return path, None, f"{e.__class__.__name__}: {e}"
+
+
+def _fingerprint(path: Path) -> List[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _parsed(paths: List[str], workers: Optional[int]) -> Iterator[Tuple[str, Optional[List[list]], Optional[str]]]:
+    """
+    ``_file_rows`` of every path, in order, from a process pool
+    
+    At most two files per worker are submitted ahead of the one being
+    written, so memory stays bounded however many files are pending.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = 2 * (workers or os.cpu_count() or 1)
+        futures = deque()
+        for path in paths:
+            futures.append(pool.submit(_file_rows, path))
+            if len(futures) >= window:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def build_features(input_dir: str, output_path: str, workers: Optional[int] = None,
+                   full: bool = False) -> Dict[str, int]:
+    """
+    Append feature rows for every match file in ``input_dir`` not yet
+    recorded in the output's manifest
+    
+    Files are parsed in a process pool with a bounded number in flight and
+    written in file order as results arrive. The manifest
+    (``<output>.manifest.jsonl``) gets one line per file, appended right
+    after the file's rows, with its size, mtime and the byte range of its
+    rows. Rows past the last recorded file (an interrupted run) are cut off
+    before appending, and the rows of a changed file are removed before it
+    is processed again, so the output never holds a match twice.
+    """
+    output = Path(output_path)
+    manifest_path = Path(str(output) + MANIFEST_SUFFIX)
+    manifest: Dict[str, Dict] = {}
+    if not full and output.exists():
+        if not manifest_path.exists():
+            raise ValueError(f"{output} was not written by the feature builder (no {manifest_path.name}); "
+                             "rebuild it with full=True or choose another output")
+        manifest = _read_manifest(manifest_path)
+    # A new output, or one with nothing recorded yet, is written from scratch
+    full = full or not manifest
+    
+    files = sorted(Path(input_dir).glob("*.json"))
+    pending = [path for path in files if full or manifest.get(path.name, {}).get('fingerprint') != _fingerprint(path)]
+    stats = {"files": len(files), "skipped": len(files) - len(pending), "processed": 0,
+             "failed": 0, "empty": 0, "rows": 0}
+    if not pending:
+        return stats
+    
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if full:
+        manifest = {}
+        with open(output, "w", newline="") as f:
+            csv.writer(f).writerow(FEATURE_COLUMNS)
+        _write_manifest(manifest_path, manifest)
+    else:
+        _truncate_to_manifest(output, manifest)
+        changed = [path.name for path in pending if path.name in manifest]
+        if changed:
+            _drop_rows(output, manifest_path, manifest, changed)
+    
+    with open(output, "ab") as f, open(manifest_path, "a") as journal:
+        # Results come back in file order, so repeated builds give identical output
+        for path, rows, error in _parsed([str(path) for path in pending], workers):
+            name = Path(path).name
+            if error is not None:
+                logger.warning(f"Skipping {name}: {error}")
+                stats["failed"] += 1
+                continue
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            start = f.tell()
+            f.write(buffer.getvalue().encode("utf-8"))
+            f.flush()
+            # A file counts as built only once its manifest line follows its rows
+            entry = {'file': name, 'fingerprint': _fingerprint(Path(path)), 'start': start, 'end': f.tell()}
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            manifest[name] = entry
+            stats["processed"] += 1
+            stats["rows"] += len(rows)
+            if not rows:
+                stats["empty"] += 1
+    return stats
+
+
+def _read_manifest(path: Path) -> Dict[str, Dict]:
+    """Latest entry per file; a torn last line from an interrupted run is ignored"""
+    manifest = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            manifest[entry['file']] = entry
+    return manifest
+
+
+def _truncate_to_manifest(output: Path, manifest: Dict[str, Dict]):
+    """Cut off rows written after the last manifest line"""
+    committed = max(entry['end'] for entry in manifest.values())
+    size = output.stat().st_size
+    if size < committed:
+        raise ValueError(f"{output} is shorter than its manifest records; rebuild it with full=True")
+    if size > committed:
+        logger.info(f"Removing {size - committed} bytes of unrecorded rows from {output}")
+        with open(output, "r+b") as f:
+            f.truncate(committed)
+
+
+def _drop_rows(output: Path, manifest_path: Path, manifest: Dict[str, Dict], names: List[str]):
+    """Rewrite the output without the rows of ``names`` and the manifest with the new offsets"""
+    dropped = set(names)
+    entries = sorted(manifest.values(), key=lambda entry: entry['start'])
+    kept = {}
+    tmp = Path(str(output) + ".tmp")
+    with open(output, "rb") as src, open(tmp, "wb") as dst:
+        # Header row
+        dst.write(src.read(entries[0]['start']))
+        for entry in entries:
+            if entry['file'] in dropped:
+                continue
+            src.seek(entry['start'])
+            start = dst.tell()
+            dst.write(src.read(entry['end'] - entry['start']))
+            kept[entry['file']] = dict(entry, start=start, end=dst.tell())
+    os.replace(tmp, output)
+    _write_manifest(manifest_path, kept)
+    manifest.clear()
+    manifest.update(kept)
+    logger.info(f"Removed the rows of {len(dropped)} changed files from {output}")
+
+
+def _write_manifest(path: Path, manifest: Dict[str, Dict]):
+    tmp = Path(str(path) + ".tmp")
+    with open(tmp, "w") as f:
+        for entry in manifest.values():
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp, path)
@@ -0,0 +1,105 @@
+import math
+import numpy as np
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FeatureEncoder:
+    """
+    Pandas-free equivalent of the fitted ColumnTransformer
+    
+    The imputer statistics, scaler parameters and one-hot vocabularies are
+    read once from the fitted preprocessor. Rows are then written straight
+    into a dense float64 matrix from the input dictionaries, without
+    building a DataFrame or a sparse matrix per request. Unknown categories
+    encode to all zeros, matching OneHotEncoder(handle_unknown='ignore').
+    """
+    
+    def __init__(self, numerical_features: List[str], categorical_features: List[str],
+                 medians: np.ndarray, means: np.ndarray, scales: np.ndarray,
+                 modes: List[Any], category_index: List[Dict[Any, int]], n_features: int):
+        self.numerical_features = list(numerical_features)
+        self.categorical_features = list(categorical_features)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.modes = list(modes)
+        self.category_index = category_index
+        self.n_features = n_features
+    
+    @classmethod
+    def from_preprocessor(cls, preprocessor) -> "FeatureEncoder":
+        """Extract encoding constants from the fitted 'num'/'cat' ColumnTransformer"""
+        transformers = {name: (pipeline, columns) for name, pipeline, columns in preprocessor.transformers_}
+        if [name for name, _, _ in preprocessor.transformers_ if name != 'remainder'] != ['num', 'cat']:
+            raise ValueError("Unsupported preprocessor layout")
+        
+        num_pipeline, numerical_features = transformers['num']
+        cat_pipeline, categorical_features = transformers['cat']
+        
+        num_imputer = num_pipeline.named_steps['imputer']
+        scaler = num_pipeline.named_steps['scaler']
+        cat_imputer = cat_pipeline.named_steps['imputer']
+        onehot = cat_pipeline.named_steps['onehot']
+        
+        if onehot.drop_idx_ is not None or getattr(onehot, 'infrequent_categories_', None) is not None:
+            raise ValueError("OneHotEncoder with drop or infrequent categories is not supported")
+        
+        n_num = len(numerical_features)
+        means = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_num)
+        scales = scaler.scale_ if scaler.scale_ is not None else np.ones(n_num)
+        
+        # Map every category value to its absolute column in the output matrix
+        category_index = []
+        offset = n_num
+        for categories in onehot.categories_:
+            category_index.append({value: offset + i for i, value in enumerate(categories)})
+            offset += len(categories)
+        
+        return cls(
+            numerical_features=numerical_features,
+            categorical_features=categorical_features,
+            medians=num_imputer.statistics_,
+            means=means,
+            scales=scales,
+            modes=list(cat_imputer.statistics_),
+            category_index=category_index,
+            n_features=offset,
+        )
+    
+    def vocabularies(self) -> Dict[str, List[Any]]:
+        """Known categories of each categorical feature, in column order"""
+        return {name: [value.item() if isinstance(value, np.generic) else value for value in index]
+                for name, index in zip(self.categorical_features, self.category_index)}
+    
+    def transform_row(self, row: Dict[str, Any]) -> np.ndarray:
+        """Encode one input dictionary into a 1-D feature vector"""
+        out = np.zeros(self.n_features, dtype=np.float64)
+        self._write_row(row, out)
+        return out
+    
+    def transform_batch(self, rows: List[Dict[str, Any]]) -> np.ndarray:
+        """Encode many input dictionaries into a (n_rows, n_features) matrix"""
+        out = np.zeros((len(rows), self.n_features), dtype=np.float64)
+        for i, row in enumerate(rows):
+            self._write_row(row, out[i])
+        return out
+    
+    def _write_row(self, row: Dict[str, Any], out: np.ndarray):
+        for j, name in enumerate(self.numerical_features):
+            value = row.get(name)
+            value = self.medians[j] if _is_missing(value) else float(value)
+            out[j] = (value - self.means[j]) / self.scales[j]
+        
+        for j, name in enumerate(self.categorical_features):
+            value = row.get(name)
+            if _is_missing(value):
+                value = self.modes[j]
+            column = self.category_index[j].get(value)
+            if column is not None:
+                out[column] = 1.0
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
@@ -0,0 +1,159 @@
+import logging
+import re
+import numpy as np
+import pandas as pd
+import sklearn
+from typing import Dict, List, Optional
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.tree._tree import Tree
+
+logger = logging.getLogger(__name__)
+
+# scikit-learn releases whose private Tree state and output_indices_ match
+# what this module expects: from 1.0 (output_indices_) up to the next major
+SKLEARN_MIN_VERSION = (1, 0)
+SKLEARN_MAX_VERSION = (2, 0)
+
+
+def check_sklearn_version(version: Optional[str] = None):
+    """
+    Raise RuntimeError if ``version`` (default: the installed scikit-learn)
+    is outside the supported range
+    
+    Updates rewrite fitted models through private scikit-learn APIs that
+    its deprecation policy does not cover: the ``Tree`` pickle state
+    (``__getstate__`` / ``__setstate__`` with its ``nodes`` and ``values``
+    arrays) and ``ColumnTransformer.output_indices_``. They were verified
+    against 1.5.2 (requirements.txt) and the later 1.x releases.
+    """
+    version = version or sklearn.__version__
+    parsed = tuple(int(part) for part in re.findall(r"\d+", version)[:2])
+    if not SKLEARN_MIN_VERSION <= parsed < SKLEARN_MAX_VERSION:
+        supported = ".".join(map(str, SKLEARN_MIN_VERSION)), ".".join(map(str, SKLEARN_MAX_VERSION))
+        raise RuntimeError(f"Incremental updates use private scikit-learn internals and support "
+                           f"scikit-learn >={supported[0]},<{supported[1]}; found {version}. "
+                           f"Retrain the model from scratch instead.")
+
+
+def extend_vocabulary(preprocessor: ColumnTransformer, X_new: pd.DataFrame,
+                      categorical_features: List[str]) -> Optional[np.ndarray]:
+    """
+    Add categories seen in ``X_new`` to the fitted OneHotEncoder
+    
+    New categories are appended to their feature's list, so one-hot columns
+    after them move right. Returns the new column index of every old
+    column (to renumber existing trees), or None when nothing was added.
+    The numerical imputer and scaler are left untouched so existing split
+    thresholds keep their meaning.
+    """
+    cat_pipeline = preprocessor.named_transformers_['cat']
+    encoder: OneHotEncoder = cat_pipeline.named_steps['onehot']
+    imputed = cat_pipeline.named_steps['imputer'].transform(X_new[categorical_features])
+    
+    extended = []
+    added = {}
+    for i, (name, known) in enumerate(zip(categorical_features, encoder.categories_)):
+        seen = pd.unique(imputed[:, i])
+        known_set = set(known.tolist())
+        new = sorted(str(value) for value in seen if value not in known_set and not pd.isna(value))
+        if new:
+            added[name] = new
+        extended.append(np.concatenate([known, np.array(new, dtype=known.dtype)]))
+    if not added:
+        return None
+    logger.info(f"New categories: {added}")
+    
+    old_names = list(preprocessor.get_feature_names_out())
+    replacement = OneHotEncoder(categories=extended, handle_unknown='ignore',
+                                sparse_output=encoder.sparse_output)
+    replacement.fit(imputed)
+    cat_pipeline.steps[-1] = ('onehot', replacement)
+    _shift_output_indices(preprocessor, sum(len(values) for values in added.values()))
+    
+    new_index = {name: j for j, name in enumerate(preprocessor.get_feature_names_out())}
+    return np.array([new_index[name] for name in old_names], dtype=np.intp)
+
+
+def _shift_output_indices(preprocessor: ColumnTransformer, n_added: int):
+    """Widen the 'cat' output slice and move the slices after it (private output_indices_)"""
+    cat = preprocessor.output_indices_['cat']
+    shifted = {}
+    for name, span in preprocessor.output_indices_.items():
+        if name == 'cat':
+            span = slice(span.start, span.stop + n_added)
+        elif span.stop > span.start and span.start >= cat.stop:
+            span = slice(span.start + n_added, span.stop + n_added)
+        shifted[name] = span
+    preprocessor.output_indices_ = shifted
+
+
+def renumber_features(forest: RandomForestClassifier, column_map: np.ndarray, n_features: int):
+    """Point every split of every tree at its column in the widened feature matrix (private Tree state)"""
+    for estimator in forest.estimators_:
+        state = estimator.tree_.__getstate__()
+        nodes = state['nodes'].copy()
+        internal = nodes['left_child'] != -1
+        nodes['feature'][internal] = column_map[nodes['feature'][internal]]
+        state['nodes'] = nodes
+        tree = Tree(n_features, np.asarray(estimator.tree_.n_classes, dtype=np.intp), estimator.tree_.n_outputs)
+        tree.__setstate__(state)
+        estimator.tree_ = tree
+        estimator.n_features_in_ = n_features
+    forest.n_features_in_ = n_features
+
+
+def add_trees(forest: RandomForestClassifier, X: np.ndarray, y: np.ndarray, n_new_trees: int,
+              max_trees: Optional[int] = None, n_jobs: Optional[int] = None) -> Dict[str, int]:
+    """
+    Grow ``n_new_trees`` trees on (X, y) next to the existing ones, then
+    drop the oldest trees beyond ``max_trees``
+    
+    The new data may hold only some of the forest's classes (one match has
+    a single outcome). The new trees are fitted on their own and their leaf
+    values mapped onto the forest's ``classes_``, with zeros for absent
+    classes, as sklearn does for a bootstrap sample that misses a class.
+    """
+    known = forest.classes_.tolist()
+    unknown = sorted(set(np.unique(y).tolist()) - set(known))
+    if unknown:
+        raise ValueError(f"New data has classes {unknown} the model was not trained on ({known})")
+    
+    n_before = len(forest.estimators_)
+    random_state = forest.random_state
+    if isinstance(random_state, int):
+        # Fresh bootstrap samples and feature draws, reproducible per update
+        random_state += n_before
+    new = clone(forest).set_params(n_estimators=n_new_trees, warm_start=False, oob_score=False,
+                                   n_jobs=n_jobs, random_state=random_state)
+    new.fit(X, y)
+    columns = np.searchsorted(forest.classes_, new.classes_)
+    for estimator in new.estimators_:
+        _widen_classes(estimator, columns, len(known))
+    forest.estimators_ = forest.estimators_ + new.estimators_
+    forest.set_params(n_estimators=len(forest.estimators_))
+    
+    dropped = 0
+    if max_trees and len(forest.estimators_) > max_trees:
+        dropped = len(forest.estimators_) - max_trees
+        forest.estimators_ = forest.estimators_[dropped:]
+        forest.set_params(n_estimators=len(forest.estimators_))
+    return {"trees_before": n_before, "trees_added": n_new_trees, "trees_dropped": dropped,
+            "trees": len(forest.estimators_)}
+
+
+def _widen_classes(estimator, columns: np.ndarray, n_classes: int):
+    """Move a tree's class values to ``columns`` of an ``n_classes``-wide value array (private Tree state)"""
+    state = estimator.tree_.__getstate__()
+    values = state['values']
+    widened = np.zeros(values.shape[:2] + (n_classes,), dtype=values.dtype)
+    widened[:, :, columns] = values
+    state['values'] = widened
+    tree = Tree(estimator.n_features_in_, np.array([n_classes], dtype=np.intp), estimator.tree_.n_outputs)
+    tree.__setstate__(state)
+    estimator.tree_ = tree
+    # Forest members are fitted on class indices, not labels
+    estimator.classes_ = np.arange(n_classes, dtype=np.float64)
+    estimator.n_classes_ = n_classes
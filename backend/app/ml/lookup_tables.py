@@ -0,0 +1,239 @@
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+# Categorical features that identify a table
+KEY_FEATURES = ('batting_team', 'bowling_team', 'venue', 'toss_winner', 'toss_decision')
+# Run rates must be supplied and agree with the derived chase state within this bound
+RATE_TOLERANCE = 0.05
+
+
+def derive_rates(runs_required, balls_remaining, target, innings_balls: int):
+    """Current and required run rate implied by a chase state (arrays or scalars)"""
+    runs_scored = np.maximum(np.asarray(target, dtype=np.float64) - runs_required, 0)
+    balls_bowled = innings_balls - np.asarray(balls_remaining, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current_run_rate = np.where(balls_bowled > 0, runs_scored * 6.0 / balls_bowled, 0.0)
+        required_run_rate = np.where(balls_remaining > 0, np.asarray(runs_required, dtype=np.float64) * 6.0 / balls_remaining, 0.0)
+    return current_run_rate, required_run_rate
+
+
+def table_key(features: Dict[str, Any]) -> Tuple:
+    return tuple(features.get(name) for name in KEY_FEATURES)
+
+
+class LookupTables:
+    """
+    Precomputed win-probability tables for selected team/venue keys
+    
+    Each table holds the model's probability over a (target, wickets in
+    hand, balls remaining, runs required) grid for one combination of
+    categorical features, stored as a ``.npy`` file and memory-mapped at
+    load. Lookups interpolate linearly over target, balls and runs; wickets
+    must be an integer on the axis. Anything off the grid, for an unknown
+    key, or with run rates missing or disagreeing with the derived state is
+    a miss and the caller falls back to the live model.
+    """
+    
+    def __init__(self, directory: str, index: Dict[str, Any], tables: Dict[Tuple, np.ndarray]):
+        self.directory = directory
+        self.model_version = index.get('model_version')
+        self.innings_balls = int(index['innings_balls'])
+        self.targets = np.asarray(index['axes']['target'], dtype=np.float64)
+        self.wickets = np.asarray(index['axes']['wickets'], dtype=np.int64)
+        self.balls = np.asarray(index['axes']['balls'], dtype=np.float64)
+        self.runs = np.asarray(index['axes']['runs'], dtype=np.float64)
+        self.tables = tables
+        self._wicket_index = {int(w): i for i, w in enumerate(self.wickets)}
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> "LookupTables":
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+        tables = {}
+        for entry in index['tables']:
+            key = tuple(entry['key'][name] for name in KEY_FEATURES)
+            tables[key] = np.load(os.path.join(directory, entry['file']), mmap_mode=mmap_mode)
+        return cls(directory, index, tables)
+    
+    def lookup(self, features: Dict[str, Any]) -> Optional[float]:
+        """Interpolated batting-team win probability, or None on a miss"""
+        value = self._lookup(features)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def _lookup(self, features: Dict[str, Any]) -> Optional[float]:
+        table = self.tables.get(table_key(features))
+        if table is None:
+            return None
+        
+        try:
+            runs = float(features['runs_required'])
+            balls = float(features['balls_remaining'])
+            wickets = features['wickets_in_hand']
+            target = float(features['target_match'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if wickets is None or float(wickets) != int(wickets) or int(wickets) not in self._wicket_index:
+            return None
+        
+        current_run_rate, required_run_rate = derive_rates(runs, balls, target, self.innings_balls)
+        for name, derived in (('current_run_rate', current_run_rate), ('required_run_rate', required_run_rate)):
+            # A missing rate would be imputed by the model, which the tables do not cover
+            supplied = features.get(name)
+            if supplied is None or abs(float(supplied) - float(derived)) > RATE_TOLERANCE:
+                return None
+        
+        target_pos = _axis_position(self.targets, target)
+        balls_pos = _axis_position(self.balls, balls)
+        runs_pos = _axis_position(self.runs, runs)
+        if target_pos is None or balls_pos is None or runs_pos is None:
+            return None
+        
+        plane = table[:, self._wicket_index[int(wickets)]]
+        value = 0.0
+        for ti, tw in target_pos:
+            for bi, bw in balls_pos:
+                for ri, rw in runs_pos:
+                    weight = tw * bw * rw
+                    if weight:
+                        value += weight * float(plane[ti, bi, ri])
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self.tables),
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _axis_position(axis: np.ndarray, value: float) -> Optional[List[Tuple[int, float]]]:
+    """Neighbouring indices and linear weights of ``value`` on a sorted axis"""
+    if value < axis[0] or value > axis[-1]:
+        return None
+    hi = int(np.searchsorted(axis, value, side='left'))
+    if axis[hi] == value or len(axis) == 1:
+        return [(hi, 1.0)]
+    lo = hi - 1
+    weight = (value - axis[lo]) / (axis[hi] - axis[lo])
+    return [(lo, 1.0 - weight), (hi, weight)]
+
+
+def grid_features(targets: Sequence[float], wickets: Sequence[int], balls: Sequence[float],
+                  runs: Sequence[float], innings_balls: int) -> Dict[str, np.ndarray]:
+    """Numerical model features for every grid cell, flattened in table order"""
+    t, w, b, r = np.meshgrid(np.asarray(targets, dtype=np.float64), np.asarray(wickets, dtype=np.float64),
+                             np.asarray(balls, dtype=np.float64), np.asarray(runs, dtype=np.float64),
+                             indexing='ij')
+    current_run_rate, required_run_rate = derive_rates(r.ravel(), b.ravel(), t.ravel(), innings_balls)
+    return {
+        'runs_required': r.ravel(),
+        'balls_remaining': b.ravel(),
+        'wickets_in_hand': w.ravel(),
+        'target_match': t.ravel(),
+        'current_run_rate': current_run_rate,
+        'required_run_rate': required_run_rate,
+    }
+
+
+def build_tables(predictor, config: Dict[str, Any], output_dir: str, chunk_size: int = 200000) -> str:
+    """
+    Materialize a table per configured key with the live model
+    
+    ``config`` holds ``innings_balls``, the axes as ``{"start", "stop", "step"}``
+    ranges (``target``, ``wickets``, ``balls``, ``runs``; stop inclusive)
+    and ``keys``, a list of categorical feature dicts.
+    """
+    axes = {name: _expand_range(config['axes'][name]) for name in ('target', 'wickets', 'balls', 'runs')}
+    innings_balls = int(config.get('innings_balls', 300))
+    features = grid_features(axes['target'], axes['wickets'], axes['balls'], axes['runs'], innings_balls)
+    shape = tuple(len(axes[name]) for name in ('target', 'wickets', 'balls', 'runs'))
+    n_cells = int(np.prod(shape))
+    
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    entries = []
+    for i, key in enumerate(config['keys']):
+        base_input = dict(key)
+        base_input.setdefault('toss_winner', key['batting_team'])
+        base_input.setdefault('toss_decision', 'bat')
+        # Key the table by the names requests are looked up with (after name resolution)
+        base_input = predictor._map_features(base_input)
+        
+        table = np.empty(n_cells, dtype=np.float32)
+        for start in range(0, n_cells, chunk_size):
+            stop = min(start + chunk_size, n_cells)
+            chunk = {name: values[start:stop] for name, values in features.items()}
+            table[start:stop] = predictor.predict_proba_grid(base_input, chunk)
+        
+        filename = f"table_{i:04d}.npy"
+        np.save(os.path.join(output_dir, filename), table.reshape(shape))
+        entries.append({'key': {name: base_input.get(name) for name in KEY_FEATURES}, 'file': filename})
+        logger.info(f"Built lookup table {filename} for {base_input}")
+    
+    index = {
+        'model_version': predictor.model_version,
+        'innings_balls': innings_balls,
+        'axes': {name: [float(v) for v in values] for name, values in axes.items()},
+        'tables': entries,
+    }
+    index_path = os.path.join(output_dir, INDEX_FILE)
+    with open(f"{index_path}.tmp", "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(f"{index_path}.tmp", index_path)
+    return index_path
+
+
+def evaluate_tables(predictor, tables: LookupTables, samples: int = 20000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Largest and mean absolute error of interpolated lookups against the model
+    at random off-grid chase states inside each table's domain
+    """
+    rng = np.random.default_rng(seed)
+    report = {}
+    for key in tables.tables:
+        n = samples
+        targets = rng.uniform(tables.targets[0], tables.targets[-1], n)
+        wickets = rng.choice(tables.wickets, n)
+        balls = rng.uniform(tables.balls[0], tables.balls[-1], n)
+        runs = rng.uniform(tables.runs[0], tables.runs[-1], n)
+        current_run_rate, required_run_rate = derive_rates(runs, balls, targets, tables.innings_balls)
+        numeric = {
+            'runs_required': runs, 'balls_remaining': balls, 'wickets_in_hand': wickets.astype(np.float64),
+            'target_match': targets, 'current_run_rate': current_run_rate, 'required_run_rate': required_run_rate,
+        }
+        base_input = dict(zip(KEY_FEATURES, key))
+        expected = predictor.predict_proba_grid(base_input, numeric)
+        
+        looked_up = np.array([
+            tables._lookup(dict(base_input, **{name: values[i] for name, values in numeric.items()}))
+            for i in range(n)
+        ], dtype=np.float64)
+        errors = np.abs(looked_up - expected)
+        worst = int(np.argmax(errors))
+        report[" | ".join(str(part) for part in key)] = {
+            'max_error': float(errors[worst]),
+            'mean_error': float(errors.mean()),
+            'p99_error': float(np.percentile(errors, 99)),
+            'worst_state': {name: float(values[worst]) for name, values in numeric.items()},
+        }
+    return report
+
+
+def _expand_range(spec) -> List[float]:
+    if isinstance(spec, dict):
+        values = np.arange(spec['start'], spec['stop'] + spec.get('step', 1) / 2, spec.get('step', 1))
+        return [float(v) for v in values]
+    return [float(v) for v in spec]
@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MODEL_FILES = ("cricket_model.pkl", "model_info.pkl", "cricket_model.npz")
+
+
+class ModelRegistry:
+    """
+    Versioned model directory
+    
+    Each version is an immutable subdirectory holding the files written by
+    ``CricketModelTrainer.save_model``. ``manifest.json`` lists the versions
+    and names the active one; it is replaced atomically, so readers (the
+    serving watcher in every worker) never see a partial manifest.
+    
+        registry/
+            manifest.json
+            20240401-120000/cricket_model.pkl, model_info.pkl[, cricket_model.npz]
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def manifest(self) -> Dict[str, Any]:
+        path = self.root / MANIFEST_FILE
+        if not path.exists():
+            return {"active": None, "versions": {}}
+        with open(path) as f:
+            return json.load(f)
+    
+    def versions(self) -> List[str]:
+        return sorted(self.manifest()["versions"])
+    
+    def active_version(self) -> Optional[str]:
+        return self.manifest().get("active")
+    
+    def model_path(self, version: str) -> str:
+        """Model file served for ``version`` (the compact artifact when it is the only one)"""
+        entry = self.manifest()["versions"].get(version)
+        if entry is None:
+            raise KeyError(f"Unknown model version: {version}")
+        return str(self.root / version / entry["model_file"])
+    
+    def register(self, model_dir: str, version: Optional[str] = None, activate: bool = False,
+                 notes: str = "") -> str:
+        """Copy a saved model into a new version directory and record it in the manifest"""
+        version = version or time.strftime("%Y%m%d-%H%M%S")
+        target = self.root / version
+        if target.exists():
+            raise ValueError(f"Model version already exists: {version}")
+        
+        files = [name for name in MODEL_FILES if (Path(model_dir) / name).exists()]
+        if "cricket_model.pkl" not in files and "cricket_model.npz" not in files:
+            raise FileNotFoundError(f"No model file in {model_dir}")
+        
+        # Copy into a temporary directory and rename, so a version is complete or absent
+        staging = self.root / f".{version}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name in files:
+            shutil.copy2(Path(model_dir) / name, staging / name)
+        os.replace(staging, target)
+        
+        manifest = self.manifest()
+        manifest["versions"][version] = {
+            "model_file": "cricket_model.pkl" if "cricket_model.pkl" in files else "cricket_model.npz",
+            "files": files,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "notes": notes,
+        }
+        if activate or manifest.get("active") is None:
+            manifest["active"] = version
+        self._write_manifest(manifest)
+        logger.info(f"Registered model version {version} (active: {manifest['active']})")
+        return version
+    
+    def set_active(self, version: str):
+        manifest = self.manifest()
+        if version not in manifest["versions"]:
+            raise KeyError(f"Unknown model version: {version}")
+        manifest["active"] = version
+        self._write_manifest(manifest)
+    
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{MANIFEST_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.root / MANIFEST_FILE)
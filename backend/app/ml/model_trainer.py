@@ -1,7 +1,9 @@
 import pandas as pd
+import numpy as np
 import joblib
 import os
 from pathlib import Path
+from typing import Optional
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.ensemble import RandomForestClassifier
@@ -9,13 +11,38 @@ from sklearn.metrics import accuracy_score, classification_report
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
+from sklearn.base import clone
+from app.ml.compact_model import CompactModel, COMPACT_SUFFIX
+from app.ml.training_profile import PhaseProfiler
+from app.ml.model_tuning import successive_halving, format_report
+from app.ml.incremental import check_sklearn_version, extend_vocabulary, renumber_features, add_trees
+
+# Numerical columns that hold whole numbers; stored as int16 when they have no gaps
+INTEGER_FEATURES = ('runs_required', 'balls_remaining', 'wickets_in_hand', 'target_match')
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+def _float32(X):
+    """Preprocessor output as float32 (the trees' split dtype), sparse or dense as it came"""
+    return X.astype(np.float32) if hasattr(X, 'toarray') else np.asarray(X, dtype=np.float32)
 
 class CricketModelTrainer:
     """
     Train and save the cricket match prediction model
     """
     
-    def __init__(self):
+    def __init__(self, compact_schema: bool = False, n_jobs: int = -1, chunksize: Optional[int] = None):
+        """
+        Args:
+            compact_schema: Load categoricals as ``category`` and numerics as
+                int16/float32 instead of object/float64 columns
+            n_jobs: Cores used to fit the forest (-1 = all)
+            chunksize: Rows per CSV chunk when loading with the compact schema,
+                bounding the memory spent on raw strings (None = single pass)
+        """
+        self.compact_schema = compact_schema
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+        self.profiler = PhaseProfiler()
         self.categorical_features = ['batting_team', 'bowling_team', 'venue', 'toss_winner', 'toss_decision']
         self.numerical_features = ['runs_required', 'balls_remaining', 'wickets_in_hand', 
                                    'target_match', 'current_run_rate', 'required_run_rate']
@@ -52,43 +79,98 @@ class CricketModelTrainer:
                 n_estimators=100,
                 max_depth=20,
                 min_samples_split=5,
-                min_samples_leaf=2
+                min_samples_leaf=2,
+                n_jobs=self.n_jobs
             ))
         ])
         
         return self.model
     
+    def load_data(self, data_path: str) -> pd.DataFrame:
+        """
+        Read the feature file (CSV, or Parquet when the path ends in .parquet)
+        
+        Only the model columns are read. With the compact schema, string
+        columns become ``category`` and numerics int16/float32; CSV files are
+        optionally parsed in chunks whose categories are merged at the end.
+        """
+        columns = self.categorical_features + self.numerical_features + [self.target]
+        if str(data_path).lower().endswith(PARQUET_SUFFIXES):
+            # Requires pyarrow or fastparquet
+            df = pd.read_parquet(data_path, columns=columns)
+            return self._apply_schema(df) if self.compact_schema else df
+        
+        if not self.compact_schema:
+            return pd.read_csv(data_path)
+        
+        dtypes = {name: 'category' for name in self.categorical_features}
+        dtypes.update({name: np.float32 for name in self.numerical_features})
+        if not self.chunksize:
+            return self._apply_schema(pd.read_csv(data_path, usecols=columns, dtype=dtypes))
+        
+        chunks = list(pd.read_csv(data_path, usecols=columns, dtype=dtypes, chunksize=self.chunksize))
+        data = {}
+        for name in columns:
+            if name in self.categorical_features:
+                data[name] = pd.api.types.union_categoricals([chunk[name] for chunk in chunks])
+            else:
+                data[name] = np.concatenate([chunk[name].to_numpy(dtype=np.float32) for chunk in chunks])
+        return self._apply_schema(pd.DataFrame(data, columns=columns))
+    
+    def _apply_schema(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast to the compact schema in place of the inferred dtypes"""
+        for name in self.categorical_features:
+            if not isinstance(df[name].dtype, pd.CategoricalDtype):
+                df[name] = df[name].astype('category')
+        for name in self.numerical_features:
+            values = df[name].astype(np.float32)
+            if name in INTEGER_FEATURES and not values.isna().any() \
+                    and values.between(np.iinfo(np.int16).min, np.iinfo(np.int16).max).all():
+                values = values.astype(np.int16)
+            df[name] = values
+        df[self.target] = df[self.target].astype(np.int8)
+        return df
+    
     def train(self, data_path: str):
         """Train the model on cricket data"""
         try:
             # Load data
-            df = pd.read_csv(data_path)
-            print(f"Loaded data with shape: {df.shape}")
+            with self.profiler.phase("load"):
+                df = self.load_data(data_path)
+            print(f"Loaded data with shape: {df.shape} ({df.memory_usage(deep=True).sum() / 2**20:.1f} MiB)")
             
             # Create model pipeline
             self.create_model_pipeline()
             
-            # Split features and target
-            X = df[self.categorical_features + self.numerical_features]
-            y = df[self.target]
-            
-            # Train-test split
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
+            with self.profiler.phase("split"):
+                # Split features and target
+                X = df[self.categorical_features + self.numerical_features]
+                y = df[self.target]
+                
+                # Train-test split
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=0.2, random_state=42, stratify=y
+                )
+                del df, X, y
             
             # Train model
-            print("Training model...")
-            self.model.fit(X_train, y_train)
+            print(f"Training model (n_jobs={self.n_jobs})...")
+            with self.profiler.phase("fit"):
+                self.model.fit(X_train, y_train)
             print("Model training complete.")
             
             # Evaluate
-            y_pred = self.model.predict(X_test)
-            accuracy = accuracy_score(y_test, y_pred)
+            with self.profiler.phase("evaluate"):
+                y_pred = self.model.predict(X_test)
+                accuracy = accuracy_score(y_test, y_pred)
+            # Served predictions score a few rows at a time; a thread pool per call only adds overhead
+            self.model.set_params(classifier__n_jobs=None)
             
             print(f"\nAccuracy: {accuracy:.4f}")
             print("\nClassification Report:")
             print(classification_report(y_test, y_pred))
+            print("\nTraining phases:")
+            print(self.profiler.report())
             
             return self.model, accuracy
             
@@ -96,8 +178,97 @@ class CricketModelTrainer:
             print(f"Error during training: {e}")
             raise
     
-    def save_model(self, model_dir: str = "models"):
-        """Save the trained model"""
+    def tune(self, data_path: str, budget_seconds: Optional[float] = None, cv: int = 3,
+             finalists: int = 6):
+        """
+        Search forest size/depth and histogram gradient boosting candidates
+        
+        Uses the same holdout split as ``train``; candidates are compared by
+        cross-validation on the training part (see app/ml/model_tuning.py).
+        The preprocessor is fitted once on the training part and shared by
+        all candidates. Returns the report dictionary; nothing is saved.
+        """
+        with self.profiler.phase("load"):
+            df = self.load_data(data_path)
+        print(f"Loaded data with shape: {df.shape}")
+        
+        self.create_model_pipeline()
+        with self.profiler.phase("split"):
+            X_train, X_test, y_train, y_test = train_test_split(
+                df[self.categorical_features + self.numerical_features], df[self.target],
+                test_size=0.2, random_state=42, stratify=df[self.target]
+            )
+            del df
+            preprocessor = clone(self.preprocessor).fit(X_train)
+            # Sparse one-hot output stays sparse; only candidates needing dense rows densify them
+            X_train = _float32(preprocessor.transform(X_train))
+            X_test = _float32(preprocessor.transform(X_test))
+        
+        print(f"Tuning (n_jobs={self.n_jobs}, cv={cv}, budget={budget_seconds or 'none'})...")
+        with self.profiler.phase("tune"):
+            report = successive_halving(X_train, np.asarray(y_train), X_test, np.asarray(y_test),
+                                        cv=cv, n_jobs=self.n_jobs, budget_seconds=budget_seconds,
+                                        finalists=finalists)
+        
+        print("\nFinalists (holdout log-loss/accuracy, single-thread latency; * = Pareto front):")
+        print(format_report(report))
+        print("\nTraining phases:")
+        print(self.profiler.report())
+        return report
+    
+    def load_model(self, model_dir: str = "models"):
+        """Load a previously saved pipeline to update it"""
+        self.model = joblib.load(os.path.join(model_dir, "cricket_model.pkl"))
+        self.preprocessor = self.model.named_steps['preprocessor']
+        return self.model
+    
+    def update(self, data_path: str, n_new_trees: int = 20, max_trees: Optional[int] = None):
+        """
+        Extend the loaded model with new rows only
+        
+        Teams and venues not in the one-hot vocabulary are added and the
+        existing trees renumbered to the widened feature layout; then
+        ``n_new_trees`` trees are fitted on the new rows alone and appended
+        to the forest. With ``max_trees`` the oldest trees beyond that count
+        are dropped, so the ensemble stays bounded and recent matches gain
+        weight. Cost depends on the new rows, not on the full history.
+        """
+        if self.model is None:
+            raise ValueError("No model to update. Load or train the model first.")
+        check_sklearn_version()
+        classifier = self.model.named_steps['classifier']
+        if not isinstance(classifier, RandomForestClassifier):
+            raise ValueError(f"Incremental updates need a random forest, not {type(classifier).__name__}")
+        
+        with self.profiler.phase("load"):
+            df = self.load_data(data_path)
+        print(f"Loaded {len(df)} new rows")
+        
+        X_new = df[self.categorical_features + self.numerical_features]
+        y_new = np.asarray(df[self.target])
+        with self.profiler.phase("encode"):
+            column_map = extend_vocabulary(self.preprocessor, X_new, self.categorical_features)
+            if column_map is not None:
+                n_features = len(self.preprocessor.get_feature_names_out())
+                renumber_features(classifier, column_map, n_features)
+                print(f"Vocabulary extended to {n_features} features")
+            X_encoded = self.preprocessor.transform(X_new)
+        
+        with self.profiler.phase("fit"):
+            summary = add_trees(classifier, X_encoded, y_new, n_new_trees, max_trees, n_jobs=self.n_jobs)
+        print(f"Trees: {summary['trees_before']} + {summary['trees_added']} new "
+              f"- {summary['trees_dropped']} oldest = {summary['trees']}")
+        print("\nUpdate phases:")
+        print(self.profiler.report())
+        return summary
+    
+    def save_model(self, model_dir: str = "models", compact: bool = False):
+        """
+        Save the trained model
+        
+        With ``compact=True`` a pickle-free artifact (cricket_model.npz) is
+        written next to the pickle; point MODEL_PATH at it to serve it.
+        """
         if self.model is None:
             raise ValueError("No model to save. Train the model first.")
         
@@ -118,6 +289,11 @@ class CricketModelTrainer:
         joblib.dump(info, info_path)
         print(f"Model info saved to: {info_path}")
         
+        if compact:
+            compact_path = os.path.join(model_dir, "cricket_model" + COMPACT_SUFFIX)
+            CompactModel.from_pipeline(self.model, info).save(compact_path)
+            print(f"Compact model saved to: {compact_path}")
+        
         return model_path
 
 if __name__ == "__main__":
@@ -0,0 +1,236 @@
+import math
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import StratifiedKFold
+from threadpoolctl import threadpool_limits
+from app.ml.forest_engine import CompiledForest
+
+# Successive halving keeps the best 1/HALVING_FACTOR of candidates per round
+# and gives the survivors HALVING_FACTOR times more training rows
+HALVING_FACTOR = 3
+SINGLE_ROW_REPEATS = 200
+BATCH_ROWS = 1000
+BATCH_REPEATS = 10
+
+
+def default_candidates() -> Dict[str, Any]:
+    """Forest size/depth grid plus histogram gradient boosting alternatives"""
+    candidates = {}
+    for n_estimators in (25, 50, 100, 200):
+        for max_depth in (8, 12, 20, None):
+            name = f"rf-{n_estimators}-{max_depth or 'full'}"
+            candidates[name] = RandomForestClassifier(
+                n_estimators=n_estimators, max_depth=max_depth, min_samples_split=5,
+                min_samples_leaf=2, random_state=42,
+            )
+    for max_iter in (100, 300):
+        for max_leaf_nodes in (15, 31):
+            name = f"hgb-{max_iter}-{max_leaf_nodes}"
+            candidates[name] = HistGradientBoostingClassifier(
+                max_iter=max_iter, max_leaf_nodes=max_leaf_nodes, learning_rate=0.1,
+                early_stopping=False, random_state=42,
+            )
+    return candidates
+
+
+def _input_for(estimator, X):
+    """
+    ``X`` as ``estimator`` takes it: forests fit sparse one-hot matrices
+    directly, gradient boosting needs dense rows (densified per call, so
+    only the rows in use are materialized)
+    """
+    if hasattr(X, 'toarray') and isinstance(estimator, HistGradientBoostingClassifier):
+        return X.toarray()
+    return X
+
+
+def _score_fold(name: str, estimator, X, y: np.ndarray, train_idx: np.ndarray,
+                valid_idx: np.ndarray, deadline: Optional[float]) -> Optional[Dict[str, Any]]:
+    """Fit one candidate on one fold; skipped (None) once the budget is spent"""
+    if deadline is not None and time.monotonic() > deadline:
+        return None
+    model = clone(estimator)
+    started = time.perf_counter()
+    model.fit(_input_for(model, X[train_idx]), y[train_idx])
+    fit_seconds = time.perf_counter() - started
+    probabilities = model.predict_proba(_input_for(model, X[valid_idx]))
+    return {
+        "name": name,
+        "log_loss": log_loss(y[valid_idx], probabilities, labels=model.classes_),
+        "accuracy": accuracy_score(y[valid_idx], model.classes_[np.argmax(probabilities, axis=1)]),
+        "fit_seconds": fit_seconds,
+    }
+
+
+def _measure_latency(model, X) -> Dict[str, float]:
+    """
+    Median single-row and batch predict_proba time on dense rows, as
+    served, with native thread pools (OpenMP in gradient boosting, BLAS)
+    limited to one thread so every candidate is timed on one core
+    """
+    single = X[:1]
+    batch = X[np.arange(BATCH_ROWS) % X.shape[0]]
+    if hasattr(X, 'toarray'):
+        single, batch = single.toarray(), batch.toarray()
+    
+    def median_seconds(fn, repeats):
+        fn()
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        return float(np.median(timings))
+    
+    with threadpool_limits(limits=1):
+        latency = {
+            "single_row_ms": median_seconds(lambda: model.predict_proba(single), SINGLE_ROW_REPEATS) * 1000,
+            "batch_ms": median_seconds(lambda: model.predict_proba(batch), BATCH_REPEATS) * 1000,
+        }
+        if isinstance(model, RandomForestClassifier):
+            # INFERENCE_ENGINE=compiled serves forests from the flattened arrays
+            forest = CompiledForest.from_sklearn(model)
+            latency["single_row_compiled_ms"] = median_seconds(lambda: forest.predict_proba(single),
+                                                               SINGLE_ROW_REPEATS) * 1000
+            latency["batch_compiled_ms"] = median_seconds(lambda: forest.predict_proba(batch),
+                                                          BATCH_REPEATS) * 1000
+    return latency
+
+
+def pareto_front(results: List[Dict[str, Any]], objectives=("log_loss", "single_row_ms")) -> List[str]:
+    """Names of candidates no other candidate beats on every objective (lower is better)"""
+    front = []
+    for a in results:
+        dominated = any(
+            all(b[key] <= a[key] for key in objectives) and any(b[key] < a[key] for key in objectives)
+            for b in results if b is not a
+        )
+        if not dominated:
+            front.append(a["name"])
+    return front
+
+
+def successive_halving(X, y: np.ndarray, X_holdout, y_holdout: np.ndarray,
+                       candidates: Optional[Dict[str, Any]] = None, cv: int = 3, n_jobs: int = -1,
+                       budget_seconds: Optional[float] = None, finalists: int = 6,
+                       log=print) -> Dict[str, Any]:
+    """
+    Cross-validated search that drops weak candidates early
+    
+    ``X`` and ``X_holdout`` may be sparse (the one-hot preprocessor output);
+    they are only densified for candidates that need dense input.
+    
+    Every candidate starts on a small random sample of rows. After each round
+    the best third by mean validation log-loss continues on three times
+    as many rows, until the survivors are scored on all rows. (candidate,
+    fold) fits run in parallel across cores. Once ``budget_seconds`` is
+    spent, fits not yet started are skipped and the search stops with the
+    candidates ranked so far.
+    
+    Up to ``finalists`` survivors are refitted on all of ``X`` and
+    evaluated on the holdout set, with single-row and batch latency
+    measured on one core; this comes after, and outside, the budget.
+    The report marks the (log-loss, single-row latency) Pareto front.
+    """
+    candidates = candidates or default_candidates()
+    started = time.monotonic()
+    deadline = started + budget_seconds if budget_seconds else None
+    rng = np.random.default_rng(42)
+    
+    n_rounds = max(1, math.ceil(math.log(len(candidates), HALVING_FACTOR)))
+    alive = list(candidates)
+    rounds = []
+    scores: Dict[str, Dict[str, float]] = {}
+    
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for round_index in range(n_rounds):
+            n_samples = min(len(y), int(len(y) / HALVING_FACTOR ** (n_rounds - 1 - round_index)))
+            sample = np.sort(rng.choice(len(y), size=n_samples, replace=False))
+            X_round, y_round = X[sample], y[sample]
+            folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=round_index)
+                         .split(X_round, y_round))
+            
+            fold_results = parallel(
+                delayed(_score_fold)(name, candidates[name], X_round, y_round, train_idx, valid_idx, deadline)
+                for name in alive for train_idx, valid_idx in folds
+            )
+            
+            completed = {}
+            for result in fold_results:
+                if result is not None:
+                    completed.setdefault(result["name"], []).append(result)
+            round_scores = {
+                name: {
+                    "log_loss": float(np.mean([r["log_loss"] for r in results])),
+                    "accuracy": float(np.mean([r["accuracy"] for r in results])),
+                    "fit_seconds": float(np.mean([r["fit_seconds"] for r in results])),
+                    "rows": n_samples,
+                }
+                for name, results in completed.items() if len(results) == cv
+            }
+            scores.update(round_scores)
+            rounds.append({"rows": n_samples, "candidates": len(alive), "scored": len(round_scores)})
+            log(f"Round {round_index + 1}/{n_rounds}: {len(round_scores)}/{len(alive)} candidates "
+                f"on {n_samples} rows ({time.monotonic() - started:.1f}s)")
+            
+            budget_spent = deadline is not None and time.monotonic() > deadline
+            ranked = sorted(round_scores, key=lambda name: round_scores[name]["log_loss"])
+            if budget_spent or not ranked:
+                # Keep the best candidates ranked so far
+                alive = ranked or sorted((name for name in alive if name in scores),
+                                         key=lambda name: scores[name]["log_loss"])
+                break
+            if round_index < n_rounds - 1:
+                alive = ranked[:max(1, math.ceil(len(ranked) / HALVING_FACTOR))]
+            else:
+                alive = ranked
+    
+    results = []
+    for name in alive[:finalists]:
+        model = clone(candidates[name])
+        model.fit(_input_for(model, X), y)
+        probabilities = model.predict_proba(_input_for(model, X_holdout))
+        result = {
+            "name": name,
+            "params": {key: value for key, value in model.get_params().items()
+                       if key in ("n_estimators", "max_depth", "max_iter", "max_leaf_nodes", "learning_rate")},
+            "cv_log_loss": scores[name]["log_loss"],
+            "cv_accuracy": scores[name]["accuracy"],
+            "cv_rows": scores[name]["rows"],
+            "log_loss": float(log_loss(y_holdout, probabilities, labels=model.classes_)),
+            "accuracy": float(accuracy_score(y_holdout, model.classes_[np.argmax(probabilities, axis=1)])),
+            # Only forests run on the compiled engine, tree-path attribution and the compact artifact
+            "compiled_engine": isinstance(model, RandomForestClassifier),
+        }
+        result.update(_measure_latency(model, X_holdout))
+        results.append(result)
+    
+    front = pareto_front(results)
+    for result in results:
+        result["pareto"] = result["name"] in front
+    
+    return {
+        "seconds": time.monotonic() - started,
+        "budget_seconds": budget_seconds,
+        "budget_exhausted": deadline is not None and time.monotonic() > deadline,
+        "rounds": rounds,
+        "cv_scores": scores,
+        "finalists": results,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    header = (f"{'Candidate':<16} {'CV logloss':>10} {'Logloss':>8} {'Accuracy':>8} "
+              f"{'1 row ms':>9} {'1k rows ms':>10} {'Compiled 1 row':>14} {'Pareto':>6}")
+    lines = [header]
+    for r in report["finalists"]:
+        compiled = f"{r['single_row_compiled_ms']:.3f}" if "single_row_compiled_ms" in r else "-"
+        lines.append(f"{r['name']:<16} {r['cv_log_loss']:>10.4f} {r['log_loss']:>8.4f} {r['accuracy']:>8.4f} "
+                     f"{r['single_row_ms']:>9.3f} {r['batch_ms']:>10.2f} {compiled:>14} "
+                     f"{'*' if r['pareto'] else '':>6}")
+    return "\n".join(lines)
@@ -0,0 +1,90 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Features that take team names; aliases under "teams" apply to all of them
+TEAM_FEATURES = ('batting_team', 'bowling_team', 'toss_winner')
+VENUE_FEATURES = ('venue',)
+# Resolved spellings remembered per feature (bounds memory on arbitrary input)
+MEMO_SIZE = 4096
+
+
+def normalize(name: str) -> str:
+    """Case- and punctuation-insensitive key: "Lord's" and "LORDS" both become "lords" """
+    return "".join(ch for ch in name.casefold() if ch.isalnum())
+
+
+class NameResolver:
+    """
+    Maps team and venue spellings to the categories the model was trained on
+    
+    OneHotEncoder(handle_unknown='ignore') turns an unknown name into an
+    all-zero vector, so "india", "IND" or "Eden Gardens, Kolkata" would be
+    scored as an unseen team or venue. Names are matched exactly first,
+    then by their normalized form, then through the alias table, and for
+    venues by the ground name alone (either side may be "Ground, City").
+    Names that still do not match are passed through unchanged.
+    """
+    
+    def __init__(self, vocabularies: Dict[str, List[str]], aliases: Optional[Dict[str, Dict[str, str]]] = None):
+        self.vocabularies = vocabularies
+        self._known = {feature: frozenset(values) for feature, values in vocabularies.items()}
+        self._normalized = {feature: {normalize(str(value)): value for value in values}
+                            for feature, values in vocabularies.items()}
+        # Cricsheet venues are "Ground, City"; the ground alone also matches
+        # unless two known venues share it
+        for feature in VENUE_FEATURES:
+            grounds: Dict[str, List[str]] = {}
+            for value in vocabularies.get(feature, ()):
+                if isinstance(value, str) and "," in value:
+                    grounds.setdefault(normalize(value.split(",", 1)[0]), []).append(value)
+            for ground, values in grounds.items():
+                if len(values) == 1:
+                    self._normalized[feature].setdefault(ground, values[0])
+        
+        # Only aliases whose target the model knows are kept, keyed by feature group
+        self.aliases: Dict[str, Dict[str, str]] = {}
+        for group, features in (("teams", TEAM_FEATURES), ("venues", VENUE_FEATURES)):
+            for alias, target in (aliases or {}).get(group, {}).items():
+                for feature in features:
+                    canonical = self._normalized.get(feature, {}).get(normalize(target))
+                    if canonical is not None:
+                        self._normalized[feature].setdefault(normalize(alias), canonical)
+                        self.aliases.setdefault(group, {})[alias] = canonical
+        self._memo: Dict[str, Dict[str, Any]] = {feature: {} for feature in vocabularies}
+    
+    @classmethod
+    def load(cls, vocabularies: Dict[str, List[str]], aliases_path: Optional[str]) -> "NameResolver":
+        aliases = {}
+        if aliases_path and Path(aliases_path).exists():
+            with open(aliases_path) as f:
+                aliases = json.load(f)
+        return cls(vocabularies, aliases)
+    
+    def resolve(self, feature: str, value: Any) -> Any:
+        """Canonical name for ``value``, or ``value`` itself when nothing matches"""
+        known = self._known.get(feature)
+        if known is None or value in known or not isinstance(value, str):
+            return value
+        memo = self._memo[feature]
+        resolved = memo.get(value)
+        if resolved is None:
+            normalized = self._normalized[feature]
+            resolved = normalized.get(normalize(value))
+            if resolved is None and "," in value:
+                resolved = normalized.get(normalize(value.split(",", 1)[0]))
+            if resolved is None:
+                resolved = value
+            if len(memo) < MEMO_SIZE:
+                memo[value] = resolved
+        return resolved
+    
+    def resolve_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve every categorical feature of a mapped input row in place"""
+        for feature in self._known:
+            if feature in row:
+                row[feature] = self.resolve(feature, row[feature])
+        return row
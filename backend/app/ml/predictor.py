@@ -1,31 +1,63 @@
-import joblib
-import pandas as pd
+import hashlib
+import importlib.util
 import numpy as np
 import os
+import time
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import logging
+from app.config import settings
+from app.metrics import record_event, stage
+from app.ml.forest_engine import CompiledForest
+from app.ml.feature_encoder import FeatureEncoder
+from app.ml.compact_model import CompactModel, COMPACT_SUFFIX
+from app.ml.lookup_tables import KEY_FEATURES, LookupTables
+from app.ml.name_resolver import NameResolver
 
 # Logger
 logger = logging.getLogger(__name__)
 
-# SHAP is optional - use feature importance if not available
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
-    logger.debug("SHAP not available. Using feature importance instead.")
+# SHAP is optional - use tree-path attribution if not available. It is only
+# imported when a model is loaded with the SHAP explainer, and pandas only for
+# the sklearn preprocessing path, so importing this module (and the app) stays
+# cheap; a compact model served by the compiled engine needs neither.
+SHAP_AVAILABLE = importlib.util.find_spec("shap") is not None
+if not SHAP_AVAILABLE:
+    logger.debug("SHAP not available. Using tree-path attribution instead.")
+
+# Explanation entries returned for explain="top-k"
+DEFAULT_TOP_K = 10
+
+class ModelNotLoadedError(RuntimeError):
+    """Raised by operations that need a real model instead of mock predictions"""
 
 class CricketPredictor:
     """
     Load trained model and make predictions with SHAP explanations
     """
     
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, inference_engine: str = None, model_version: str = None):
         self.model = None
         self.model_info = None
         self.explainer = None
+        self.explainer_kind = None
+        self.forest = None
+        self.engine = None
+        self.encoder = None
+        # Registry version name; otherwise derived from the model file
+        self.model_version = None
+        self.version_name = model_version
+        self.lookup_tables = None
+        # Known categories per feature, and the resolver mapping input names onto them
+        self.vocabularies = {}
+        self.name_resolver = None
+        self.load_seconds = None
+        self.feature_names = []
+        self.display_names = []
+        self.inference_engine = inference_engine or settings.inference_engine
+        
+        if model_path is None:
+            model_path = settings.model_path
         
         if model_path is None:
             # Default path
@@ -33,14 +65,23 @@ class CricketPredictor:
             model_path = base_dir / "models" / "cricket_model.pkl"
         
         self.model_path = model_path
+        started = time.perf_counter()
         self.load_model()
+        self.load_seconds = time.perf_counter() - started
     
     def load_model(self):
         """Load the trained model"""
         try:
-            if os.path.exists(self.model_path):
-                self.model = joblib.load(self.model_path)
-                logger.debug(f"Model loaded from: {self.model_path}")
+            if os.path.exists(self.model_path) and str(self.model_path).endswith(COMPACT_SUFFIX):
+                self._load_compact_model()
+            elif os.path.exists(self.model_path):
+                # joblib (and, through the pickle, sklearn) is only needed for pickled models
+                import joblib
+                # Large arrays in an uncompressed dump are mapped instead of copied
+                # (sklearn copies tree nodes into its own buffers regardless)
+                self.model = joblib.load(self.model_path, mmap_mode='r' if settings.model_mmap else None)
+                self.model_version = self.version_name or self._file_version(self.model_path)
+                logger.debug(f"Model loaded from: {self.model_path} (version {self.model_version})")
                 
                 # Load model info
                 info_path = str(self.model_path).replace("cricket_model.pkl", "model_info.pkl")
@@ -48,8 +89,23 @@ class CricketPredictor:
                     self.model_info = joblib.load(info_path)
                     logger.debug(f"Model info loaded from: {info_path}")
                 
+                # Feature names are fixed for a fitted model
+                self._initialize_feature_names()
+                
                 # Initialize SHAP explainer
                 self._initialize_explainer()
+                
+                # Compile the forest for the array-backed engine or tree-path attribution
+                self._initialize_engine()
+                
+                # Precompute the pandas-free feature encoder
+                self._initialize_encoder()
+                
+                # Category vocabularies and the team/venue name resolver
+                self._initialize_vocabulary()
+                
+                # Precomputed probability tables for probability-only requests
+                self._initialize_lookup_tables()
             else:
                 logger.warning(f"Model file not found: {self.model_path}")
                 logger.debug("Using mock predictions. Train the model first using model_trainer.py")
@@ -57,43 +113,246 @@ class CricketPredictor:
             logger.exception(f"Error loading model: {e}")
             logger.debug("Using mock predictions")
     
+    def _load_compact_model(self):
+        """Load a pickle-free compact artifact (see app/ml/compact_model.py)"""
+        compact = CompactModel.load(self.model_path)
+        self.model = None
+        self.model_version = self.version_name or self._file_version(self.model_path)
+        self.model_info = compact.model_info
+        self.feature_names = compact.feature_names
+        self.display_names = [self._clean_feature_name(name) for name in self.feature_names]
+        
+        # The compact artifact is served by the compiled forest and fast encoder only
+        self.forest = compact.forest
+        self.engine = compact.forest
+        self.encoder = compact.encoder
+        self.explainer = None
+        self.explainer_kind = "tree-path"
+        self._initialize_vocabulary()
+        self._initialize_lookup_tables()
+        logger.debug(f"Compact model loaded from: {self.model_path} (version {self.model_version})")
+    
+    @property
+    def loaded(self) -> bool:
+        """True when a real model (pickled pipeline or compact artifact) is available"""
+        return self.model is not None or self.engine is not None
+    
+    def _file_version(self, path) -> str:
+        """Short identifier that changes whenever the model file is replaced"""
+        stat = os.stat(path)
+        fingerprint = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+    
     def _initialize_explainer(self):
-        """Initialize SHAP explainer for the model"""
-        if not SHAP_AVAILABLE:
-            logger.debug("SHAP not available. Will use feature importance instead.")
-            self.explainer = None
+        """
+        Choose the explanation backend: SHAP TreeExplainer, or built-in
+        tree-path attribution when SHAP is unavailable or not selected
+        """
+        self.explainer = None
+        self.explainer_kind = "tree-path"
+        mode = settings.explainer
+        
+        if mode == "shap" or (mode == "auto" and SHAP_AVAILABLE):
+            if not SHAP_AVAILABLE:
+                logger.warning("EXPLAINER=shap but SHAP is not installed. Using tree-path attribution.")
+                return
+            try:
+                import shap
+                # Get the classifier from the pipeline
+                classifier = self.model.named_steps['classifier']
+                # Create a SHAP explainer using the classifier
+                self.explainer = shap.TreeExplainer(classifier)
+                self.explainer_kind = "shap"
+                logger.debug("SHAP explainer initialized")
+            except Exception as e:
+                logger.warning(f"Could not initialize SHAP explainer, using tree-path attribution: {e}")
+                self.explainer = None
+    
+    def _initialize_engine(self):
+        """Compile the forest when the engine or tree-path attribution needs it"""
+        self.forest = None
+        self.engine = None
+        if self.inference_engine != "compiled" and self.explainer_kind != "tree-path":
             return
-            
+        
         try:
-            # Get the classifier from the pipeline
             classifier = self.model.named_steps['classifier']
-            # Create a SHAP explainer using the classifier
-            self.explainer = shap.TreeExplainer(classifier)
-            logger.debug("SHAP explainer initialized")
+            if settings.model_mmap:
+                self.forest = self._load_mapped_forest(classifier)
+            if self.forest is None:
+                self.forest = CompiledForest.from_sklearn(classifier)
+            logger.debug(f"Forest compiled ({self.forest.n_trees} trees)")
+        except Exception as e:
+            logger.warning(f"Could not compile forest, falling back to sklearn: {e}")
+            if self.explainer_kind == "tree-path":
+                self.explainer_kind = None
+            return
+        
+        if self.inference_engine == "compiled":
+            self.engine = self.forest
+    
+    def _load_mapped_forest(self, classifier) -> Optional[CompiledForest]:
+        """
+        Memory-map the compiled forest from a sidecar file next to the model,
+        writing it first if it is missing or belongs to another model version.
+        Workers mapping the same file share one copy of the node arrays.
+        """
+        forest_path = self._forest_path()
+        try:
+            if os.path.exists(forest_path):
+                forest, metadata = CompiledForest.load(forest_path, mmap_mode='r')
+                if metadata.get('model_version') == self.model_version:
+                    logger.debug(f"Compiled forest memory-mapped from: {forest_path}")
+                    return forest
+            
+            CompiledForest.from_sklearn(classifier).save(
+                forest_path, metadata={'model_version': self.model_version}
+            )
+            forest, _ = CompiledForest.load(forest_path, mmap_mode='r')
+            logger.debug(f"Compiled forest written and memory-mapped: {forest_path}")
+            return forest
+        except Exception as e:
+            logger.warning(f"Could not memory-map compiled forest, keeping it in process memory: {e}")
+            return None
+    
+    def _forest_path(self) -> str:
+        return str(Path(self.model_path).with_suffix('.forest.joblib'))
+    
+    def _initialize_encoder(self):
+        """Build the fast-path feature encoder and check it against the preprocessor"""
+        self.encoder = None
+        if not settings.fast_encoder:
+            return
+        
+        try:
+            preprocessor = self.model.named_steps['preprocessor']
+            encoder = FeatureEncoder.from_preprocessor(preprocessor)
+            
+            # Probe rows cover known, unknown and missing values
+            probe = [
+                {**{name: float('nan') for name in encoder.numerical_features},
+                 **{name: None for name in encoder.categorical_features}},
+                {**{name: float(i + 1) for i, name in enumerate(encoder.numerical_features)},
+                 **{name: "__unknown__" for name in encoder.categorical_features}},
+                {**{name: float(value) for name, value in zip(encoder.numerical_features, encoder.medians)},
+                 **{name: next(iter(index), None) for name, index in zip(encoder.categorical_features, encoder.category_index)}},
+            ]
+            import pandas as pd
+            expected = self._to_dense(preprocessor.transform(pd.DataFrame(probe)))
+            if not np.allclose(encoder.transform_batch(probe), expected, rtol=1e-9, atol=1e-12):
+                logger.warning("Fast feature encoder disagrees with preprocessor, using sklearn transform")
+                return
+            
+            self.encoder = encoder
+            logger.debug(f"Fast feature encoder initialized ({encoder.n_features} features)")
         except Exception as e:
-            logger.warning(f"Could not initialize SHAP explainer: {e}")
-            self.explainer = None
+            logger.warning(f"Could not build fast feature encoder, using sklearn transform: {e}")
+            self.encoder = None
+    
+    def _initialize_vocabulary(self):
+        """Extract the fitted encoder's categories once and build the name resolver"""
+        self.vocabularies = {}
+        self.name_resolver = None
+        try:
+            encoder = self.encoder
+            if encoder is None:
+                # FAST_ENCODER is off; the categories are read the same way from the preprocessor
+                encoder = FeatureEncoder.from_preprocessor(self.model.named_steps['preprocessor'])
+            self.vocabularies = encoder.vocabularies()
+        except Exception as e:
+            logger.warning(f"Could not read category vocabularies from the model: {e}")
+            return
+        
+        if settings.resolve_names:
+            aliases_path = settings.name_aliases_path
+            if aliases_path is None:
+                aliases_path = Path(__file__).parent.parent.parent / "name_aliases.json"
+            try:
+                self.name_resolver = NameResolver.load(self.vocabularies, aliases_path)
+            except Exception as e:
+                logger.warning(f"Could not load name aliases from {aliases_path}: {e}")
+                self.name_resolver = NameResolver(self.vocabularies)
     
-    def predict(self, input_data: Dict) -> Tuple[str, float, List[Dict]]:
+    def _initialize_lookup_tables(self):
+        """Map precomputed tables built for this model version, if configured"""
+        self.lookup_tables = None
+        directory = settings.lookup_tables_dir
+        if not directory:
+            return
+        
+        try:
+            tables = LookupTables.load(directory)
+        except Exception as e:
+            logger.warning(f"Could not load lookup tables from {directory}: {e}")
+            return
+        if tables.model_version != self.model_version:
+            logger.warning(f"Lookup tables in {directory} were built for model {tables.model_version}, "
+                           f"not {self.model_version}. Rebuild them with build_lookup_tables.py.")
+            return
+        if self.name_resolver is not None:
+            # Tables keyed by an alias or another spelling still match resolved requests
+            tables.tables = {
+                tuple(self.name_resolver.resolve(name, value) for name, value in zip(KEY_FEATURES, key)): table
+                for key, table in tables.tables.items()
+            }
+        self.lookup_tables = tables
+        logger.debug(f"Loaded {len(tables.tables)} lookup tables from {directory}")
+    
+    def _lookup_probability(self, input_data: Dict) -> Optional[float]:
+        """Batting-team win probability from the lookup tables, or None on a miss"""
+        if self.lookup_tables is None:
+            return None
+        try:
+            return self.lookup_tables.lookup(self._map_features(input_data))
+        except Exception as e:
+            logger.warning(f"Lookup table error, using the model: {e}")
+            return None
+    
+    def _predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities for every encoded row, using the configured engine"""
+        if self.engine is not None:
+            return self.engine.predict_proba(X)
+        return self.model.named_steps['classifier'].predict_proba(X)
+    
+    def _classes(self) -> np.ndarray:
+        if self.engine is not None:
+            return self.engine.classes
+        return self.model.classes_
+    
+    def predict(self, input_data: Dict, explain: str = "top-k",
+                top_k: int = DEFAULT_TOP_K) -> Tuple[str, float, List[Dict]]:
         """
         Make prediction and generate SHAP explanations
         
         Args:
             input_data: Dictionary with cricket match features
+            explain: "none", "top-k" (largest ``top_k`` contributions) or "full"
+            top_k: Number of explanation entries for "top-k"
             
         Returns:
             Tuple of (winner, probability, shap_values)
         """
-        if self.model is None:
-            return self._mock_prediction(input_data)
+        if not self.loaded:
+            return self._mock_prediction(input_data, explain, top_k)
+        
+        # Probability-only requests are answered from the tables when the key is covered
+        if explain == "none":
+            with stage("lookup"):
+                batting_team_win_probability = self._lookup_probability(input_data)
+            if batting_team_win_probability is not None:
+                record_event("lookup")
+                return self._resolve_winner(input_data, batting_team_win_probability), batting_team_win_probability, []
         
         try:
-            # Create DataFrame from input
-            df = self._prepare_input(input_data)
+            # Encode input into the model's feature space
+            with stage("prepare_input"):
+                X = self._prepare_input(input_data)
             
             # Get prediction probabilities
-            probabilities = self.model.predict_proba(df)[0]
-            prediction = self.model.predict(df)
+            # The class is derived from the probabilities so the forest is walked once
+            with stage("predict_proba"):
+                probabilities = self._predict_proba(X)[0]
+            prediction = self._classes()[np.argmax(probabilities)]
             
             # Debug logging
             logger.debug(f"probabilities array: {probabilities}")
@@ -113,28 +372,158 @@ class CricketPredictor:
             logger.debug(f"predicted_class_idx: {predicted_class_idx}")
             logger.debug(f"batting_team_win_prob: {batting_team_win_probability}")
             
-            # Determine winner based on which probability is higher
-            if batting_team_win_probability > 0.5:
-                winner = input_data.get('batting_team')
-            else:
-                winner = input_data.get('bowling_team')
-            
+            winner = self._resolve_winner(input_data, batting_team_win_probability)
             logger.debug(f"winner: {winner}")
             
             # Generate SHAP explanations
-            shap_values = self._get_shap_explanation(df)
+            with stage("explain"):
+                shap_values = self._get_shap_explanations([input_data], X, explain, top_k)[0]
+            record_event("model")
             
             # Return batting team's win probability (always 0-1 scale)
             return winner, float(batting_team_win_probability), shap_values
             
         except Exception as e:
             logger.exception(f"Error during prediction: {e}")
-            return self._mock_prediction(input_data)
+            return self._mock_prediction(input_data, explain, top_k)
+    
+    def predict_batch(self, inputs: List[Dict], explain: str = "top-k",
+                      top_k: int = DEFAULT_TOP_K) -> List[Union[Tuple[str, float, List[Dict]], Exception]]:
+        """
+        Make predictions for many match states with a single model call
+        
+        All rows are encoded into one feature matrix and scored with one
+        predict_proba call, and SHAP values are computed once for the whole
+        matrix. If the vectorized call fails, each row is retried on its
+        own so that one bad row does not fail the batch.
+        
+        Args:
+            inputs: List of dictionaries with cricket match features
+            explain: "none", "top-k" or "full", applied to every row
+            top_k: Number of explanation entries for "top-k"
+            
+        Returns:
+            List aligned with ``inputs``; each entry is either a
+            (winner, probability, shap_values) tuple or the exception
+            raised while scoring that row
+        """
+        if not inputs:
+            return []
+        
+        if not self.loaded:
+            return [self._mock_prediction(input_data, explain, top_k) for input_data in inputs]
+        
+        # Probability-only rows covered by the lookup tables skip the model
+        if explain == "none" and self.lookup_tables is not None:
+            with stage("lookup"):
+                looked_up = [self._lookup_probability(input_data) for input_data in inputs]
+            misses = [idx for idx, probability in enumerate(looked_up) if probability is None]
+            record_event("lookup", len(inputs) - len(misses))
+            scored = dict(zip(misses, self._score_batch([inputs[idx] for idx in misses], explain, top_k)))
+            return [scored[idx] if probability is None
+                    else (self._resolve_winner(inputs[idx], probability), probability, [])
+                    for idx, probability in enumerate(looked_up)]
+        
+        return self._score_batch(inputs, explain, top_k)
     
-    def _prepare_input(self, input_data: Dict) -> pd.DataFrame:
-        """Prepare input data for model prediction"""
-        # Map the API input to model features
-        data = {
+    def _score_batch(self, inputs: List[Dict], explain: str,
+                     top_k: int) -> List[Union[Tuple[str, float, List[Dict]], Exception]]:
+        """Vectorized model path of predict_batch"""
+        if not inputs:
+            return []
+        
+        try:
+            with stage("prepare_input"):
+                X = self._prepare_batch(inputs)
+            with stage("predict_proba"):
+                probabilities = self._predict_proba(X)[:, 1]
+        except Exception as e:
+            logger.warning(f"Vectorized batch prediction failed, scoring rows individually: {e}")
+            return [self._predict_row_strict(input_data, explain, top_k) for input_data in inputs]
+        
+        with stage("explain"):
+            explanations = self._get_shap_explanations(inputs, X, explain, top_k)
+        record_event("model", len(inputs))
+        
+        results = []
+        for idx, input_data in enumerate(inputs):
+            try:
+                batting_team_win_probability = float(probabilities[idx])
+                winner = self._resolve_winner(input_data, batting_team_win_probability)
+                results.append((winner, batting_team_win_probability, explanations[idx]))
+            except Exception as e:
+                logger.exception(f"Error building batch row {idx}: {e}")
+                results.append(e)
+        
+        return results
+    
+    def predict_proba_grid(self, base_input: Dict, numeric: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Batting-team win probability for many variations of one input
+        
+        The categorical part of ``base_input`` is encoded once and only the
+        numerical columns given in ``numeric`` (equal-length arrays) vary
+        between rows. All rows are scored in one model call.
+        """
+        if not self.loaded:
+            raise ModelNotLoadedError("Model not loaded")
+        
+        n_rows = len(next(iter(numeric.values())))
+        if self.encoder is not None:
+            X = np.repeat(self._prepare_input(base_input), n_rows, axis=0)
+            for j, name in enumerate(self.encoder.numerical_features):
+                if name in numeric:
+                    values = np.asarray(numeric[name], dtype=np.float64)
+                    values = np.where(np.isnan(values), self.encoder.medians[j], values)
+                    X[:, j] = (values - self.encoder.means[j]) / self.encoder.scales[j]
+        else:
+            rows = [dict(base_input, **{name: float(values[i]) for name, values in numeric.items()})
+                    for i in range(n_rows)]
+            X = self._prepare_batch(rows)
+        
+        return self._predict_proba(X)[:, 1]
+    
+    def _predict_row_strict(self, input_data: Dict, explain: str = "top-k",
+                            top_k: int = DEFAULT_TOP_K) -> Union[Tuple[str, float, List[Dict]], Exception]:
+        """Score a single row, returning the exception instead of a mock prediction"""
+        try:
+            X = self._prepare_input(input_data)
+            batting_team_win_probability = float(self._predict_proba(X)[0][1])
+            winner = self._resolve_winner(input_data, batting_team_win_probability)
+            shap_values = self._get_shap_explanations([input_data], X, explain, top_k)[0]
+            return winner, batting_team_win_probability, shap_values
+        except Exception as e:
+            logger.warning(f"Error predicting batch row: {e}")
+            return e
+    
+    def _resolve_winner(self, input_data: Dict, batting_team_win_probability: float) -> str:
+        """Determine winner based on which probability is higher"""
+        if batting_team_win_probability > 0.5:
+            return input_data.get('batting_team')
+        return input_data.get('bowling_team')
+    
+    def _prepare_input(self, input_data: Dict) -> np.ndarray:
+        """Prepare input data for model prediction as a one-row feature matrix"""
+        return self._prepare_batch([input_data])
+    
+    def _prepare_batch(self, inputs: List[Dict]) -> np.ndarray:
+        """Encode many inputs into one dense feature matrix"""
+        rows = [self._map_features(input_data) for input_data in inputs]
+        if self.encoder is not None:
+            return self.encoder.transform_batch(rows)
+        
+        # Slow path: run the fitted ColumnTransformer over a DataFrame
+        import pandas as pd
+        preprocessor = self.model.named_steps['preprocessor']
+        return self._to_dense(preprocessor.transform(pd.DataFrame(rows)))
+    
+    def _to_dense(self, X) -> np.ndarray:
+        """Densify sparse transformer output"""
+        return X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+    
+    def _map_features(self, input_data: Dict) -> Dict:
+        """Map the API input to model features"""
+        row = {
             'batting_team': input_data.get('batting_team', input_data.get('team1')),
             'bowling_team': input_data.get('bowling_team', input_data.get('team2')),
             'venue': input_data.get('venue'),
@@ -147,59 +536,83 @@ class CricketPredictor:
             'current_run_rate': input_data.get('current_run_rate', 6.0),
             'required_run_rate': input_data.get('required_run_rate', 7.5)
         }
-        
-        return pd.DataFrame([data])
+        if self.name_resolver is not None:
+            self.name_resolver.resolve_row(row)
+        return row
     
-    def _get_shap_explanation(self, df: pd.DataFrame) -> List[Dict]:
-        """Generate SHAP explanations for the prediction"""
-        if self.explainer is None:
-            return self._get_feature_importance_explanation(df)
+    def _get_shap_explanations(self, inputs: List[Dict], X_transformed: np.ndarray,
+                               explain: str = "top-k", top_k: int = DEFAULT_TOP_K) -> List[List[Dict]]:
+        """Generate SHAP explanations for every row with one explainer call"""
+        if explain == "none":
+            return [[] for _ in inputs]
+        
+        if self.explainer_kind is None:
+            return [self._limit_explanation(self._get_feature_importance_explanation(input_data), explain, top_k)
+                    for input_data in inputs]
         
         try:
-            # Transform the data using the preprocessor
-            preprocessor = self.model.named_steps['preprocessor']
-            X_transformed = preprocessor.transform(df)
-            
-            # Get SHAP values
-            shap_values_raw = self.explainer.shap_values(X_transformed)
-            
-            # For binary classification, take the values for class 1 (winning)
-            if isinstance(shap_values_raw, list):
-                shap_values_raw = shap_values_raw[1]
-            
-            # Get feature names
-            feature_names = self._get_feature_names()
-            
-            # Create list of top SHAP values
-            shap_list = []
-            for idx, value in enumerate(shap_values_raw[0]):
-                if abs(value) > 0.01:  # Only include significant features
-                    shap_list.append({
-                        'feature': feature_names[idx] if idx < len(feature_names) else f"feature_{idx}",
-                        'value': float(value),
-                        'impact': 'positive' if value > 0 else 'negative' if value < 0 else 'neutral'
-                    })
-            
-            # Sort by absolute value and take top 10
-            shap_list = sorted(shap_list, key=lambda x: abs(x['value']), reverse=True)[:10]
+            if self.explainer_kind == "tree-path":
+                # Exact path decomposition; contributions sum to probability minus base rate
+                _, shap_values_raw = self.forest.contributions(X_transformed, class_index=1)
+            else:
+                # Get SHAP values
+                shap_values_raw = self.explainer.shap_values(X_transformed)
+                
+                # For binary classification, take the values for class 1 (winning)
+                if isinstance(shap_values_raw, list):
+                    shap_values_raw = shap_values_raw[1]
+                elif np.ndim(shap_values_raw) == 3:
+                    shap_values_raw = shap_values_raw[:, :, 1]
             
-            return shap_list
+            return [self._format_contributions(row, explain, top_k) for row in np.asarray(shap_values_raw)]
             
         except Exception as e:
-            logger.exception(f"Error generating SHAP values: {e}")
-            return self._get_feature_importance_explanation(df)
+            logger.exception(f"Error generating {self.explainer_kind} explanation: {e}")
+            return [self._limit_explanation(self._get_feature_importance_explanation(input_data), explain, top_k)
+                    for input_data in inputs]
     
-    def _get_feature_importance_explanation(self, df: pd.DataFrame) -> List[Dict]:
+    def _format_contributions(self, contributions: np.ndarray, explain: str, top_k: int) -> List[Dict]:
+        """Turn one row of per-feature contributions into sorted explanation entries"""
+        if explain == "full":
+            indices = np.arange(len(contributions))
+        else:
+            # Only include significant features
+            indices = np.flatnonzero(np.abs(contributions) > 0.01)
+        
+        # Sort by absolute value
+        indices = indices[np.argsort(-np.abs(contributions[indices]), kind='stable')]
+        if explain != "full":
+            indices = indices[:top_k]
+        
+        names = self.display_names
+        shap_list = []
+        for idx in indices:
+            value = float(contributions[idx])
+            shap_list.append({
+                'feature': names[idx] if idx < len(names) else f"feature_{idx}",
+                'value': value,
+                'impact': 'positive' if value > 0 else 'negative' if value < 0 else 'neutral'
+            })
+        return shap_list
+    
+    def _limit_explanation(self, shap_values: List[Dict], explain: str, top_k: int) -> List[Dict]:
+        """Apply the explain option to an already sorted explanation list"""
+        if explain == "none":
+            return []
+        if explain == "full":
+            return shap_values
+        return shap_values[:top_k]
+    
+    def _get_feature_importance_explanation(self, input_data: Dict) -> List[Dict]:
         """
-        Alternative explanation using feature importance from RandomForest
-        combined with input values to create dynamic explanations.
-        Used when SHAP is not available.
+        Heuristic explanation from the raw input values.
+        Last resort when neither SHAP nor tree-path attribution is available.
         """
         try:
             import random
             
             # Get input data to create dynamic explanations
-            input_data = df.iloc[0]
+            input_data = self._map_features(input_data)
             
             # Extract actual input values
             runs_required = float(input_data.get('runs_required', 150))
@@ -261,13 +674,17 @@ class CricketPredictor:
             logger.exception(f"Error generating feature importance: {e}")
             return self._default_shap_values()
     
+    def _initialize_feature_names(self):
+        """Cache raw and display feature names once per loaded model"""
+        self.feature_names = self._get_feature_names()
+        self.display_names = [self._clean_feature_name(name) for name in self.feature_names]
+    
     def _clean_feature_name(self, name: str) -> str:
         """Clean up feature names for better readability"""
         # Remove prefixes from one-hot encoded features
-        if '_' in name:
-            parts = name.split('_', 1)
-            if parts[0] in ['batting_team', 'bowling_team', 'venue', 'toss_winner', 'toss_decision']:
-                return f"{parts[0].replace('_', ' ').title()}: {parts[1]}"
+        for prefix in ['batting_team', 'bowling_team', 'venue', 'toss_winner', 'toss_decision']:
+            if name.startswith(prefix + '_'):
+                return f"{prefix.replace('_', ' ').title()}: {name[len(prefix) + 1:]}"
         
         # Clean up numerical feature names
         name = name.replace('_', ' ').title()
@@ -304,10 +721,12 @@ class CricketPredictor:
             {'feature': 'current_run_rate', 'value': 0.06, 'impact': 'positive'},
         ]
     
-    def _mock_prediction(self, input_data: Dict) -> Tuple[str, float, List[Dict]]:
+    def _mock_prediction(self, input_data: Dict, explain: str = "top-k",
+                         top_k: int = DEFAULT_TOP_K) -> Tuple[str, float, List[Dict]]:
         """Mock prediction when model is not available"""
         import random
+        record_event("mock")
         probability = random.uniform(0.55, 0.85)
         winner = input_data.get('team1', input_data.get('batting_team', 'Team 1'))
-        shap_values = self._default_shap_values()
+        shap_values = self._limit_explanation(self._default_shap_values(), explain, top_k)
         return winner, probability, shap_values
@@ -0,0 +1,80 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+def _status_kib(field: str) -> Optional[int]:
+    """A memory field (VmRSS, VmHWM) of /proc/self/status in KiB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak() -> bool:
+    """Reset the kernel's peak RSS counter (Linux); False when unsupported"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_kib() -> Optional[int]:
+    """Peak RSS in KiB, or None where it is not available (Windows)"""
+    peak = _status_kib("VmHWM")
+    if peak is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak //= 1024
+    return peak
+
+
+class PhaseProfiler:
+    """
+    Wall time and peak resident memory of each training phase
+    
+    The peak is per phase where the kernel allows resetting the high-water
+    mark (Linux); elsewhere it is the process peak up to the end of the phase.
+    """
+    
+    def __init__(self):
+        self.phases: List[Dict] = []
+    
+    @contextmanager
+    def phase(self, name: str):
+        per_phase = _reset_peak()
+        rss_before = _status_kib("VmRSS")
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            rss_after = _status_kib("VmRSS")
+            peak = _peak_kib()
+            self.phases.append({
+                "phase": name,
+                "seconds": time.perf_counter() - started,
+                "peak_rss_mib": peak / 1024 if peak is not None else None,
+                "rss_delta_mib": (rss_after - rss_before) / 1024 if rss_before is not None else None,
+                "per_phase_peak": per_phase,
+            })
+    
+    def report(self) -> str:
+        lines = [f"{'Phase':<10} {'Wall (s)':>10} {'Peak RSS (MiB)':>15} {'RSS change (MiB)':>17}"]
+        for entry in self.phases:
+            peak, delta = entry["peak_rss_mib"], entry["rss_delta_mib"]
+            lines.append(f"{entry['phase']:<10} {entry['seconds']:>10.2f} "
+                         f"{peak if peak is not None else float('nan'):>15.1f} "
+                         f"{delta if delta is not None else float('nan'):>17.1f}")
+        return "\n".join(lines)
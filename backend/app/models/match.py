@@ -1,5 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, List
+from enum import Enum
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Optional, Dict, List
+
+class ExplainMode(str, Enum):
+    none = "none"  # probability only, no explanation
+    top_k = "top-k"  # largest contributions only
+    full = "full"  # every feature contribution
 
 class MatchInput(BaseModel):
     team1: str = Field(..., description="First team name (batting team)")
@@ -40,6 +46,7 @@ class PredictionResponse(BaseModel):
     confidence: str  # high, medium, low
     shap_explanation: List[ShapValue]
     factors: Dict[str, str]
+    model_version: Optional[str] = None  # version of the model that produced this prediction
     
     class Config:
         json_schema_extra = {
@@ -57,3 +64,144 @@ class PredictionResponse(BaseModel):
                 }
             }
         }
+
+class BatchPredictionRequest(BaseModel):
+    matches: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Match inputs to score, each following the MatchInput schema"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "matches": [
+                    {
+                        "team1": "India",
+                        "team2": "Australia",
+                        "venue": "Melbourne Cricket Ground",
+                        "runs_required": 80,
+                        "balls_remaining": 60,
+                        "wickets_in_hand": 6
+                    },
+                    {
+                        "team1": "England",
+                        "team2": "Pakistan",
+                        "venue": "Lord's",
+                        "runs_required": 120,
+                        "balls_remaining": 90,
+                        "wickets_in_hand": 4
+                    }
+                ]
+            }
+        }
+
+class BatchPredictionItem(BaseModel):
+    index: int  # position of the match in the request
+    prediction: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionItem]
+    succeeded: int
+    failed: int
+
+class ScenarioRange(BaseModel):
+    start: int = Field(0, ge=0, le=500, description="First value (inclusive)")
+    stop: int = Field(..., ge=0, le=500, description="Last value (inclusive)")
+    step: int = Field(1, ge=1, le=500, description="Increment between values")
+    
+    @model_validator(mode="after")
+    def _check_order(self) -> "ScenarioRange":
+        if self.stop < self.start:
+            raise ValueError("stop must not be less than start")
+        return self
+    
+    def __len__(self) -> int:
+        # Number of values without building the list
+        return len(range(self.start, self.stop + 1, self.step))
+    
+    def values(self) -> List[int]:
+        return list(range(self.start, self.stop + 1, self.step))
+
+class BallsRange(ScenarioRange):
+    start: int = Field(0, ge=0, le=300, description="First value (inclusive)")
+    stop: int = Field(..., ge=0, le=300, description="Last value (inclusive)")
+
+class WicketsRange(ScenarioRange):
+    start: int = Field(0, ge=0, le=10, description="First value (inclusive)")
+    stop: int = Field(..., ge=0, le=10, description="Last value (inclusive)")
+
+class WinProbabilityCurveRequest(BaseModel):
+    match: MatchInput = Field(..., description="Current chase state (runs_required, balls_remaining, wickets_in_hand and target_match are required)")
+    runs: ScenarioRange = Field(..., description="Runs scored off the next balls")
+    balls: BallsRange = Field(..., description="Balls bowled from now")
+    wickets: WicketsRange = Field(default_factory=lambda: WicketsRange(start=0, stop=0), description="Wickets lost from now")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "match": {
+                    "team1": "India",
+                    "team2": "Australia",
+                    "venue": "Melbourne Cricket Ground",
+                    "match_type": "ODI",
+                    "runs_required": 80,
+                    "balls_remaining": 60,
+                    "wickets_in_hand": 6,
+                    "target_match": 280
+                },
+                "runs": {"start": 0, "stop": 36, "step": 6},
+                "balls": {"start": 6, "stop": 30, "step": 6},
+                "wickets": {"start": 0, "stop": 2, "step": 1}
+            }
+        }
+
+class WinProbabilityCurveResponse(BaseModel):
+    batting_team: str
+    bowling_team: str
+    current_probability: float
+    runs: List[int]
+    balls: List[int]
+    wickets: List[int]
+    # Batting-team win probability indexed [wickets][balls][runs]; None for
+    # scenarios that cannot happen (runs or wickets without the balls for them)
+    probabilities: List[List[List[Optional[float]]]]
+
+class ExtraType(str, Enum):
+    wide = "wide"  # not a legal ball
+    no_ball = "no_ball"  # not a legal ball
+    bye = "bye"
+    leg_bye = "leg_bye"
+
+class BallEvent(BaseModel):
+    runs: int = Field(0, ge=0, le=7, description="Runs off the bat")
+    extras: int = Field(0, ge=0, le=7, description="Extra runs conceded on this delivery")
+    extra_type: Optional[ExtraType] = Field(None, description="Kind of extra; wides and no-balls are re-bowled")
+    wicket: bool = Field(False, description="A wicket fell on this delivery")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {"runs": 4, "extras": 0, "extra_type": None, "wicket": False}
+        }
+
+class LiveUpdate(BaseModel):
+    type: str  # "state" (session start), "update" (probability changed) or "result" (chase decided)
+    ball: int  # deliveries received in this session
+    runs_required: int
+    balls_remaining: int
+    wickets_in_hand: int
+    current_run_rate: float
+    required_run_rate: float
+    probability: float  # batting-team win probability
+    change: float  # change since the last pushed probability
+    result: Optional[str] = None  # "won", "lost" or "tied" once decided
+
+class ModelMetadataResponse(BaseModel):
+    model_version: Optional[str] = None
+    teams: List[str]  # every team name the model knows (batting, bowling or toss winner)
+    venues: List[str]
+    toss_decisions: List[str]
+    vocabularies: Dict[str, List[Any]]  # known categories per categorical feature
+    aliases: Dict[str, Dict[str, str]]  # accepted alternative names -> canonical name, per group
@@ -0,0 +1,133 @@
+import cProfile
+import hmac
+import io
+import marshal
+import pstats
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_HEADER = b"x-admin-token"
+_TRUE = ("1", "true", "yes")
+
+# Only one cProfile profiler can be active per interpreter; a profiled call
+# that finds it busy runs unprofiled instead of waiting
+_profiler_lock = threading.Lock()
+
+
+def wants_profile(scope) -> bool:
+    """
+    Whether to profile this request: asked for with ``X-Profile: 1`` or
+    ``?profile=1`` plus a valid ``X-Admin-Token``, or picked at random
+    with probability PROFILE_SAMPLE_RATE
+    
+    Only the request's predictor call is profiled, in the thread or worker
+    process that runs it. Routing, validation and serialization run on the
+    event loop interleaved with other requests, so a profiler there would
+    mix in their work; the Server-Timing stages cover that part instead.
+    """
+    query = scope.get("query_string", b"")
+    headers = scope.get("headers") or ()
+    requested = b"profile" in query and parse_qs(query.decode("latin-1")).get("profile", [""])[-1].lower() in _TRUE
+    token = None
+    for name, value in headers:
+        if name == PROFILE_HEADER:
+            requested = requested or value.decode("latin-1").lower() in _TRUE
+        elif name == ADMIN_HEADER:
+            token = value
+    if requested and settings.admin_token and token is not None \
+            and hmac.compare_digest(token, settings.admin_token.encode()):
+        return True
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+
+def run_profiled(fn, *args):
+    """
+    Call ``fn(*args)`` under cProfile. Returns (result, profile), where the
+    profile is marshalled pstats data (the .prof file format), or None if
+    another call was already being profiled.
+    """
+    if not _profiler_lock.acquire(blocking=False):
+        return fn(*args), None
+    try:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn, *args)
+        profiler.create_stats()
+        return result, marshal.dumps(profiler.stats)
+    finally:
+        _profiler_lock.release()
+
+
+class _MarshalledProfile:
+    """Adapter so pstats.Stats can read marshalled data without a file"""
+    
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+    
+    def create_stats(self):
+        pass
+
+
+class ProfileStore:
+    """The most recent request profiles, optionally also written to a directory"""
+    
+    def __init__(self, keep: int = 20, directory: Optional[str] = None):
+        self.keep = keep
+        self.directory = Path(directory) if directory else None
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counter = 0
+    
+    def add(self, data: bytes, endpoint: str, stage_seconds: float) -> str:
+        with self._lock:
+            self._counter += 1
+            profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{self._counter}"
+            self._profiles[profile_id] = {
+                "id": profile_id,
+                "endpoint": endpoint,
+                # Time in the predictor's recorded stages (profiler overhead included)
+                "stage_seconds": round(stage_seconds, 6),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "data": data,
+            }
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+        
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                (self.directory / f"{profile_id}.prof").write_bytes(data)
+            except OSError as e:
+                logger.warning(f"Could not write profile {profile_id}: {e}")
+        return profile_id
+    
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+    
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{key: value for key, value in entry.items() if key != "data"}
+                    for entry in reversed(self._profiles.values())]
+    
+    def report(self, profile_id: str, sort: str = "cumulative", limit: int = 40) -> Optional[str]:
+        """pstats text listing of the ``limit`` most expensive functions"""
+        entry = self.get(profile_id)
+        if entry is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(_MarshalledProfile(entry["data"]), stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+profiles = ProfileStore(settings.profile_keep, settings.profile_dir)
@@ -1,46 +1,442 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+import asyncio
+import gc
+import hmac
 import logging
-from app.models.match import MatchInput, PredictionResponse
+from pydantic import ValidationError
+from app.config import settings
+from app import metrics
+from app.profiling import profiles
+from app.models.match import (
+    MatchInput,
+    ExplainMode,
+    PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    WinProbabilityCurveRequest,
+    WinProbabilityCurveResponse,
+    BallEvent,
+    LiveUpdate,
+    ModelMetadataResponse,
+)
 from app.services.prediction_service import PredictionService
+from app.services.response_encoding import PlainJSONResponse
+from app.ml.predictor import CricketPredictor, ModelNotLoadedError, DEFAULT_TOP_K
+from app.ml.model_registry import ModelRegistry
+from app.services.model_manager import ModelManager
+from app.services.memory_stats import process_memory
+from app.services.live_match import LiveMatchState, LiveSessionLimiter
+from app.services.inference_executor import (
+    ExecutorSaturatedError,
+    InferenceTimeoutError,
+    loop_lag_monitor,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-# Lazy-initialize the service to avoid import-time failures during deployment
+# Built and warmed up by startup() from the application lifespan
 prediction_service = None
+# Set once warm-up has finished; requests are refused before that
+service_ready = False
+startup_error = None
+# Predictor loaded by preload() in the parent process of a pre-forking server
+preloaded_predictor = None
+# Process memory around model loading, reported by /api/memory
+memory_report = {}
+# Versioned models and hot-swapping (only with MODEL_REGISTRY_DIR)
+model_registry = ModelRegistry(settings.model_registry_dir) if settings.model_registry_dir else None
+model_manager = None
+watch_task = None
+# Concurrent /api/live sessions in this process
+live_sessions = LiveSessionLimiter(settings.live_max_sessions)
+
+def preload():
+    """
+    Load the predictor before the server forks its workers.
+    Workers then share the model's pages copy-on-write.
+    """
+    global preloaded_predictor
+    memory_report["before_load"] = process_memory()
+    model_path, version = _initial_model()
+    preloaded_predictor = CricketPredictor(model_path, model_version=version)
+    memory_report["after_load"] = process_memory()
+    memory_report["preloaded"] = True
+    # Keep the collector from touching (and so copying) the preloaded objects
+    gc.freeze()
+    logger.info(f"Model preloaded before fork: {memory_report}")
+
+async def startup():
+    """
+    Load the model and warm up every prediction path.
+    Readiness stays false until this completes.
+    """
+    global prediction_service, service_ready, startup_error, model_manager, watch_task
+    startup_error = None
+    try:
+        if preloaded_predictor is None:
+            memory_report["before_load"] = process_memory()
+        model_path, version = _initial_model()
+        # Model loading is blocking; keep the event loop free for /health
+        service = await asyncio.to_thread(PredictionService, model_path, preloaded_predictor, version)
+        prediction_service = service
+        if preloaded_predictor is None:
+            memory_report["after_load"] = process_memory()
+            memory_report["preloaded"] = False
+        if settings.warmup_rounds > 0:
+            await service.warm_up(settings.warmup_rounds)
+        if model_registry is not None:
+            model_manager = ModelManager(model_registry, _install_service, service, version)
+            if settings.model_watch_interval > 0:
+                watch_task = asyncio.create_task(model_manager.watch(settings.model_watch_interval))
+        service_ready = True
+    except Exception as e:
+        startup_error = str(e) or e.__class__.__name__
+        logger.exception("Failed to initialize PredictionService")
+
+def shutdown():
+    global service_ready
+    service_ready = False
+    if watch_task is not None:
+        watch_task.cancel()
+    if prediction_service is not None:
+        prediction_service.shutdown()
+    if model_manager is not None and model_manager.previous is not None:
+        model_manager.previous.shutdown()
+
+def _initial_model():
+    """Model file and version name to start with: the registry's active version, or MODEL_PATH"""
+    if model_registry is not None:
+        version = model_registry.active_version()
+        if version is not None:
+            return model_registry.model_path(version), version
+        logger.warning(f"Model registry {model_registry.root} has no active version, using MODEL_PATH")
+    return None, None
+
+def _install_service(service: PredictionService):
+    """Route new requests to ``service``; requests already running keep the one they hold"""
+    global prediction_service
+    prediction_service = service
+
+def _get_prediction_service() -> PredictionService:
+    """Return the shared PredictionService once it is warmed up"""
+    if not service_ready or prediction_service is None:
+        raise HTTPException(status_code=503, detail="Prediction service is warming up")
+    return prediction_service
+
+def collect_metrics():
+    """Mirror the served model and the cache counters into /metrics before a scrape"""
+    predictor = getattr(prediction_service, 'predictor', None)
+    metrics.model_info.clear()
+    if predictor is not None:
+        metrics.model_info.set(str(predictor.model_version), value=1 if predictor.loaded else 0)
+        if predictor.load_seconds is not None:
+            metrics.model_load_seconds.set(value=predictor.load_seconds)
+    cache = getattr(prediction_service, 'cache', None)
+    if cache is not None:
+        stats = cache.stats()
+        for event in ("hits", "misses", "coalesced", "evictions"):
+            metrics.cache_events_total.set(event, value=stats[event])
+
+metrics.registry.add_collector(collect_metrics)
 
 @router.post("/predict", response_model=PredictionResponse)
-async def predict_match(match_data: MatchInput):
+async def predict_match(
+    match_data: MatchInput,
+    explain: ExplainMode = Query(ExplainMode.top_k, description="Explanation detail: none, top-k or full"),
+    top_k: int = Query(DEFAULT_TOP_K, ge=1, le=100, description="Explanation entries returned for top-k"),
+):
     """
     Predict the outcome of a cricket match
     """
+    metrics.handler_started("predict")
+    service = _get_prediction_service()
     try:
-        global prediction_service
-        if prediction_service is None:
-            try:
-                prediction_service = PredictionService()
-            except Exception as e:
-                logger.exception("Failed to initialize PredictionService")
-                raise HTTPException(status_code=500, detail="Prediction service unavailable")
-
-        result = await prediction_service.predict(match_data)
-        return result
+        result = await service.predict(match_data, explain.value, top_k)
+        metrics.handler_done("predict")
+        return PlainJSONResponse(result)
+    except ExecutorSaturatedError:
+        metrics.errors_total.inc("predict", "saturated")
+        logger.warning("Inference queue full, rejecting /api/predict")
+        raise HTTPException(status_code=503, detail="Prediction service busy, retry later")
+    except InferenceTimeoutError:
+        metrics.errors_total.inc("predict", "timeout")
+        logger.warning("Inference timed out in /api/predict")
+        raise HTTPException(status_code=504, detail="Prediction timed out")
     except Exception as e:
+        metrics.errors_total.inc("predict", "internal")
         # Log the full exception with stack trace so deployments show useful logs
         logger.exception("Unhandled error in /api/predict")
         # Return a generic HTTP 500 with minimal detail
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/health")
-async def health():
-    """Simple health endpoint reporting model readiness"""
-    global prediction_service
-    if prediction_service is None:
+@router.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(
+    batch: BatchPredictionRequest,
+    explain: ExplainMode = Query(ExplainMode.top_k, description="Explanation detail: none, top-k or full"),
+    top_k: int = Query(DEFAULT_TOP_K, ge=1, le=100, description="Explanation entries returned for top-k"),
+):
+    """
+    Predict the outcome of many match states in one call.
+    Rows that fail are reported in their own result slot.
+    """
+    metrics.handler_started("predict_batch")
+    service = _get_prediction_service()
+    try:
+        result = await service.predict_batch(batch.matches, explain.value, top_k)
+        metrics.handler_done("predict_batch")
+        return PlainJSONResponse(result)
+    except ExecutorSaturatedError:
+        metrics.errors_total.inc("predict_batch", "saturated")
+        logger.warning("Inference queue full, rejecting /api/predict/batch")
+        raise HTTPException(status_code=503, detail="Prediction service busy, retry later")
+    except InferenceTimeoutError:
+        metrics.errors_total.inc("predict_batch", "timeout")
+        logger.warning("Inference timed out in /api/predict/batch")
+        raise HTTPException(status_code=504, detail="Prediction timed out")
+    except Exception as e:
+        metrics.errors_total.inc("predict_batch", "internal")
+        logger.exception("Unhandled error in /api/predict/batch")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/predict/curve", response_model=WinProbabilityCurveResponse)
+async def win_probability_curve(request: WinProbabilityCurveRequest):
+    """
+    Win probability surface around the current chase state:
+    X runs off the next Y balls with Z wickets lost, for every X, Y, Z in the ranges.
+    """
+    service = _get_prediction_service()
+    try:
+        return await service.win_probability_curve(request)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ModelNotLoadedError:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    except ExecutorSaturatedError:
+        logger.warning("Inference queue full, rejecting /api/predict/curve")
+        raise HTTPException(status_code=503, detail="Prediction service busy, retry later")
+    except InferenceTimeoutError:
+        logger.warning("Inference timed out in /api/predict/curve")
+        raise HTTPException(status_code=504, detail="Prediction timed out")
+    except Exception as e:
+        logger.exception("Unhandled error in /api/predict/curve")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.websocket("/live")
+async def live_match(websocket: WebSocket):
+    """
+    Live ball-by-ball win probability for one chase.
+    
+    The first message is a MatchInput with target_match (and the current
+    runs_required, balls_remaining and wickets_in_hand when joining mid-chase).
+    Every further message is a BallEvent. The server answers the start with a
+    "state" message and then pushes an "update" only when the rounded win
+    probability changed, and a "result" when the chase is decided.
+    """
+    if not service_ready or prediction_service is None:
+        await websocket.close(code=1013, reason="Prediction service is warming up")
+        return
+    if not live_sessions.acquire():
+        await websocket.close(code=1013, reason="Too many live sessions")
+        return
+    
+    try:
+        await websocket.accept()
+        match_data = MatchInput.model_validate(await _receive_live_message(websocket))
+        state = LiveMatchState.from_match(match_data, prediction_service.build_model_input(match_data))
+        await _push_live_update(websocket, state, "state")
+        
+        while state.result is None:
+            try:
+                state.apply(BallEvent.model_validate(await _receive_live_message(websocket)))
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "detail": prediction_service.format_validation_error(e)})
+                continue
+            await _push_live_update(websocket, state, "result" if state.result else "update")
+        await websocket.close()
+    except ValidationError as e:
+        await websocket.close(code=1008, reason=prediction_service.format_validation_error(e)[:120])
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e)[:120])
+    except ModelNotLoadedError:
+        await websocket.close(code=1013, reason="Model not loaded")
+    except asyncio.TimeoutError:
+        await websocket.close(code=1000, reason="Idle timeout")
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("Unhandled error in /api/live")
+        await websocket.close(code=1011)
+    finally:
+        live_sessions.release()
+
+
+async def _receive_live_message(websocket: WebSocket):
+    return await asyncio.wait_for(websocket.receive_json(), timeout=settings.live_idle_timeout or None)
+
+
+async def _push_live_update(websocket: WebSocket, state: LiveMatchState, kind: str):
+    """Score the current state and send it unless the probability is unchanged"""
+    result = state.result
+    if result is not None:
+        probability = 1.0 if result == "won" else 0.5 if result == "tied" else 0.0
+    else:
         try:
-            prediction_service = PredictionService()
-        except Exception:
-            logger.exception("Failed to initialize PredictionService during health check")
-            return {"ready": False, "model_loaded": False}
+            probability = round(await prediction_service.predict_probability(state.model_input()), 4)
+        except (ExecutorSaturatedError, InferenceTimeoutError):
+            # Keep the session; the next ball is scored from the updated totals
+            await websocket.send_json({"type": "error", "detail": "Prediction service busy"})
+            return
+    
+    if kind == "update" and probability == state.last_probability:
+        return
+    previous = state.last_probability
+    state.last_probability = probability
+    update = LiveUpdate(type=kind, probability=probability, result=result,
+                        change=round(probability - previous, 4) if previous is not None else 0.0,
+                        **state.snapshot())
+    await websocket.send_json(update.model_dump(exclude_none=True))
+
+
+@router.get("/live/sessions")
+async def live_session_stats():
+    """Live session counters for this process"""
+    return {"live": live_sessions.stats()}
+
+
+def _check_admin_token(token):
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if token is None or not hmac.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def _require_admin(token):
+    _check_admin_token(token)
+    if model_manager is None:
+        raise HTTPException(status_code=404, detail="Model registry is not configured (MODEL_REGISTRY_DIR)")
+    return model_manager
+
+
+@router.get("/models")
+async def model_versions(x_admin_token: str = Header(None)):
+    """Served, previous and registered model versions"""
+    return _require_admin(x_admin_token).stats()
+
+
+@router.post("/models/{version}/activate")
+async def activate_model_version(version: str, x_admin_token: str = Header(None)):
+    """
+    Load, warm up and swap in a registered version, and make it the registry's
+    active version so the watchers in other workers follow
+    """
+    manager = _require_admin(x_admin_token)
+    try:
+        changed = await manager.activate(version)
+        model_registry.set_active(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        logger.exception(f"Failed to activate model version {version}")
+        raise HTTPException(status_code=500, detail=f"Could not activate {version}: {e}")
+    return {"changed": changed, **manager.stats()}
+
+
+@router.post("/models/rollback")
+async def rollback_model_version(x_admin_token: str = Header(None)):
+    """Swap back to the previous version, still loaded in memory"""
+    manager = _require_admin(x_admin_token)
+    try:
+        version = await manager.rollback()
+        model_registry.set_active(version)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"changed": True, **manager.stats()}
 
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: str = Header(None)):
+    """Recent request profiles in this process, newest first"""
+    _check_admin_token(x_admin_token)
+    return {"profiles": profiles.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="pstats text report or the raw .prof file"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(40, ge=1, le=500),
+    x_admin_token: str = Header(None),
+):
+    """One request profile (the id is in the X-Profile-Id response header)"""
+    _check_admin_token(x_admin_token)
+    entry = profiles.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile: {profile_id}")
+    if format == "pstats":
+        return Response(entry["data"], media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'})
+    return PlainTextResponse(profiles.report(profile_id, sort, limit))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, so W/ tags added by proxies still match)"""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in tags)
+
+
+@router.get("/metadata", response_model=ModelMetadataResponse)
+async def model_metadata(if_none_match: str = Header(None)):
+    """
+    Team, venue and toss-decision names the served model knows, and the
+    aliases accepted for them. Cacheable: the ETag changes with the model.
+    """
+    body, etag = _get_prediction_service().metadata()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.metadata_max_age}"}
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/health")
+async def health():
+    """Readiness endpoint: 503 until the model is loaded and warmed up"""
     model_loaded = getattr(prediction_service, 'model_loaded', False)
-    return {"ready": True, "model_loaded": bool(model_loaded)}
+    body = {
+        "ready": service_ready,
+        "model_loaded": bool(model_loaded),
+        "warmup_seconds": getattr(prediction_service, 'warmup_seconds', None),
+        "model_version": getattr(prediction_service, 'model_version', None),
+    }
+    if startup_error:
+        body["error"] = startup_error
+    return JSONResponse(body, status_code=200 if service_ready else 503)
+
+
+@router.get("/executor")
+async def executor_stats():
+    """Inference pool, micro-batching and event-loop blocking measurements"""
+    executor = getattr(prediction_service, 'executor', None)
+    batcher = getattr(prediction_service, 'batcher', None)
+    return {
+        "executor": executor.stats() if executor else None,
+        "micro_batching": batcher.stats() if batcher else None,
+        "event_loop": loop_lag_monitor.stats(),
+    }
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Prediction cache size and hit/miss counters"""
+    cache = getattr(prediction_service, 'cache', None)
+    return {"cache": cache.stats() if cache else None}
+
+
+@router.get("/memory")
+async def memory_stats():
+    """Memory of this worker process and around model loading (MiB)"""
+    return {"current": process_memory(), "load": memory_report}
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+import logging
+from app.config import settings
+from app.metrics import collect_call_metrics, current_request, observe_call
+from app.profiling import profiles, run_profiled
+
+logger = logging.getLogger(__name__)
+
+# Predictor owned by a process-pool worker (set by _init_worker)
+_worker_predictor = None
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the inference queue is full"""
+
+
+class InferenceTimeoutError(TimeoutError):
+    """Raised when an inference call exceeds its timeout"""
+
+
+def _init_worker(model_path: str, inference_engine: str, model_version: Optional[str]):
+    """Load a private CricketPredictor inside a process-pool worker"""
+    global _worker_predictor
+    from app.ml.predictor import CricketPredictor
+    _worker_predictor = CricketPredictor(model_path, inference_engine=inference_engine,
+                                         model_version=model_version)
+
+
+def _call_worker_predictor(method: str, profile: bool, *args):
+    started = time.perf_counter()
+    with collect_call_metrics() as call:
+        if profile:
+            result, call.profile = run_profiled(getattr(_worker_predictor, method), *args)
+        else:
+            result = getattr(_worker_predictor, method)(*args)
+    return result, call, time.perf_counter() - started
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound predictor calls off the asyncio event loop
+    
+    Calls go to a bounded thread or process pool. At most ``max_queue``
+    calls may be pending or running at once; beyond that callers get
+    ExecutorSaturatedError instead of piling up. Each call is bounded by
+    ``timeout`` seconds. Process workers load their own predictor from
+    the same model file, so only the input and result cross the process
+    boundary.
+    """
+    
+    def __init__(self, predictor, kind: str = "thread", workers: Optional[int] = None,
+                 max_queue: Optional[int] = None, timeout: Optional[float] = None):
+        self.predictor = predictor
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue or self.workers * 32
+        self.timeout = timeout
+        
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.busy_seconds = 0.0
+        
+        self._pool: Optional[Executor] = None
+        if kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        elif kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(str(predictor.model_path), predictor.inference_engine, predictor.version_name),
+            )
+        elif kind != "inline":
+            raise ValueError(f"Unknown inference executor: {kind}")
+        logger.info(f"Inference executor: {kind} (workers={self.workers}, max_queue={self.max_queue})")
+    
+    async def run(self, method: str, *args) -> Any:
+        """Call ``predictor.<method>(*args)`` in the pool and await the result"""
+        request = current_request()
+        profile = request is not None and request.profile
+        if self._pool is None:
+            result, call = self._timed(method, profile, *args)
+            with self._lock:
+                self.completed += 1
+            self._observe(method, call, request)
+            return result
+        
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"Inference queue full ({self.max_queue} pending)")
+            self._pending += 1
+        
+        try:
+            if self.kind == "process":
+                future = self._pool.submit(_call_worker_predictor, method, profile, *args)
+            else:
+                future = self._pool.submit(self._timed, method, profile, *args)
+        except Exception:
+            self._release(None)
+            raise
+        # Release the slot when the work itself finishes, not when the caller gives up
+        future.add_done_callback(self._release)
+        
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise InferenceTimeoutError(f"Inference exceeded {self.timeout}s")
+        
+        if self.kind == "process":
+            result, call, elapsed = result
+            with self._lock:
+                self.busy_seconds += elapsed
+        else:
+            result, call = result
+        self._observe(method, call, request)
+        return result
+    
+    def _observe(self, method: str, call, request):
+        """Stages recorded by the predictor go to /metrics and the request's Server-Timing"""
+        observe_call(method, call)
+        if call.profile is not None:
+            request.profile_id = profiles.add(call.profile, method, sum(call.stages.values()))
+    
+    def _timed(self, method: str, profile: bool, *args) -> Any:
+        started = time.perf_counter()
+        try:
+            with collect_call_metrics() as call:
+                if profile:
+                    result, call.profile = run_profiled(getattr(self.predictor, method), *args)
+                    return result, call
+                return getattr(self.predictor, method)(*args), call
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.busy_seconds += elapsed
+    
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue and timing counters for diagnostics"""
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                # With a pool this is blocking time moved off the event loop;
+                # with "inline" it is time the loop itself was blocked
+                "inference_seconds": round(self.busy_seconds, 6),
+                "offloaded": self.kind != "inline",
+            }
+    
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how long the event loop is blocked
+    
+    A background task sleeps for ``interval`` seconds and records how late
+    it wakes up. Any lateness is time the loop spent running something
+    else without yielding, e.g. inference called directly on the loop.
+    Comparing the totals with the executor enabled and with
+    INFERENCE_EXECUTOR=inline shows the blocking time eliminated.
+    """
+    
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "total_lag_seconds": round(self.total_lag, 6),
+            "max_lag_seconds": round(self.max_lag, 6),
+            "mean_lag_seconds": round(self.total_lag / self.samples, 6) if self.samples else 0.0,
+        }
+
+
+loop_lag_monitor = EventLoopLagMonitor(settings.loop_lag_interval)
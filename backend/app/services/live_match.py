@@ -0,0 +1,140 @@
+import logging
+from typing import Any, Dict, Optional
+from app.models.match import MatchInput, BallEvent, ExtraType
+from app.services.scenario_grid import INNINGS_BALLS
+
+logger = logging.getLogger(__name__)
+
+# Deliveries that are bowled again and do not use up a ball
+UNCOUNTED_EXTRAS = (ExtraType.wide, ExtraType.no_ball)
+TOTAL_WICKETS = 10
+
+
+class LiveMatchState:
+    """
+    Incrementally maintained chase state of one live session
+    
+    Only the running totals are kept (no ball history), so the memory of a
+    session stays constant however long the match runs. The categorical
+    part of the model input is built once and shared by every ball.
+    """
+    
+    __slots__ = ('base_input', 'target', 'innings_balls', 'runs_required', 'balls_remaining',
+                 'wickets_in_hand', 'deliveries', 'last_probability')
+    
+    def __init__(self, base_input: Dict[str, Any], target: int, innings_balls: int,
+                 runs_required: int, balls_remaining: int, wickets_in_hand: int):
+        self.base_input = base_input
+        self.target = target
+        self.innings_balls = innings_balls
+        self.runs_required = runs_required
+        self.balls_remaining = balls_remaining
+        self.wickets_in_hand = wickets_in_hand
+        self.deliveries = 0
+        self.last_probability = None
+    
+    @classmethod
+    def from_match(cls, match_data: MatchInput, base_input: Dict[str, Any]) -> "LiveMatchState":
+        """Start a session from the chase state in ``match_data`` (defaults: start of the chase)"""
+        if match_data.target_match is None:
+            raise ValueError("target_match is required for a live chase")
+        innings_balls = INNINGS_BALLS.get((match_data.match_type or "").upper())
+        if innings_balls is None and match_data.balls_remaining is None:
+            raise ValueError(f"balls_remaining is required for match type {match_data.match_type}")
+        
+        balls_remaining = match_data.balls_remaining if match_data.balls_remaining is not None else innings_balls
+        state = cls(
+            base_input={name: base_input[name] for name in
+                        ('team1', 'team2', 'batting_team', 'bowling_team', 'venue', 'toss_winner', 'toss_decision')},
+            target=match_data.target_match,
+            innings_balls=max(innings_balls or 0, balls_remaining),
+            runs_required=match_data.runs_required if match_data.runs_required is not None else match_data.target_match,
+            balls_remaining=balls_remaining,
+            wickets_in_hand=match_data.wickets_in_hand if match_data.wickets_in_hand is not None else TOTAL_WICKETS,
+        )
+        if not 0 <= state.runs_required <= state.target or state.balls_remaining < 0 \
+                or not 0 <= state.wickets_in_hand <= TOTAL_WICKETS:
+            raise ValueError("Chase state is out of range")
+        return state
+    
+    def apply(self, ball: BallEvent):
+        """Update the totals with one delivery"""
+        if self.result is not None:
+            raise ValueError("Chase is already decided")
+        self.deliveries += 1
+        self.runs_required = max(self.runs_required - ball.runs - ball.extras, 0)
+        if ball.extra_type not in UNCOUNTED_EXTRAS:
+            self.balls_remaining -= 1
+        if ball.wicket:
+            self.wickets_in_hand -= 1
+    
+    @property
+    def result(self) -> Optional[str]:
+        """Batting side's result ("won", "lost" or "tied") once the chase is decided"""
+        if self.runs_required == 0:
+            return "won"
+        if self.balls_remaining == 0 or self.wickets_in_hand == 0:
+            # The target is one more than the first-innings score
+            return "tied" if self.runs_required == 1 else "lost"
+        return None
+    
+    @property
+    def current_run_rate(self) -> float:
+        balls_bowled = self.innings_balls - self.balls_remaining
+        return (self.target - self.runs_required) * 6.0 / balls_bowled if balls_bowled > 0 else 0.0
+    
+    @property
+    def required_run_rate(self) -> float:
+        return self.runs_required * 6.0 / self.balls_remaining if self.balls_remaining > 0 else 0.0
+    
+    def model_input(self) -> Dict[str, Any]:
+        """Predictor feature dictionary for the current state"""
+        return dict(
+            self.base_input,
+            runs_required=self.runs_required,
+            balls_remaining=self.balls_remaining,
+            wickets_in_hand=self.wickets_in_hand,
+            target_match=self.target,
+            current_run_rate=self.current_run_rate,
+            required_run_rate=self.required_run_rate,
+        )
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Chase fields of a live update message"""
+        return {
+            "ball": self.deliveries,
+            "runs_required": self.runs_required,
+            "balls_remaining": self.balls_remaining,
+            "wickets_in_hand": self.wickets_in_hand,
+            "current_run_rate": round(self.current_run_rate, 2),
+            "required_run_rate": round(self.required_run_rate, 2),
+        }
+
+
+class LiveSessionLimiter:
+    """Caps the number of concurrent live sessions in this process"""
+    
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self.active = 0
+        self.opened = 0
+        self.rejected = 0
+    
+    def acquire(self) -> bool:
+        if self.active >= self.max_sessions:
+            self.rejected += 1
+            return False
+        self.active += 1
+        self.opened += 1
+        return True
+    
+    def release(self):
+        self.active -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_sessions": self.max_sessions,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
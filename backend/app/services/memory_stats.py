@@ -0,0 +1,36 @@
+import os
+import sys
+from typing import Dict
+
+def process_memory() -> Dict[str, float]:
+    """
+    Memory of the current process in MiB
+    
+    ``rss`` counts every resident page, including pages shared with other
+    workers. ``pss`` splits shared pages between the processes mapping
+    them and ``private`` counts pages owned by this process alone, so they
+    show what each extra worker really costs. PSS and private memory are
+    only available on Linux.
+    """
+    stats = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+        stats["rss"] = round(fields.get("Rss", 0) / 1024, 2)
+        stats["pss"] = round(fields.get("Pss", 0) / 1024, 2)
+        stats["shared"] = round((fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024, 2)
+        stats["private"] = round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 2)
+    except OSError:
+        try:
+            # Unix only; Windows reports no memory figures
+            import resource
+        except ImportError:
+            return stats
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stats["max_rss"] = round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+    return stats
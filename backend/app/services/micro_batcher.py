@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single predictions into one batch model call
+    
+    Requests are queued until either ``max_batch_size`` rows are waiting or
+    ``window`` seconds have passed since the first queued row. The queued
+    rows are then scored with a single ``predict_batch`` call through the
+    inference executor and each waiting request receives its own row.
+    """
+    
+    def __init__(self, executor, window: float = 0.002, max_batch_size: int = 64):
+        self.executor = executor
+        self.window = window
+        self.max_batch_size = max_batch_size
+        # Rows are queued per (explain, top_k) so each batch shares one option set
+        self._pending: Dict[Tuple, List[Tuple[Dict, asyncio.Future, float]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._tasks = set()
+        
+        self.started_at = time.monotonic()
+        self.batches = 0
+        self.rows = 0
+        self.max_observed_batch = 0
+        self.queue_wait_seconds = 0.0
+        self.max_queue_wait = 0.0
+    
+    async def submit(self, model_input: Dict, explain: str = "top-k",
+                     top_k: int = 10) -> Tuple[str, float, List[Dict]]:
+        """Queue one prediction and wait for the batch it lands in"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        options = (explain, top_k)
+        pending = self._pending.setdefault(options, [])
+        pending.append((model_input, future, time.perf_counter()))
+        
+        if len(pending) >= self.max_batch_size:
+            self._flush(options)
+        elif options not in self._timers:
+            self._timers[options] = loop.call_later(self.window, self._flush, options)
+        
+        return await future
+    
+    def _flush(self, options: Tuple):
+        timer = self._timers.pop(options, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(options, None)
+        if not batch:
+            return
+        
+        task = asyncio.ensure_future(self._run_batch(batch, *options))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[Dict, asyncio.Future, float]], explain: str, top_k: int):
+        flushed = time.perf_counter()
+        waits = [flushed - queued for _, _, queued in batch]
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_observed_batch = max(self.max_observed_batch, len(batch))
+        self.queue_wait_seconds += sum(waits)
+        self.max_queue_wait = max(self.max_queue_wait, max(waits))
+        
+        try:
+            outcomes = await self.executor.run(
+                'predict_batch', [model_input for model_input, _, _ in batch], explain, top_k
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (model_input, future, _), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                # Keep single-request semantics: retry the row on its own
+                retry = asyncio.ensure_future(self.executor.run('predict', model_input, explain, top_k))
+                retry.add_done_callback(lambda t, f=future: self._resolve(f, t))
+            else:
+                future.set_result(outcome)
+    
+    def _resolve(self, future: asyncio.Future, task: asyncio.Task):
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "window_ms": round(self.window * 1000, 3),
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 3) if self.batches else 0.0,
+            "max_observed_batch": self.max_observed_batch,
+            "rows_per_second": round(self.rows / elapsed, 3) if elapsed > 0 else 0.0,
+            # Latency added by waiting for the batching window
+            "mean_queue_wait_ms": round(self.queue_wait_seconds / self.rows * 1000, 3) if self.rows else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+        }
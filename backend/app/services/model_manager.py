@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+from app.config import settings
+from app.ml.model_registry import ModelRegistry
+from app.services.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+
+class ModelManager:
+    """
+    Hot-swaps PredictionService instances between registry versions
+    
+    A new version is loaded in a worker thread and warmed up while the
+    current one keeps serving, then installed with ``activate`` (a single
+    reference assignment). Requests already holding the old service finish
+    on it. The previous service stays loaded so rollback is an in-memory
+    swap; the one before it is shut down once its pending calls drain.
+    """
+    
+    def __init__(self, registry: ModelRegistry, activate: Callable[[PredictionService], None],
+                 current: PredictionService, current_version: Optional[str]):
+        self.registry = registry
+        self._activate = activate
+        self.current = current
+        self.current_version = current_version
+        self.previous: Optional[PredictionService] = None
+        self.previous_version: Optional[str] = None
+        self.loading: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.failed_version: Optional[str] = None
+        self.swaps = 0
+        self._lock = asyncio.Lock()
+    
+    async def activate(self, version: str) -> bool:
+        """
+        Serve ``version``: swap back in memory if it is the previous
+        version, otherwise load it from the registry. Returns False when it
+        is already being served.
+        """
+        async with self._lock:
+            if version == self.current_version:
+                return False
+            if version == self.previous_version:
+                self._swap(self.previous, version)
+                return True
+            
+            path = self.registry.model_path(version)
+            self.loading = version
+            try:
+                service = await asyncio.to_thread(PredictionService, path, None, version)
+                if not service.model_loaded:
+                    service.shutdown()
+                    raise RuntimeError(f"Model version {version} failed to load from {path}")
+                if settings.warmup_rounds > 0:
+                    await service.warm_up(settings.warmup_rounds)
+            except Exception as e:
+                self.last_error = str(e) or e.__class__.__name__
+                self.failed_version = version
+                raise
+            finally:
+                self.loading = None
+            
+            self.failed_version = None
+            retired = self.previous
+            self._swap(service, version)
+            if retired is not None and retired is not self.current:
+                asyncio.create_task(self._retire(retired))
+            return True
+    
+    async def rollback(self) -> str:
+        """Switch back to the previous version kept in memory"""
+        if self.previous_version is None:
+            raise ValueError("No previous model version loaded")
+        version = self.previous_version
+        await self.activate(version)
+        return version
+    
+    def _swap(self, service: PredictionService, version: str):
+        self.previous, self.previous_version = self.current, self.current_version
+        self.current, self.current_version = service, version
+        self._activate(service)
+        self.swaps += 1
+        logger.info(f"Serving model version {version} (previous: {self.previous_version})")
+    
+    async def _retire(self, service: PredictionService):
+        if not await service.drain():
+            logger.warning("Retired model still had pending calls after the drain timeout")
+        service.shutdown()
+    
+    async def watch(self, interval: float):
+        """Follow the registry manifest's active version (all workers converge on it)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                active = self.registry.active_version()
+                # A version that failed to load is retried only after the manifest changes
+                if active and active not in (self.current_version, self.loading, self.failed_version):
+                    await self.activate(active)
+            except Exception:
+                logger.exception("Model watcher failed to activate the registry version")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.current_version,
+            "previous": self.previous_version,
+            "loading": self.loading,
+            "swaps": self.swaps,
+            "last_error": self.last_error,
+            "registry_active": self.registry.active_version(),
+            "versions": self.registry.versions(),
+        }
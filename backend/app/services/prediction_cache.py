@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    """
+    Bounded LRU cache with TTL and in-flight request coalescing
+    
+    Entries expire ``ttl`` seconds after they are stored and the least
+    recently used entry is evicted once ``max_size`` is reached. Concurrent
+    lookups for a key that is still being computed await the same task
+    instead of starting their own. Entries belong to one model version;
+    ``bind_model`` drops everything when the version changes.
+    """
+    
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.model_version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def bind_model(self, model_version: Optional[str]):
+        """Invalidate all entries if the served model has changed"""
+        if model_version != self.model_version:
+            if self.model_version is not None:
+                logger.info(f"Model changed ({self.model_version} -> {model_version}), clearing prediction cache")
+                self.invalidations += 1
+            self.clear()
+            self.model_version = model_version
+    
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+    
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key`` or compute it once for all waiters"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            model_version = self.model_version
+            task.add_done_callback(lambda t: self._store(key, t, model_version))
+        
+        # Shield so one caller disconnecting does not cancel the shared work
+        return await asyncio.shield(task)
+    
+    def _store(self, key: Hashable, task: asyncio.Task, model_version: Optional[str]):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Errors are not cached, nor results from a model that has since been replaced
+        if task.cancelled() or task.exception() is not None or model_version != self.model_version:
+            return
+        
+        self._entries[key] = (time.monotonic() + self.ttl, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
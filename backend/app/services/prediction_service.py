@@ -1,7 +1,24 @@
+import asyncio
+import hashlib
 import logging
-from app.models.match import MatchInput, PredictionResponse, ShapValue
-from app.ml.predictor import CricketPredictor
-from typing import List
+import time
+from pydantic import ValidationError
+from app.models.match import (
+    MatchInput,
+    WinProbabilityCurveRequest,
+    WinProbabilityCurveResponse,
+)
+from app.ml.predictor import CricketPredictor, ModelNotLoadedError, DEFAULT_TOP_K
+from app.config import settings
+from app.metrics import current_request, observe_stage, predictions_total
+from app.ml.name_resolver import TEAM_FEATURES
+from app.services.inference_executor import InferenceExecutor
+from app.services.prediction_cache import PredictionCache
+from app.services.micro_batcher import MicroBatcher
+from app.services.response_encoding import encode
+from app.services.scenario_grid import MAX_GRID_CELLS, build_chase_grid
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -10,20 +27,24 @@ class PredictionService:
     Service for cricket match prediction with ML model
     """
     
-    def __init__(self):
-        # Load the trained ML model
+    def __init__(self, model_path: str = None, predictor: CricketPredictor = None, model_version: str = None):
+        # Load the trained ML model (or reuse one preloaded before fork)
         # Ensure predictor attribute always exists even if initialization fails.
-        self.predictor = None
+        self.predictor = predictor
+        self.warmup_seconds = None
+        # Encoded /api/metadata body and its ETag, built on first request
+        self._metadata = None
         try:
-            logger.info("Initializing CricketPredictor...")
-            self.predictor = CricketPredictor()
+            if self.predictor is None:
+                logger.info("Initializing CricketPredictor...")
+                self.predictor = CricketPredictor(model_path, model_version=model_version)
             logger.info("PredictionService initialized with ML predictor")
         except Exception:
             # Log full stack and keep predictor as None so other code paths can handle fallback.
             logger.exception("Failed to initialize CricketPredictor during PredictionService startup")
         # Set model_loaded flag for diagnostics
         try:
-            self.model_loaded = bool(getattr(self.predictor, 'model', None))
+            self.model_loaded = bool(getattr(self.predictor, 'loaded', False))
             logger.info(f"Model loaded: {self.model_loaded}")
             if self.model_loaded:
                 # If model_info exists, log a short summary
@@ -33,13 +54,294 @@ class PredictionService:
         except Exception:
             self.model_loaded = False
             logger.exception("Error determining model_loaded flag")
+        
+        # Run predictor calls off the event loop
+        self.executor = None
+        if self.predictor is not None:
+            try:
+                self.executor = InferenceExecutor(
+                    self.predictor,
+                    kind=settings.inference_executor,
+                    workers=settings.inference_workers or None,
+                    max_queue=settings.inference_max_queue or None,
+                    timeout=settings.inference_timeout or None,
+                )
+            except Exception:
+                logger.exception("Failed to start inference executor, running inference inline")
+                self.executor = InferenceExecutor(self.predictor, kind="inline")
+        
+        # Optionally coalesce concurrent single predictions into batch calls
+        self.batcher = None
+        if self.executor is not None and settings.micro_batching:
+            self.batcher = MicroBatcher(
+                self.executor,
+                window=settings.micro_batch_window_ms / 1000.0,
+                max_batch_size=settings.micro_batch_max_size,
+            )
+        
+        # Cache responses for repeated identical requests
+        self.cache = None
+        if settings.prediction_cache:
+            self.cache = PredictionCache(
+                max_size=settings.prediction_cache_size,
+                ttl=settings.prediction_cache_ttl,
+            )
+    
+    async def warm_up(self, rounds: int = 3) -> float:
+        """
+        Run synthetic predictions through every serving path
+        
+        Each round sends concurrent single predictions (model and
+        explanation), enough to reach every pool worker, followed by one
+        batch prediction. They bypass the response cache and the
+        micro-batcher, so identical calls are not coalesced into one and
+        no synthetic results are cached. Returns the warm-up wall time in
+        seconds.
+        """
+        started = time.perf_counter()
+        matches = self._warmup_matches()
+        workers = self.executor.workers if self.executor else 1
+        
+        for _ in range(rounds):
+            await asyncio.gather(*[self._predict_uncached(match, batched=False)
+                                   for match in matches for _ in range(workers)])
+            await self.predict_batch([match.model_dump() for match in matches], explain="full")
+        
+        self.warmup_seconds = time.perf_counter() - started
+        logger.info(f"Warm-up finished: {rounds} rounds in {self.warmup_seconds:.3f}s")
+        return self.warmup_seconds
+    
+    def _warmup_matches(self) -> List[MatchInput]:
+        """Synthetic match states covering early, middle and late chase situations"""
+        return [
+            MatchInput(team1="India", team2="Australia", venue="Melbourne Cricket Ground",
+                       toss_winner="India", toss_decision="bat", runs_required=250,
+                       balls_remaining=300, wickets_in_hand=10, target_match=251,
+                       current_run_rate=0.0, required_run_rate=5.0),
+            MatchInput(team1="England", team2="Pakistan", venue="Lord's",
+                       toss_winner="Pakistan", toss_decision="field", runs_required=120,
+                       balls_remaining=90, wickets_in_hand=5, target_match=280,
+                       current_run_rate=5.7,
+                       required_run_rate=8.0),
+            MatchInput(team1="South Africa", team2="New Zealand", venue="Eden Gardens",
+                       runs_required=12, balls_remaining=6, wickets_in_hand=1),
+        ]
     
-    async def predict(self, match_data: MatchInput) -> PredictionResponse:
+    @property
+    def model_version(self) -> Optional[str]:
+        return getattr(self.predictor, 'model_version', None)
+    
+    def metadata(self) -> Tuple[bytes, str]:
         """
-        Predict match outcome based on input data using ML model
+        The model's known teams, venues and accepted aliases as an encoded
+        ModelMetadataResponse body, with an ETag for it.
+        Both are fixed for the loaded model and computed once.
         """
+        if self._metadata is None:
+            vocabularies = getattr(self.predictor, 'vocabularies', None) or {}
+            resolver = getattr(self.predictor, 'name_resolver', None)
+            teams = set()
+            for feature in TEAM_FEATURES:
+                teams.update(vocabularies.get(feature, ()))
+            body = encode({
+                "model_version": self.model_version,
+                "teams": sorted(teams),
+                "venues": list(vocabularies.get('venue', [])),
+                "toss_decisions": list(vocabularies.get('toss_decision', [])),
+                "vocabularies": vocabularies,
+                "aliases": resolver.aliases if resolver is not None else {},
+            })
+            etag = f'"{self.model_version}-{hashlib.sha1(body).hexdigest()[:8]}"'
+            self._metadata = (body, etag)
+        return self._metadata
+    
+    def shutdown(self):
+        """Release the inference pool"""
+        if getattr(self, "executor", None):
+            self.executor.shutdown()
+    
+    async def drain(self, timeout: float = 30.0, interval: float = 0.05) -> bool:
+        """Wait until no inference call is pending; False if ``timeout`` passed first"""
+        deadline = time.monotonic() + timeout
+        while self.executor is not None and self.executor.stats()["pending"] > 0:
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(interval)
+        return True
+    
+    async def predict(self, match_data: MatchInput, explain: str = "top-k",
+                      top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+        """
+        Predict match outcome based on input data using ML model.
+        Identical requests are served from the cache or share one computation;
+        only results of a loaded model are cached, never the mock fallback.
+        Returns the PredictionResponse body as plain JSON types (see _build_response).
+        """
+        if self.cache is None or self._profiling() or not getattr(self.predictor, 'loaded', False):
+            return await self._predict_uncached(match_data, explain, top_k)
+        
+        model_version = self.model_version
+        self.cache.bind_model(model_version)
+        return await self.cache.get_or_compute(
+            self._cache_key(match_data, explain, top_k, model_version),
+            lambda: self._predict_uncached(match_data, explain, top_k),
+        )
+    
+    def _profiling(self) -> bool:
+        """A profiled request runs its own predictor call (no cache hit, no shared batch)"""
+        request = current_request()
+        return request is not None and request.profile
+    
+    def _cache_key(self, match_data: MatchInput, explain: str, top_k: int, model_version: Optional[str]) -> Tuple:
+        """Normalized, hashable form of a request (validated values in field order) for one model"""
+        return (model_version, explain, top_k if explain == "top-k" else None) + tuple(match_data.model_dump().values())
+    
+    async def _predict_uncached(self, match_data: MatchInput, explain: str = "top-k",
+                                top_k: int = DEFAULT_TOP_K, batched: bool = True) -> Dict[str, Any]:
+        """Run the model for one match input (through the micro-batcher if enabled and ``batched``)"""
         # Prepare input data for the model
-        model_input = {
+        started = time.perf_counter()
+        model_input = self.build_model_input(match_data)
+        observe_stage("predict", "input_mapping", time.perf_counter() - started)
+        
+        # Get prediction from ML model
+        if getattr(self, "predictor", None):
+            if self.batcher is not None and batched and not self._profiling():
+                winner, batting_win_prob, shap_values = await self.batcher.submit(model_input, explain, top_k)
+            else:
+                winner, batting_win_prob, shap_values = await self.executor.run('predict', model_input, explain, top_k)
+        else:
+            winner, batting_win_prob, shap_values = self._fallback_prediction(match_data, model_input, explain, top_k)
+            predictions_total.inc("predict", "fallback")
+
+        started = time.perf_counter()
+        response = self._build_response(match_data, winner, batting_win_prob, shap_values)
+        observe_stage("predict", "build_response", time.perf_counter() - started)
+        return response
+    
+    async def predict_batch(self, rows: List[Dict[str, Any]], explain: str = "top-k",
+                            top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+        """
+        Predict outcomes for many matches with a single model call
+        
+        Each row is validated on its own; rows that fail validation or
+        scoring are reported with an error in their slot and do not fail
+        the rest of the batch. Results keep the order of the input rows.
+        Returns the BatchPredictionResponse body as plain JSON types.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        valid: List[Tuple[int, MatchInput, Dict]] = []
+        
+        # Rows are validated here, not by FastAPI, so this counts as input mapping
+        started = time.perf_counter()
+        for idx, row in enumerate(rows):
+            try:
+                match_data = MatchInput.model_validate(row)
+            except ValidationError as e:
+                results[idx] = self._batch_item(idx, error=self.format_validation_error(e))
+                continue
+            valid.append((idx, match_data, self.build_model_input(match_data)))
+        observe_stage("predict_batch", "input_mapping", time.perf_counter() - started)
+        
+        if valid:
+            if getattr(self, "predictor", None):
+                outcomes = await self.executor.run(
+                    'predict_batch', [model_input for _, _, model_input in valid], explain, top_k
+                )
+            else:
+                outcomes = [self._fallback_prediction(match_data, model_input, explain, top_k)
+                            for _, match_data, model_input in valid]
+                predictions_total.inc("predict_batch", "fallback", amount=len(valid))
+            
+            for (idx, match_data, _), outcome in zip(valid, outcomes):
+                if isinstance(outcome, Exception):
+                    results[idx] = self._batch_item(idx, error="Prediction failed")
+                    continue
+                try:
+                    winner, batting_win_prob, shap_values = outcome
+                    prediction = self._build_response(match_data, winner, batting_win_prob, shap_values)
+                    results[idx] = self._batch_item(idx, prediction=prediction)
+                except Exception:
+                    logger.exception(f"Error building response for batch row {idx}")
+                    results[idx] = self._batch_item(idx, error="Prediction failed")
+        
+        failed = sum(1 for item in results if item["error"] is not None)
+        return {"results": results, "succeeded": len(results) - failed, "failed": failed}
+    
+    def _batch_item(self, index: int, prediction: Optional[Dict[str, Any]] = None,
+                    error: Optional[str] = None) -> Dict[str, Any]:
+        """BatchPredictionItem body"""
+        return {"index": index, "prediction": prediction, "error": error}
+    
+    async def win_probability_curve(self, request: WinProbabilityCurveRequest) -> WinProbabilityCurveResponse:
+        """
+        Win probability over a grid of runs scored, balls bowled and wickets
+        lost from the current chase state, scored in one model call.
+        States already decided (target reached, no balls or wickets left)
+        get 1.0 or 0.0 without calling the model, and scenarios that cannot
+        happen (e.g. runs scored off no balls) get None.
+        """
+        match_data = request.match
+        missing = [name for name in ('runs_required', 'balls_remaining', 'wickets_in_hand', 'target_match')
+                   if getattr(match_data, name) is None]
+        if missing:
+            raise ValueError(f"Chase state is incomplete, missing: {', '.join(missing)}")
+        if not getattr(self.predictor, 'loaded', False):
+            raise ModelNotLoadedError("Model not loaded")
+        
+        chase = dict(
+            runs_required=match_data.runs_required,
+            balls_remaining=match_data.balls_remaining,
+            wickets_in_hand=match_data.wickets_in_hand,
+            target=match_data.target_match,
+            match_type=match_data.match_type,
+        )
+        # Sized from the ranges so an oversized grid is rejected before any list is built
+        cells = len(request.runs) * len(request.balls) * len(request.wickets)
+        if cells > MAX_GRID_CELLS:
+            raise ValueError(f"Scenario grid has {cells} cells; the limit is {MAX_GRID_CELLS}")
+        grid = build_chase_grid(runs=request.runs.values(), balls=request.balls.values(),
+                                wickets=request.wickets.values(), **chase)
+        current = build_chase_grid(runs=[0], balls=[0], wickets=[0], **chase)
+        
+        # Score the open states plus the current state as the last row
+        open_states = grid.scored
+        numeric = {name: np.concatenate([values[open_states], current.features[name]])
+                   for name, values in grid.features.items()}
+        scored = await self.executor.run('predict_proba_grid', self.build_model_input(match_data), numeric)
+        
+        probabilities = grid.terminal_probability.astype(np.float64)
+        probabilities[open_states] = scored[:-1]
+        probabilities = np.where(grid.reachable, np.round(probabilities, 4), None)
+        current_probability = (float(current.terminal_probability[0]) if current.terminal[0]
+                               else float(scored[-1]))
+        
+        return WinProbabilityCurveResponse(
+            batting_team=match_data.team1,
+            bowling_team=match_data.team2,
+            current_probability=round(current_probability, 4),
+            runs=grid.runs.tolist(),
+            balls=grid.balls.tolist(),
+            wickets=grid.wickets.tolist(),
+            probabilities=probabilities.reshape(grid.shape).tolist(),
+        )
+    
+    async def predict_probability(self, model_input: Dict[str, Any]) -> float:
+        """
+        Batting-team win probability for a prepared model input, without
+        explanation. Used by live sessions, which keep their own state.
+        """
+        if not getattr(self.predictor, 'loaded', False):
+            raise ModelNotLoadedError("Model not loaded")
+        if self.batcher is not None:
+            _, batting_win_prob, _ = await self.batcher.submit(model_input, "none", DEFAULT_TOP_K)
+        else:
+            _, batting_win_prob, _ = await self.executor.run('predict', model_input, "none", DEFAULT_TOP_K)
+        return float(batting_win_prob)
+    
+    def build_model_input(self, match_data: MatchInput) -> Dict[str, Any]:
+        """Map an API match input to the predictor's feature dictionary"""
+        return {
             'team1': match_data.team1,
             'team2': match_data.team2,
             'batting_team': match_data.team1,  # Assume team1 is batting
@@ -55,18 +357,30 @@ class PredictionService:
             'current_run_rate': getattr(match_data, 'current_run_rate', 6.0),
             'required_run_rate': getattr(match_data, 'required_run_rate', 7.5)
         }
+    
+    def _fallback_prediction(self, match_data: MatchInput, model_input: Dict[str, Any], explain: str = "top-k",
+                             top_k: int = DEFAULT_TOP_K) -> Tuple[str, float, List[dict]]:
+        """Fallback prediction if predictor unavailable"""
+        logger.warning("Predictor not available, returning fallback prediction")
+        batting_team = model_input.get('batting_team') or match_data.team1
+        if explain == "none":
+            return batting_team, 0.5, []
+        shap_values = self._generate_dynamic_shap_values(model_input)
+        return batting_team, 0.5, shap_values if explain == "full" else shap_values[:top_k]
+    
+    def _build_response(self, match_data: MatchInput, winner: str, batting_win_prob: float,
+                        shap_values: List[dict]) -> Dict[str, Any]:
+        """
+        Convert raw predictor output into the API response
+        
+        The body is built directly from plain JSON types, in the field order
+        of PredictionResponse, instead of through ShapValue/PredictionResponse
+        objects: every value is coerced here the way the model would, so the
+        route can encode it without validating it again.
+        """
+        if not isinstance(winner, str):
+            raise ValueError(f"Predictor returned no winner ({winner!r})")
         
-        # Get prediction from ML model
-        if getattr(self, "predictor", None):
-            winner, batting_win_prob, shap_values = self.predictor.predict(model_input)
-        else:
-            # Fallback prediction if predictor unavailable
-            logger.warning("Predictor not available, returning fallback prediction")
-            batting_team = model_input.get('batting_team') or match_data.team1
-            winner = batting_team
-            batting_win_prob = 0.5
-            shap_values = self._generate_dynamic_shap_values(model_input)
-
         # Determine confidence level
         confidence = "high" if batting_win_prob > 0.7 else "medium" if batting_win_prob > 0.6 else "low"
         
@@ -75,14 +389,15 @@ class PredictionService:
         try:
             for sv in shap_values:
                 # Ensure keys exist and types are correct
-                feature = str(sv.get('feature', 'Unknown'))
-                value = float(sv.get('value', 0.0))
-                impact = str(sv.get('impact', 'neutral'))
-                shap_explanation.append(ShapValue(feature=feature, value=value, impact=impact))
+                shap_explanation.append({
+                    "feature": str(sv.get('feature', 'Unknown')),
+                    "value": float(sv.get('value', 0.0)),
+                    "impact": str(sv.get('impact', 'neutral')),
+                })
         except Exception:
             # Fallback to default explanation to avoid 500s
             logger.exception("Error converting SHAP values, using default explanation")
-            shap_explanation = [ShapValue(**sv) for sv in self._default_shap_values()]
+            shap_explanation = [dict(sv) for sv in self._default_shap_values()]
         
         # Prepare factors
         factors = {
@@ -92,13 +407,22 @@ class PredictionService:
             "match_type": match_data.match_type
         }
         
-        return PredictionResponse(
-            winner=winner,
-            probability=round(batting_win_prob, 2),
-            confidence=confidence,
-            shap_explanation=shap_explanation,
-            factors=factors
-        )
+        return {
+            "winner": winner,
+            "probability": float(round(batting_win_prob, 2)),
+            "confidence": confidence,
+            "shap_explanation": shap_explanation,
+            "factors": factors,
+            "model_version": self.model_version,
+        }
+    
+    def format_validation_error(self, error: ValidationError) -> str:
+        """Summarize a pydantic validation error for a batch row or live message"""
+        messages = []
+        for err in error.errors():
+            location = ".".join(str(part) for part in err.get('loc', ()))
+            messages.append(f"{location}: {err.get('msg')}" if location else str(err.get('msg')))
+        return "; ".join(messages) or "Invalid match input"
     
     def _generate_dynamic_shap_values(self, model_input: dict) -> List[dict]:
         """
@@ -0,0 +1,34 @@
+import inspect
+import json
+from typing import Any
+from fastapi import routing
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+# FastAPI serializes a response_model either with pydantic's Rust JSON
+# serializer (newer releases, "dump_json") or through json.dumps with
+# starlette's options. The two write small floats differently (-7.2e-05 vs
+# -0.000072), so the same encoder as this FastAPI's default is used to keep
+# response bytes unchanged. Both are faster than validating and serializing
+# the response model.
+_PYDANTIC_JSON = "dump_json" in inspect.signature(routing.serialize_response).parameters
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+def encode(content: Any) -> bytes:
+    if _PYDANTIC_JSON:
+        return to_json(content)
+    return _encoder.encode(content).encode("utf-8")
+
+
+class PlainJSONResponse(JSONResponse):
+    """
+    JSON response for bodies the server built itself from plain types
+    
+    Returning a Response from a route skips FastAPI's response_model
+    validation and serialization; the response_model still documents the
+    schema. Output is byte-identical to what the response_model would give.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return encode(content)
@@ -0,0 +1,119 @@
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+# Balls in a full innings by match type (Test innings are unbounded)
+INNINGS_BALLS = {"T20": 120, "ODI": 300}
+DEFAULT_INNINGS_BALLS = 300
+
+# Upper bound on scored cells per request
+MAX_GRID_CELLS = 20000
+# Most runs and wickets a scenario can add per legal ball (extras and
+# run-outs off wides are not modelled)
+MAX_RUNS_PER_BALL = 6
+MAX_WICKETS_PER_BALL = 1
+WICKETS = 10
+
+
+class ChaseGrid:
+    """
+    Derived chase states for every (wickets lost, balls bowled, runs scored)
+    combination around a current state
+    
+    Arrays are flattened in C order over the (wickets, balls, runs) axes.
+    ``reachable`` is False for scenarios that cannot happen (runs or wickets
+    without the balls to score or lose them). ``terminal`` marks reachable
+    states already decided by the rules (target reached, or out of
+    balls/wickets); ``terminal_probability`` holds their result.
+    """
+    
+    def __init__(self, runs: np.ndarray, balls: np.ndarray, wickets: np.ndarray,
+                 features: Dict[str, np.ndarray], reachable: np.ndarray, terminal: np.ndarray,
+                 terminal_probability: np.ndarray):
+        self.runs = runs
+        self.balls = balls
+        self.wickets = wickets
+        self.features = features
+        self.reachable = reachable
+        self.terminal = terminal
+        self.terminal_probability = terminal_probability
+    
+    @property
+    def scored(self) -> np.ndarray:
+        """States the model has to score: reachable and not yet decided"""
+        return self.reachable & ~self.terminal
+    
+    @property
+    def shape(self):
+        return (len(self.wickets), len(self.balls), len(self.runs))
+
+
+def build_chase_grid(runs_required: int, balls_remaining: int, wickets_in_hand: int,
+                     target: int, match_type: Optional[str], runs: Sequence[int],
+                     balls: Sequence[int], wickets: Sequence[int]) -> ChaseGrid:
+    """
+    Apply every scenario to the current chase state
+    
+    For X runs scored off the next Y balls with Z wickets lost, the runs
+    required, balls remaining and wickets in hand are reduced accordingly
+    and both run rates are recomputed from the runs scored and balls
+    bowled so far (innings length from ``match_type``).
+    """
+    if balls_remaining < 0 or not 0 <= wickets_in_hand <= WICKETS or target < 1:
+        raise ValueError("Chase state is invalid: balls_remaining and wickets_in_hand (at most "
+                         f"{WICKETS}) must not be negative and target_match must be positive")
+    runs = np.asarray(runs, dtype=np.int64)
+    balls = np.asarray(balls, dtype=np.int64)
+    wickets = np.asarray(wickets, dtype=np.int64)
+    
+    cells = len(runs) * len(balls) * len(wickets)
+    if cells == 0:
+        raise ValueError("Scenario ranges must not be empty")
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"Scenario grid has {cells} cells; the limit is {MAX_GRID_CELLS}")
+    if runs.min() < 0 or balls.min() < 0 or wickets.min() < 0:
+        raise ValueError("Scenario ranges must not be negative")
+    if balls.max() > balls_remaining:
+        raise ValueError(f"Cannot bowl more than the {balls_remaining} balls remaining")
+    if wickets.max() > wickets_in_hand:
+        raise ValueError(f"Cannot lose more than the {wickets_in_hand} wickets in hand")
+    
+    innings_balls = INNINGS_BALLS.get((match_type or "").upper(), DEFAULT_INNINGS_BALLS)
+    innings_balls = max(innings_balls, balls_remaining)
+    runs_scored = max(target - runs_required, 0)
+    balls_bowled = innings_balls - balls_remaining
+    
+    w, b, r = np.meshgrid(wickets, balls, runs, indexing='ij')
+    w, b, r = w.ravel(), b.ravel(), r.ravel()
+    
+    new_runs_required = runs_required - r
+    new_balls_remaining = balls_remaining - b
+    new_wickets = wickets_in_hand - w
+    new_balls_bowled = balls_bowled + b
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current_run_rate = np.where(new_balls_bowled > 0, (runs_scored + r) * 6.0 / new_balls_bowled, 0.0)
+        required_run_rate = np.where(
+            new_balls_remaining > 0, np.maximum(new_runs_required, 0) * 6.0 / new_balls_remaining, 0.0
+        )
+    
+    reachable = (r <= MAX_RUNS_PER_BALL * b) & (w <= MAX_WICKETS_PER_BALL * b)
+    won = new_runs_required <= 0
+    lost = ~won & ((new_balls_remaining <= 0) | (new_wickets <= 0))
+    
+    features = {
+        'runs_required': np.maximum(new_runs_required, 0).astype(np.float64),
+        'balls_remaining': np.maximum(new_balls_remaining, 0).astype(np.float64),
+        'wickets_in_hand': np.maximum(new_wickets, 0).astype(np.float64),
+        'target_match': np.full(r.shape, float(target)),
+        'current_run_rate': current_run_rate,
+        'required_run_rate': required_run_rate,
+    }
+    return ChaseGrid(
+        runs=runs,
+        balls=balls,
+        wickets=wickets,
+        features=features,
+        reachable=reachable,
+        terminal=reachable & (won | lost),
+        terminal_probability=np.where(won, 1.0, 0.0),
+    )
@@ -0,0 +1,284 @@
+"""
+Latency and throughput benchmarks for the prediction stack
+
+Runs offline: the predictor is called directly and the FastAPI app is
+served in-process over an ASGI transport (no server, no network). Import
+and model load time are measured in fresh interpreters. Results are
+written as JSON; with --baseline the run is compared to an earlier result
+and exits non-zero when a metric regressed beyond --tolerance.
+
+Usage:
+    python benchmark.py [--model PATH] [--output results.json]
+                        [--baseline baseline.json] [--tolerance 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Every request differs anyway, but keep the response cache out of the numbers
+os.environ.setdefault("PREDICTION_CACHE", "0")
+
+IMPORT_PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+LOAD_PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+from app.ml.predictor import CricketPredictor
+started = time.perf_counter()
+predictor = CricketPredictor({path!r})
+print(json.dumps({{"seconds": time.perf_counter() - started, "loaded": predictor.loaded}}))
+"""
+
+# Lower is better for these; higher is better for throughput
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+# BatchPredictionRequest accepts at most this many matches
+MAX_HTTP_BATCH = 1000
+
+
+def run_probe(template: str, **fields) -> dict:
+    """Run a snippet in a fresh interpreter and return its JSON output (median of 3 runs)"""
+    backend = str(Path(__file__).parent)
+    runs = []
+    for _ in range(3):
+        output = subprocess.run(
+            [sys.executable, "-c", template.format(backend=backend, **fields)],
+            check=True, capture_output=True, text=True, env=dict(os.environ),
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    runs.sort(key=lambda run: run["seconds"])
+    return runs[1]
+
+
+def summarize(timings, rows_per_call: int = 1, wall_seconds: float = None) -> dict:
+    import numpy as np
+    values = np.asarray(timings) * 1000
+    wall = wall_seconds if wall_seconds is not None else float(np.sum(timings))
+    return {
+        "n": len(values),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+        "rows_per_second": len(values) * rows_per_call / wall if wall > 0 else None,
+    }
+
+
+def sample_inputs(predictor, n: int, seed: int = 0):
+    """Match states drawn from the model's vocabulary and plausible chases"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    encoder = predictor.encoder
+    vocab = ({name: list(index) for name, index in zip(encoder.categorical_features, encoder.category_index)}
+             if encoder is not None else {})
+    teams = vocab.get('batting_team') or ["India", "Australia"]
+    venues = vocab.get('venue') or ["Eden Gardens"]
+    inputs = []
+    for _ in range(n):
+        balls = int(rng.integers(6, 300))
+        runs = int(rng.integers(1, 300))
+        target = runs + int(rng.integers(0, 150)) + 1
+        bowled = 300 - balls
+        inputs.append({
+            'team1': str(rng.choice(teams)), 'team2': str(rng.choice(teams)),
+            'venue': str(rng.choice(venues)), 'runs_required': runs, 'balls_remaining': balls,
+            'wickets_in_hand': int(rng.integers(1, 11)), 'target_match': target,
+            'current_run_rate': round((target - runs) * 6 / bowled, 2) if bowled else 0.0,
+            'required_run_rate': round(runs * 6 / balls, 2),
+        })
+    return inputs
+
+
+def model_input(row: dict) -> dict:
+    return dict(row, batting_team=row['team1'], bowling_team=row['team2'],
+                toss_winner=row['team1'], toss_decision='bat')
+
+
+def bench_predictor(predictor, inputs, iterations: int, batch_sizes) -> dict:
+    results = {}
+    rows = [model_input(row) for row in inputs]
+    for explain in ("none", "top-k", "full"):
+        timings = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            predictor.predict(rows[i % len(rows)], explain)
+            timings.append(time.perf_counter() - started)
+        results[f"predictor.single.{explain}"] = summarize(timings)
+    
+    for size in batch_sizes:
+        for explain in ("none", "top-k"):
+            timings = []
+            for i in range(max(5, iterations // max(1, size // 10))):
+                offset = (i * size) % len(rows)
+                batch = (rows[offset:] + rows[:offset])[:size]
+                started = time.perf_counter()
+                predictor.predict_batch(batch, explain)
+                timings.append(time.perf_counter() - started)
+            results[f"predictor.batch{size}.{explain}"] = summarize(timings, rows_per_call=size)
+    return results
+
+
+async def bench_http(inputs, iterations: int, batch_sizes, concurrency: int) -> dict:
+    import httpx
+    from app.main import app
+    from app.routers import prediction
+    
+    results = {}
+    async with app.router.lifespan_context(app):
+        while not prediction.service_ready:
+            if prediction.startup_error:
+                raise RuntimeError(prediction.startup_error)
+            await asyncio.sleep(0.05)
+        
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def timed_post(url, body):
+                started = time.perf_counter()
+                response = await client.post(url, json=body)
+                elapsed = time.perf_counter() - started
+                response.raise_for_status()
+                return elapsed
+            
+            for explain in ("none", "top-k"):
+                url = f"/api/predict?explain={explain}"
+                timings = [await timed_post(url, inputs[i % len(inputs)]) for i in range(iterations)]
+                results[f"http.single.{explain}"] = summarize(timings)
+                
+                # Throughput with ``concurrency`` requests in flight
+                started = time.perf_counter()
+                timings = await _limited([timed_post(url, inputs[i % len(inputs)])
+                                          for i in range(iterations)], concurrency)
+                results[f"http.concurrent{concurrency}.{explain}"] = summarize(
+                    timings, wall_seconds=time.perf_counter() - started)
+            
+            for size in batch_sizes:
+                if size > MAX_HTTP_BATCH:
+                    continue
+                timings = []
+                for i in range(max(5, iterations // max(1, size // 10))):
+                    offset = (i * size) % len(inputs)
+                    batch = (inputs[offset:] + inputs[:offset])[:size]
+                    timings.append(await timed_post("/api/predict/batch?explain=none", {"matches": batch}))
+                results[f"http.batch{size}.none"] = summarize(timings, rows_per_call=size)
+    return results
+
+
+async def _limited(coroutines, limit: int):
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+    return await asyncio.gather(*[run(coroutine) for coroutine in coroutines])
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than ``tolerance`` (a fraction)"""
+    regressions = []
+    for name, metrics in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            continue
+        for key in LATENCY_KEYS:
+            if reference.get(key) and metrics[key] > reference[key] * (1 + tolerance):
+                regressions.append((name, key, reference[key], metrics[key]))
+        if reference.get("rows_per_second") and metrics.get("rows_per_second") \
+                and metrics["rows_per_second"] < reference["rows_per_second"] * (1 - tolerance):
+            regressions.append((name, "rows_per_second", reference["rows_per_second"], metrics["rows_per_second"]))
+        if reference.get("seconds") and metrics.get("seconds") \
+                and metrics["seconds"] > reference["seconds"] * (1 + tolerance):
+            regressions.append((name, "seconds", reference["seconds"], metrics["seconds"]))
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the prediction stack in-process")
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH"),
+                        help="Model file (default: MODEL_PATH or models/cricket_model.pkl)")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per single-prediction benchmark")
+    parser.add_argument("--batch-sizes", default="1,10,100,1000", help="Comma-separated batch sizes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight for throughput")
+    parser.add_argument("--skip-http", action="store_true", help="Only benchmark the predictor directly")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the results")
+    parser.add_argument("--baseline", default=None, help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown before a metric counts as regressed (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.model:
+        os.environ["MODEL_PATH"] = args.model
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+    
+    from app.ml.predictor import CricketPredictor
+    predictor = CricketPredictor(args.model)
+    if not predictor.loaded:
+        print("❌ Error: no trained model found. Run train_model.py first.")
+        sys.exit(1)
+    inputs = sample_inputs(predictor, 2000)
+    
+    results = {
+        "import.app.main": run_probe(IMPORT_PROBE, module="app.main"),
+        "import.predictor": run_probe(IMPORT_PROBE, module="app.ml.predictor"),
+        "load.model": run_probe(LOAD_PROBE, path=str(predictor.model_path)),
+    }
+    results.update(bench_predictor(predictor, inputs, args.iterations, batch_sizes))
+    if not args.skip_http:
+        results.update(asyncio.run(bench_http(inputs, args.iterations, batch_sizes, args.concurrency)))
+    
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "model_path": str(predictor.model_path),
+            "model_version": predictor.model_version,
+            "explainer": predictor.explainer_kind,
+            "inference_engine": predictor.inference_engine,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"{'Benchmark':<32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rows/s':>10}")
+    for name, metrics in results.items():
+        if "seconds" in metrics:
+            print(f"{name:<32} {metrics['seconds'] * 1000:>9.1f}")
+            continue
+        print(f"{name:<32} {metrics['p50_ms']:>9.3f} {metrics['p95_ms']:>9.3f} {metrics['p99_ms']:>9.3f} "
+              f"{metrics['rows_per_second']:>10.0f}")
+    print(f"\n✓ Results saved to: {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for name, key, before, after in regressions:
+                print(f"  {name} {key}: {before:.3f} -> {after:.3f}")
+            sys.exit(1)
+        print(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
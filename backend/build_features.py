@@ -0,0 +1,46 @@
+"""
+Build the training feature file from Cricsheet ball-by-ball JSON matches
+
+Each run only parses match files that are new (or changed) since the last
+run, appending their second-innings ball states to the output. Try it
+offline with the bundled fixtures:
+
+    python build_features.py --input data/cricsheet_fixtures --output /tmp/features.csv
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.ml.feature_builder import build_features
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build cricket_features.csv from Cricsheet JSON files")
+    parser.add_argument("--input", required=True, help="Directory of Cricsheet match files (*.json)")
+    parser.add_argument("--output", default=str(Path(__file__).parent.parent / "cricket_features.csv"),
+                        help="Feature CSV to append to (default: ../cricket_features.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: one per CPU)")
+    parser.add_argument("--full", action="store_true", help="Rebuild the output from all files")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    try:
+        stats = build_features(args.input, args.output, workers=args.workers, full=args.full)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    
+    print(f"✓ {stats['processed']} new match files ({stats['empty']} without usable chase), "
+          f"{stats['skipped']} already built, {stats['failed']} failed")
+    print(f"✓ {stats['rows']} rows appended to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
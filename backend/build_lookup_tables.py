@@ -0,0 +1,66 @@
+"""
+Build precomputed win-probability lookup tables for the configured
+team/venue keys (see lookup_tables.json) and report their largest
+interpolation error against the live model.
+
+Serve them by pointing LOOKUP_TABLES_DIR at the output directory. Tables
+record the model version they were built from and are ignored once the
+model file changes, so rebuild after every retrain.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.ml.predictor import CricketPredictor
+from app.ml.lookup_tables import LookupTables, build_tables, evaluate_tables
+
+BASE_DIR = Path(__file__).parent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build win-probability lookup tables")
+    parser.add_argument("--config", default=str(BASE_DIR / "lookup_tables.json"),
+                        help="Axes and team/venue keys to materialize")
+    parser.add_argument("--output", default=str(BASE_DIR / "models" / "lookup"),
+                        help="Directory for the tables and their index")
+    parser.add_argument("--model", default=None, help="Model file (default: MODEL_PATH or models/cricket_model.pkl)")
+    parser.add_argument("--evaluate-only", action="store_true",
+                        help="Skip the build and only report errors of existing tables")
+    parser.add_argument("--samples", type=int, default=20000,
+                        help="Random chase states per table for the error report")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    predictor = CricketPredictor(model_path=args.model)
+    if not predictor.loaded:
+        print("❌ Error: no trained model found. Run train_model.py first.")
+        sys.exit(1)
+    
+    if not args.evaluate_only:
+        with open(args.config) as f:
+            config = json.load(f)
+        start = time.perf_counter()
+        index_path = build_tables(predictor, config, args.output)
+        print(f"✓ Built {len(config['keys'])} tables in {time.perf_counter() - start:.1f}s: {index_path}")
+    
+    tables = LookupTables.load(args.output)
+    if tables.model_version != predictor.model_version:
+        print(f"⚠ Tables were built for model {tables.model_version}, current model is {predictor.model_version}")
+    
+    report = evaluate_tables(predictor, tables, samples=args.samples)
+    print(f"\n{'Key':<60} {'max':>8} {'p99':>8} {'mean':>8}")
+    for key, errors in report.items():
+        print(f"{key:<60} {errors['max_error']:>8.4f} {errors['p99_error']:>8.4f} {errors['mean_error']:>8.4f}")
+    worst_key = max(report, key=lambda k: report[k]['max_error'])
+    print(f"\nLargest error {report[worst_key]['max_error']:.4f} for {worst_key} at {report[worst_key]['worst_state']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time budget check for the API
+
+Imports the app in fresh interpreters and fails (exit code 1) when the
+median import time exceeds the budget or when a heavy module that the
+serving path should only load on demand (pandas, shap, sklearn, scipy, joblib)
+is imported by the app itself. With --model, also times loading that
+model and its first prediction.
+
+Usage:
+    python check_startup.py [--budget 1.0] [--model models/cricket_model.npz] [--load-budget 0.5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Heavy modules deferred until a model or code path needs them
+DEFERRED_MODULES = ("pandas", "shap", "sklearn", "scipy", "joblib")
+
+IMPORT_PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+started = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+LOAD_PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+import app.main
+from app.ml.predictor import CricketPredictor
+started = time.perf_counter()
+predictor = CricketPredictor({path!r})
+loaded = time.perf_counter()
+predictor.predict({{"batting_team": "India", "bowling_team": "Australia", "venue": "Eden Gardens",
+                   "runs_required": 80, "balls_remaining": 60, "wickets_in_hand": 6,
+                   "target_match": 250}}, "top-k")
+print(json.dumps({{"seconds": loaded - started, "first_prediction": time.perf_counter() - loaded,
+                  "model_loaded": predictor.loaded, "explainer": predictor.explainer_kind,
+                  "loaded": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+
+def probe(template: str, runs: int, **fields) -> list:
+    backend = str(Path(__file__).parent)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", template.format(backend=backend, modules=DEFERRED_MODULES, **fields)],
+            check=True, capture_output=True, text=True, env=dict(os.environ),
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check API import time against a budget")
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median import time of app.main (s)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--model", default=None, help="Also time loading this model file")
+    parser.add_argument("--load-budget", type=float, default=None, help="Maximum median model load time (s)")
+    args = parser.parse_args()
+    
+    failures = []
+    imports = probe(IMPORT_PROBE, args.runs)
+    import_seconds = statistics.median(run["seconds"] for run in imports)
+    eager = sorted({module for run in imports for module in run["loaded"]})
+    print(f"import app.main: {import_seconds * 1000:.0f} ms (median of {args.runs}, budget {args.budget * 1000:.0f} ms)")
+    if import_seconds > args.budget:
+        failures.append(f"import took {import_seconds:.3f}s, over the {args.budget:.3f}s budget")
+    if eager:
+        failures.append(f"importing the app loaded {', '.join(eager)}")
+    
+    if args.model:
+        loads = probe(LOAD_PROBE, args.runs, path=args.model)
+        load_seconds = statistics.median(run["seconds"] for run in loads)
+        first = statistics.median(run["first_prediction"] for run in loads)
+        print(f"load {args.model}: {load_seconds * 1000:.0f} ms, first prediction {first * 1000:.1f} ms "
+              f"(explainer: {loads[0]['explainer']}, modules loaded: {', '.join(loads[0]['loaded']) or 'none'})")
+        if not loads[0]["model_loaded"]:
+            failures.append(f"model {args.model} did not load")
+        if args.load_budget is not None and load_seconds > args.load_budget:
+            failures.append(f"model load took {load_seconds:.3f}s, over the {args.load_budget:.3f}s budget")
+    
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✓ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for running several uvicorn workers that share one
+preloaded model.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+The app is imported once in the parent process (preload_app) with
+PRELOAD_MODEL=1, so the model is loaded before the workers fork and its
+pages are shared copy-on-write. MODEL_MMAP=1 with INFERENCE_ENGINE=compiled
+additionally maps the compiled forest from disk so it is shared through the
+page cache; the sklearn engine copies its trees on load and shares nothing
+beyond what copy-on-write keeps.
+"""
+import os
+
+os.environ.setdefault("PRELOAD_MODEL", "1")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
@@ -0,0 +1,124 @@
+"""
+Compare the pickled pipeline with the compact model artifact
+Reports file size, load time and resident memory of each format, and
+checks that both give the same probabilities within the stated tolerance.
+
+Usage: python model_format_report.py [models_dir] [--rows N]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Loads one model in a fresh interpreter so load time and memory are not
+# polluted by the other format
+PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {backend!r})
+from app.services.memory_stats import process_memory
+from app.ml.predictor import CricketPredictor  # import cost is not part of the load
+before = process_memory()
+started = time.perf_counter()
+predictor = CricketPredictor({path!r}, inference_engine="compiled")
+elapsed = time.perf_counter() - started
+after = process_memory()
+# Without smaps_rollup only the peak RSS is known; its growth still bounds the load
+source = "rss" if "rss" in after else "max_rss" if "max_rss" in after else None
+print(json.dumps({{"load_seconds": elapsed, "rss_before": before.get(source), "rss_after": after.get(source),
+                   "rss_source": source, "loaded": predictor.loaded}}))
+"""
+
+
+def probe(path: Path) -> dict:
+    backend = str(Path(__file__).parent)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(backend=backend, path=str(path))],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare_predictions(pickle_path: Path, compact_path: Path, rows: int) -> float:
+    import numpy as np
+    from app.ml.predictor import CricketPredictor
+    
+    reference = CricketPredictor(str(pickle_path), inference_engine="sklearn")
+    compact = CricketPredictor(str(compact_path))
+    
+    # Sample inputs from the model's own vocabulary and plausible chase states
+    rng = np.random.default_rng(0)
+    vocab = {name: list(index) for name, index in
+             zip(compact.encoder.categorical_features, compact.encoder.category_index)}
+    inputs = []
+    for _ in range(rows):
+        row = {name: rng.choice(values) if values else None for name, values in vocab.items()}
+        balls = int(rng.integers(1, 300))
+        runs = int(rng.integers(1, 300))
+        row.update({
+            'runs_required': runs,
+            'balls_remaining': balls,
+            'wickets_in_hand': int(rng.integers(0, 11)),
+            'target_match': int(rng.integers(100, 400)),
+            'current_run_rate': float(rng.uniform(2, 10)),
+            'required_run_rate': runs * 6 / balls,
+        })
+        inputs.append(row)
+    
+    p_reference = reference._predict_proba(reference._prepare_batch(inputs))[:, 1]
+    p_compact = compact._predict_proba(compact._prepare_batch(inputs))[:, 1]
+    return float(np.abs(p_reference - p_compact).max())
+
+
+def main():
+    from app.ml.compact_model import CompactModel, COMPACT_SUFFIX, PROBABILITY_TOLERANCE
+    
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("models_dir", nargs="?", default=str(Path(__file__).parent / "models"))
+    parser.add_argument("--rows", type=int, default=2000, help="Rows used for the equivalence check")
+    args = parser.parse_args()
+    
+    models_dir = Path(args.models_dir)
+    pickle_path = models_dir / "cricket_model.pkl"
+    compact_path = models_dir / f"cricket_model{COMPACT_SUFFIX}"
+    
+    if not pickle_path.exists():
+        print(f"❌ Pickled model not found: {pickle_path}")
+        return 1
+    if not compact_path.exists():
+        import joblib
+        info_path = models_dir / "model_info.pkl"
+        info = joblib.load(info_path) if info_path.exists() else None
+        CompactModel.from_pipeline(joblib.load(pickle_path), info).save(str(compact_path))
+        print(f"✓ Exported compact model: {compact_path}")
+    
+    report = {}
+    for name, path in (("pickle", pickle_path), ("compact", compact_path)):
+        result = probe(path)
+        result["file_bytes"] = path.stat().st_size
+        before, after = result["rss_before"], result["rss_after"]
+        result["rss_delta_mib"] = round(after - before, 2) if before is not None and after is not None else None
+        report[name] = result
+    
+    max_diff = compare_predictions(pickle_path, compact_path, args.rows)
+    report["max_probability_diff"] = max_diff
+    report["tolerance"] = PROBABILITY_TOLERANCE
+    report["equivalent"] = max_diff <= PROBABILITY_TOLERANCE
+    
+    print("=" * 60)
+    print(f"{'':10}{'file (KiB)':>14}{'load (ms)':>12}{'RSS +MiB':>12}")
+    for name in ("pickle", "compact"):
+        r = report[name]
+        delta = f"{r['rss_delta_mib']:>12.2f}" if r["rss_delta_mib"] is not None else f"{'n/a':>12}"
+        print(f"{name:10}{r['file_bytes'] / 1024:>14.1f}{r['load_seconds'] * 1000:>12.1f}{delta}")
+    print(f"\nMax probability difference: {max_diff:.2e} (tolerance {PROBABILITY_TOLERANCE:.0e})")
+    print("=" * 60)
+    print(json.dumps(report, indent=2))
+    return 0 if report["equivalent"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
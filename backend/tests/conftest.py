@@ -0,0 +1,115 @@
+"""
+Shared fixtures: a small model trained with the repo's own pipeline on
+synthetic chase states, saved as both the pickle and the compact artifact.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.ml.model_trainer import CricketModelTrainer
+
+TEAMS = ["Australia", "England", "India", "New Zealand", "Pakistan", "South Africa"]
+VENUES = ["Eden Gardens, Kolkata", "Lord's", "Melbourne Cricket Ground", "Wankhede Stadium, Mumbai"]
+
+
+def synthetic_rows(n: int, seed: int = 0) -> pd.DataFrame:
+    """Chase states whose outcome depends on the required rate, wickets and teams"""
+    rng = np.random.default_rng(seed)
+    batting = rng.choice(TEAMS, n)
+    bowling = np.array([rng.choice([t for t in TEAMS if t != b]) for b in batting])
+    target = rng.integers(150, 350, n)
+    balls = rng.integers(1, 300, n)
+    runs = np.minimum(rng.integers(1, 350, n), target)
+    wickets = rng.integers(1, 11, n)
+    crr = np.where(balls < 300, (target - runs) * 6.0 / np.maximum(300 - balls, 1), 0.0)
+    rrr = runs * 6.0 / balls
+    strength = np.array([TEAMS.index(t) for t in batting]) * 0.15
+    win = (rrr - wickets * 0.6 - strength + rng.normal(0, 1.5, n) < 4).astype(int)
+    return pd.DataFrame({
+        "batting_team": batting, "bowling_team": bowling, "venue": rng.choice(VENUES, n),
+        "toss_winner": np.where(rng.random(n) < 0.5, batting, bowling),
+        "toss_decision": rng.choice(["bat", "field"], n),
+        "runs_required": runs, "balls_remaining": balls, "wickets_in_hand": wickets,
+        "target_match": target, "current_run_rate": crr, "required_run_rate": rrr, "win": win,
+    })
+
+
+@pytest.fixture(scope="session")
+def model_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("models")
+    data_path = directory / "features.csv"
+    synthetic_rows(3000).to_csv(data_path, index=False)
+    trainer = CricketModelTrainer(n_jobs=1)
+    trainer.create_model_pipeline()
+    trainer.model.set_params(classifier__n_estimators=20, classifier__max_depth=8)
+    df = trainer.load_data(str(data_path))
+    trainer.model.fit(df[trainer.categorical_features + trainer.numerical_features], df[trainer.target])
+    trainer.save_model(str(directory), compact=True)
+    return directory
+
+
+@pytest.fixture(scope="session")
+def model_path(model_dir):
+    return str(model_dir / "cricket_model.pkl")
+
+
+@pytest.fixture(scope="session")
+def compact_model_path(model_dir):
+    return str(model_dir / "cricket_model.npz")
+
+
+@pytest.fixture
+def lookup_dir(model_path, tmp_path, monkeypatch):
+    """Lookup tables for India v Australia at Lord's, enabled in the settings"""
+    from app.config import settings
+    from app.ml.lookup_tables import build_tables
+    from app.ml.predictor import CricketPredictor
+    
+    config = {
+        "innings_balls": 300,
+        "axes": {
+            "target": {"start": 200, "stop": 300, "step": 50},
+            "wickets": {"start": 1, "stop": 10, "step": 1},
+            "balls": {"start": 6, "stop": 300, "step": 6},
+            "runs": {"start": 0, "stop": 300, "step": 10},
+        },
+        # Configured with an alternative spelling of the model's "Lord's"
+        "keys": [{"batting_team": "India", "bowling_team": "Australia", "venue": "Lords"}],
+    }
+    build_tables(CricketPredictor(model_path), config, str(tmp_path))
+    monkeypatch.setattr(settings, "lookup_tables_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def match_input():
+    return {
+        "batting_team": "India", "bowling_team": "Australia", "venue": "Lord's",
+        "toss_winner": "India", "toss_decision": "bat", "runs_required": 80,
+        "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250,
+        "current_run_rate": 5.7, "required_run_rate": 8.0,
+    }
+
+
+@pytest.fixture
+def client(model_path, monkeypatch):
+    """API client for the fixture model, ready once warm-up has finished"""
+    import time
+    from fastapi.testclient import TestClient
+    from app.config import settings
+    from app.main import app
+    
+    monkeypatch.setattr(settings, "model_path", model_path)
+    monkeypatch.setattr(settings, "inference_executor", "inline")
+    monkeypatch.setattr(settings, "warmup_rounds", 0)
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 30
+        while client.get("/api/health").status_code != 200:
+            assert time.monotonic() < deadline, "service did not become ready"
+            time.sleep(0.01)
+        yield client
@@ -0,0 +1,39 @@
+MATCH = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 80,
+         "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250}
+
+
+def test_results_keep_input_order(client):
+    rows = [dict(MATCH, runs_required=runs, team1=team1, team2=team2) for runs, team1, team2 in
+            [(10, "India", "Australia"), (150, "England", "India"), (80, "Pakistan", "South Africa"),
+             (40, "Australia", "New Zealand")]]
+    
+    response = client.post("/api/predict/batch", json={"matches": rows})
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["index"] for item in body["results"]] == [0, 1, 2, 3]
+    for row, item in zip(rows, body["results"]):
+        single = client.post("/api/predict", json=row).json()
+        assert item["prediction"]["probability"] == single["probability"]
+        assert item["prediction"]["winner"] == single["winner"]
+
+
+def test_invalid_row_fails_alone(client):
+    rows = [MATCH, dict(MATCH, wickets_in_hand="six"), {"team1": "India"}, dict(MATCH, runs_required=20)]
+    
+    response = client.post("/api/predict/batch", json={"matches": rows})
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    ok, mistyped, missing, last = body["results"]
+    assert ok["prediction"] and ok["error"] is None and last["prediction"]
+    assert mistyped["prediction"] is None and "wickets_in_hand" in mistyped["error"]
+    assert missing["prediction"] is None and "team2" in missing["error"]
+
+
+def test_more_than_1000_rows_are_rejected(client):
+    response = client.post("/api/predict/batch", json={"matches": [MATCH] * 1001})
+    
+    assert response.status_code == 422
+    assert client.post("/api/predict/batch", json={"matches": []}).status_code == 422
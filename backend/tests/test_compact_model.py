@@ -0,0 +1,32 @@
+import numpy as np
+
+from app.config import settings
+from app.ml.compact_model import PROBABILITY_TOLERANCE
+from app.ml.predictor import CricketPredictor
+from tests.conftest import synthetic_rows
+
+
+def test_compact_model_within_tolerance(model_path, compact_model_path):
+    pickled = CricketPredictor(model_path)
+    compact = CricketPredictor(compact_model_path)
+    rows = synthetic_rows(300, seed=11).drop(columns="win").to_dict("records")
+    
+    assert compact.loaded and compact.model is None
+    expected = pickled._predict_proba(pickled._prepare_batch(rows))
+    actual = compact._predict_proba(compact._prepare_batch(rows))
+    assert np.max(np.abs(actual - expected)) <= PROBABILITY_TOLERANCE
+
+
+def test_compact_model_predictions_match(model_path, compact_model_path, match_input, monkeypatch):
+    # The compact artifact always explains with tree-path attribution
+    monkeypatch.setattr(settings, "explainer", "tree-path")
+    pickled = CricketPredictor(model_path, inference_engine="compiled")
+    compact = CricketPredictor(compact_model_path)
+    
+    winner, probability, explanation = compact.predict(match_input, "full")
+    expected_winner, expected_probability, expected_explanation = pickled.predict(match_input, "full")
+    
+    assert winner == expected_winner
+    assert abs(probability - expected_probability) <= PROBABILITY_TOLERANCE
+    assert [entry["feature"] for entry in explanation] == [entry["feature"] for entry in expected_explanation]
+    assert compact.vocabularies == pickled.vocabularies
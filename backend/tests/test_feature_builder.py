@@ -0,0 +1,93 @@
+import csv
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.ml.feature_builder import FEATURE_COLUMNS, MANIFEST_SUFFIX, build_features, match_rows
+
+FIXTURES = Path(__file__).parent.parent / "data" / "cricsheet_fixtures"
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    directory = tmp_path / "matches"
+    shutil.copytree(FIXTURES, directory)
+    return directory
+
+
+def read_rows(path: Path):
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == FEATURE_COLUMNS
+    return rows[1:]
+
+
+def expected_rows(paths):
+    rows = []
+    for path in sorted(paths):
+        for row in match_rows(str(path)):
+            rows.append(["" if value is None else str(value) for value in row])
+    return rows
+
+
+def test_incremental_build_matches_full_build(input_dir, tmp_path):
+    output = tmp_path / "features.csv"
+    first, *rest = sorted(input_dir.glob("*.json"))
+    for path in rest:
+        path.rename(path.with_suffix(".later"))
+    
+    assert build_features(str(input_dir), str(output), workers=1)["processed"] == 1
+    for path in rest:
+        path.with_suffix(".later").rename(path)
+    stats = build_features(str(input_dir), str(output), workers=2)
+    
+    assert (stats["processed"], stats["skipped"]) == (len(rest), 1)
+    assert read_rows(output) == expected_rows(input_dir.glob("*.json"))
+    assert build_features(str(input_dir), str(output))["processed"] == 0
+
+
+def test_interrupted_run_does_not_duplicate_rows(input_dir, tmp_path):
+    output = tmp_path / "features.csv"
+    build_features(str(input_dir), str(output), workers=1)
+    manifest = Path(str(output) + MANIFEST_SUFFIX)
+    
+    # Crash after the last file's rows were written but before its manifest line
+    lines = manifest.read_text().splitlines(keepends=True)
+    manifest.write_text("".join(lines[:-1]) + lines[-1][:10])
+    
+    stats = build_features(str(input_dir), str(output), workers=1)
+    assert stats["processed"] == 1
+    assert read_rows(output) == expected_rows(input_dir.glob("*.json"))
+
+
+def test_changed_file_replaces_its_rows(input_dir, tmp_path):
+    output = tmp_path / "features.csv"
+    build_features(str(input_dir), str(output), workers=1)
+    
+    changed = sorted(input_dir.glob("*.json"))[0]
+    match = json.loads(changed.read_text())
+    match["info"]["venue"] = "Renamed Ground"
+    changed.write_text(json.dumps(match))
+    
+    stats = build_features(str(input_dir), str(output), workers=1)
+    assert stats["processed"] == 1
+    rows = read_rows(output)
+    assert sorted(rows) == sorted(expected_rows(input_dir.glob("*.json")))
+    assert sum(row[2] == "Renamed Ground" for row in rows) == len(match_rows(str(changed)))
+
+
+def test_retired_not_out_batters_do_not_cost_a_wicket(tmp_path):
+    match = json.loads((FIXTURES / "1000001.json").read_text())
+    deliveries = [delivery for over in match["innings"][1]["overs"] for delivery in over["deliveries"]]
+    deliveries[0]["wickets"] = [{"player_out": "A", "kind": "retired hurt"}]
+    deliveries[1]["wickets"] = [{"player_out": "C", "kind": "retired not out"}]
+    deliveries[2]["wickets"] = [{"player_out": "D", "kind": "bowled"}]
+    deliveries[3]["wickets"] = [{"player_out": "E", "kind": "retired out"}]
+    path = tmp_path / "retired.json"
+    path.write_text(json.dumps(match))
+    
+    wickets_in_hand = [row[FEATURE_COLUMNS.index("wickets_in_hand")] for row in match_rows(str(path))[:4]]
+    
+    assert wickets_in_hand == [10, 10, 9, 8]
@@ -0,0 +1,34 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.ml.feature_encoder import FeatureEncoder
+from tests.conftest import synthetic_rows
+
+
+def test_encoder_matches_preprocessor(model_path):
+    preprocessor = joblib.load(model_path).named_steps["preprocessor"]
+    encoder = FeatureEncoder.from_preprocessor(preprocessor)
+    rows = synthetic_rows(300, seed=3).drop(columns="win").to_dict("records")
+    # Unknown categories and missing values
+    rows += [
+        dict(rows[0], batting_team="Unknown XI", venue="Nowhere"),
+        dict(rows[1], runs_required=float("nan"), balls_remaining=None, toss_decision=None),
+    ]
+    
+    expected = preprocessor.transform(pd.DataFrame(rows))
+    expected = expected.toarray() if hasattr(expected, "toarray") else np.asarray(expected)
+    
+    assert np.allclose(encoder.transform_batch(rows), expected, rtol=1e-9, atol=1e-12)
+    assert np.allclose(encoder.transform_row(rows[-1]), expected[-1], rtol=1e-9, atol=1e-12)
+
+
+def test_vocabularies_follow_column_order(model_path):
+    preprocessor = joblib.load(model_path).named_steps["preprocessor"]
+    onehot = preprocessor.named_transformers_["cat"].named_steps["onehot"]
+    vocabularies = FeatureEncoder.from_preprocessor(preprocessor).vocabularies()
+    
+    assert list(vocabularies) == ["batting_team", "bowling_team", "venue", "toss_winner", "toss_decision"]
+    for values, categories in zip(vocabularies.values(), onehot.categories_):
+        assert values == categories.tolist()
+        assert all(type(value) is str for value in values)
@@ -0,0 +1,64 @@
+import joblib
+import numpy as np
+
+from app.config import settings
+from app.ml.forest_engine import CompiledForest
+from app.ml.predictor import CricketPredictor
+from tests.conftest import synthetic_rows
+
+
+def encoded_rows(pipeline, n=500):
+    rows = synthetic_rows(n, seed=7).drop(columns="win")
+    X = pipeline.named_steps["preprocessor"].transform(rows)
+    return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+
+def test_compiled_forest_matches_sklearn(model_path):
+    pipeline = joblib.load(model_path)
+    classifier = pipeline.named_steps["classifier"]
+    X = encoded_rows(pipeline)
+    forest = CompiledForest.from_sklearn(classifier)
+    
+    assert np.allclose(forest.predict_proba(X), classifier.predict_proba(X), rtol=0, atol=1e-12)
+    assert forest.classes.tolist() == classifier.classes_.tolist()
+    # Leaves are numbered across the flattened forest, offset by each tree's root
+    assert np.array_equal(forest.apply(X) - forest.roots, classifier.apply(X))
+
+
+def test_compiled_forest_roundtrip(model_path, tmp_path):
+    pipeline = joblib.load(model_path)
+    X = encoded_rows(pipeline, 50)
+    forest = CompiledForest.from_sklearn(pipeline.named_steps["classifier"])
+    path = str(tmp_path / "forest.joblib")
+    
+    forest.save(path, metadata={"model_version": "v1"})
+    loaded, metadata = CompiledForest.load(path)
+    
+    assert metadata["model_version"] == "v1"
+    assert np.array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+
+
+def test_contributions_sum_to_probability(model_path):
+    pipeline = joblib.load(model_path)
+    classifier = pipeline.named_steps["classifier"]
+    X = encoded_rows(pipeline)
+    forest = CompiledForest.from_sklearn(classifier)
+    
+    base, contributions = forest.contributions(X, class_index=1)
+    
+    assert contributions.shape == X.shape
+    assert np.allclose(base + contributions.sum(axis=1), classifier.predict_proba(X)[:, 1], rtol=0, atol=1e-9)
+
+
+def test_tree_path_explanation_is_additive(model_path, monkeypatch):
+    # With shap installed the default explainer would be SHAP
+    monkeypatch.setattr(settings, "explainer", "tree-path")
+    predictor = CricketPredictor(model_path)
+    rows = synthetic_rows(50, seed=13).drop(columns="win").to_dict("records")
+    base, _ = predictor.forest.contributions(predictor._prepare_batch(rows[:1]))
+    
+    assert predictor.explainer_kind == "tree-path"
+    for row in rows:
+        _, probability, explanation = predictor.predict(row, "full")
+        assert len(explanation) == len(predictor.display_names)
+        assert abs(base + sum(entry["value"] for entry in explanation) - probability) <= 1e-9
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.routers import prediction
+from app.services.prediction_service import PredictionService
+
+MATCH = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 80,
+         "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250}
+
+
+@pytest.fixture
+def starting_app(model_path, monkeypatch):
+    monkeypatch.setattr(settings, "model_path", model_path)
+    monkeypatch.setattr(settings, "inference_executor", "inline")
+    monkeypatch.setattr(settings, "warmup_rounds", 1)
+    monkeypatch.setattr(prediction, "startup_error", None)
+    return monkeypatch
+
+
+def wait_for_health(client, done):
+    deadline = time.monotonic() + 30
+    response = client.get("/api/health")
+    while not done(response):
+        assert time.monotonic() < deadline, "startup did not finish"
+        time.sleep(0.01)
+        response = client.get("/api/health")
+    return response
+
+
+def test_health_is_not_ready_until_warm_up_finishes(starting_app):
+    gate = threading.Event()
+    
+    async def warm_up(self, rounds=3):
+        await asyncio.to_thread(gate.wait, 30)
+        self.warmup_seconds = 0.0
+        return 0.0
+    starting_app.setattr(PredictionService, "warm_up", warm_up)
+    
+    with TestClient(app) as client:
+        # The model is loaded but warm-up is still running
+        response = wait_for_health(client, lambda response: response.json()["model_loaded"])
+        assert response.status_code == 503 and response.json()["ready"] is False
+        assert client.post("/api/predict", json=MATCH).status_code == 503
+        
+        gate.set()
+        response = wait_for_health(client, lambda response: response.status_code == 200)
+        assert response.json()["ready"] is True and "error" not in response.json()
+
+
+def test_failed_warm_up_reports_startup_error(starting_app):
+    async def warm_up(self, rounds=3):
+        raise RuntimeError("warm-up failed")
+    starting_app.setattr(PredictionService, "warm_up", warm_up)
+    
+    with TestClient(app) as client:
+        response = wait_for_health(client, lambda response: "error" in response.json())
+    
+    assert response.status_code == 503
+    assert response.json()["ready"] is False and response.json()["error"] == "warm-up failed"
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import sklearn
+
+from app.ml.forest_engine import CompiledForest
+from app.ml.incremental import check_sklearn_version
+from app.ml.model_trainer import CricketModelTrainer
+from tests.conftest import synthetic_rows
+
+
+@pytest.fixture
+def trainer(model_dir):
+    trainer = CricketModelTrainer(n_jobs=1)
+    trainer.load_model(str(model_dir))
+    return trainer
+
+
+@pytest.mark.parametrize("outcome", [0, 1])
+def test_update_from_single_outcome_match(trainer, tmp_path, outcome):
+    """One match's rows all carry the same label"""
+    rows = synthetic_rows(120, seed=outcome + 1)
+    rows["win"] = outcome
+    rows["venue"] = "New Ground, Somewhere"
+    data_path = tmp_path / "match.csv"
+    rows.to_csv(data_path, index=False)
+    classifier = trainer.model.named_steps["classifier"]
+    
+    summary = trainer.update(str(data_path), n_new_trees=5, max_trees=22)
+    
+    assert (summary["trees_before"], summary["trees_dropped"], summary["trees"]) == (20, 3, 22)
+    assert classifier.classes_.tolist() == [0, 1]
+    X = rows[trainer.categorical_features + trainer.numerical_features]
+    probabilities = trainer.model.predict_proba(X)
+    assert probabilities.shape == (len(rows), 2)
+    assert np.allclose(probabilities.sum(axis=1), 1.0)
+    # The new trees only saw this outcome
+    new_trees = classifier.estimators_[-5:]
+    X_encoded = trainer.preprocessor.transform(X)
+    for tree in new_trees:
+        assert np.all(tree.predict_proba(X_encoded)[:, outcome] == 1.0)
+    # The compiled engine reads the widened trees like any others
+    X_dense = X_encoded.toarray() if hasattr(X_encoded, "toarray") else np.asarray(X_encoded)
+    assert np.allclose(CompiledForest.from_sklearn(classifier).predict_proba(X_dense), probabilities)
+
+
+def test_update_rejects_unknown_class(trainer, tmp_path):
+    rows = synthetic_rows(50)
+    rows["win"] = 2
+    data_path = tmp_path / "match.csv"
+    rows.to_csv(data_path, index=False)
+    
+    with pytest.raises(ValueError, match="not trained on"):
+        trainer.update(str(data_path), n_new_trees=2)
+
+
+@pytest.mark.parametrize("version, supported", [
+    ("1.5.2", True),
+    ("1.9.1", True),
+    ("1.10.0rc1", True),
+    ("0.24.2", False),
+    ("2.0.0", False),
+])
+def test_sklearn_version_check(version, supported):
+    if supported:
+        check_sklearn_version(version)
+    else:
+        with pytest.raises(RuntimeError, match="private scikit-learn internals"):
+            check_sklearn_version(version)
+
+
+def test_update_refuses_unsupported_sklearn(trainer, tmp_path, monkeypatch):
+    monkeypatch.setattr(sklearn, "__version__", "2.0.0")
+    data_path = tmp_path / "match.csv"
+    synthetic_rows(50).to_csv(data_path, index=False)
+    classifier = trainer.model.named_steps["classifier"]
+    
+    with pytest.raises(RuntimeError, match="found 2.0.0"):
+        trainer.update(str(data_path), n_new_trees=5)
+    assert len(classifier.estimators_) == 20
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.routers import prediction
+from app.services.inference_executor import ExecutorSaturatedError, InferenceExecutor, InferenceTimeoutError
+
+MATCH = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 80,
+         "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250}
+
+
+class BlockingPredictor:
+    """Calls block until ``release`` is set; ``fail`` raises"""
+    
+    def __init__(self):
+        self.release = threading.Event()
+    
+    def wait(self):
+        self.release.wait(5)
+        return "done"
+    
+    def fail(self):
+        raise ValueError("bad row")
+
+
+class RaisingExecutor:
+    def __init__(self, error):
+        self.error = error
+    
+    async def run(self, method, *args):
+        raise self.error
+    
+    def stats(self):
+        return {"pending": 0}
+    
+    def shutdown(self):
+        pass
+
+
+def wait_until_idle(executor, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while executor.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return executor.stats()
+
+
+def test_full_queue_is_rejected():
+    predictor = BlockingPredictor()
+    executor = InferenceExecutor(predictor, kind="thread", workers=1, max_queue=1)
+    
+    async def scenario():
+        running = asyncio.ensure_future(executor.run("wait"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run("wait")
+        predictor.release.set()
+        return await running
+    
+    assert asyncio.run(scenario()) == "done"
+    stats = wait_until_idle(executor)
+    assert stats["rejected"] == 1 and stats["completed"] == 1 and stats["pending"] == 0
+    executor.shutdown()
+
+
+def test_slow_call_times_out_and_keeps_its_slot_until_done():
+    predictor = BlockingPredictor()
+    executor = InferenceExecutor(predictor, kind="thread", workers=1, max_queue=4, timeout=0.05)
+    
+    with pytest.raises(InferenceTimeoutError):
+        asyncio.run(executor.run("wait"))
+    # The worker is still busy after the caller gave up
+    assert executor.stats()["pending"] == 1 and executor.stats()["timeouts"] == 1
+    predictor.release.set()
+    assert wait_until_idle(executor)["pending"] == 0
+    executor.shutdown()
+
+
+def test_failed_and_cancelled_calls_release_their_slot():
+    predictor = BlockingPredictor()
+    executor = InferenceExecutor(predictor, kind="thread", workers=1, max_queue=4)
+    
+    with pytest.raises(ValueError, match="bad row"):
+        asyncio.run(executor.run("fail"))
+    assert executor.stats()["pending"] == 0
+    
+    async def scenario():
+        running = asyncio.ensure_future(executor.run("wait"))
+        queued = asyncio.ensure_future(executor.run("wait"))
+        await asyncio.sleep(0.01)
+        assert executor.stats()["pending"] == 2
+        # Cancels the queued call before it starts
+        executor._pool.shutdown(wait=False, cancel_futures=True)
+        predictor.release.set()
+        return await asyncio.gather(running, queued, return_exceptions=True)
+    
+    running, queued = asyncio.run(scenario())
+    assert running == "done" and isinstance(queued, asyncio.CancelledError)
+    assert wait_until_idle(executor)["pending"] == 0
+
+
+@pytest.mark.parametrize("error, status", [
+    (ExecutorSaturatedError("full"), 503),
+    (InferenceTimeoutError("slow"), 504),
+])
+def test_predict_maps_executor_errors(client, monkeypatch, error, status):
+    service = prediction.prediction_service
+    monkeypatch.setattr(service, "executor", RaisingExecutor(error))
+    monkeypatch.setattr(service, "batcher", None)
+    monkeypatch.setattr(service, "cache", None)
+    
+    response = client.post("/api/predict", json=MATCH)
+    
+    assert response.status_code == status
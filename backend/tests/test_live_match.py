@@ -0,0 +1,93 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.models.match import BallEvent, MatchInput
+from app.routers import prediction
+from app.services.live_match import LiveMatchState, LiveSessionLimiter
+
+BASE_INPUT = {"team1": "India", "team2": "Australia", "batting_team": "India", "bowling_team": "Australia",
+              "venue": "Lord's", "toss_winner": "India", "toss_decision": "field"}
+MATCH = {"team1": "India", "team2": "Australia", "venue": "Lord's", "match_type": "T20", "target_match": 150}
+
+
+def chase(**fields):
+    return LiveMatchState.from_match(MatchInput(**dict(MATCH, **fields)), BASE_INPUT)
+
+
+def receive_until(websocket, kind):
+    messages = [websocket.receive_json()]
+    while messages[-1]["type"] != kind:
+        messages.append(websocket.receive_json())
+    return messages
+
+
+def test_state_is_updated_ball_by_ball():
+    state = chase(runs_required=20, balls_remaining=12, wickets_in_hand=5)
+    
+    state.apply(BallEvent(runs=4))
+    assert (state.runs_required, state.balls_remaining, state.wickets_in_hand) == (16, 11, 5)
+    # Wides are bowled again; their runs still count
+    state.apply(BallEvent(extras=1, extra_type="wide"))
+    assert (state.runs_required, state.balls_remaining) == (15, 11)
+    state.apply(BallEvent(extras=2, extra_type="leg_bye", wicket=True))
+    assert (state.runs_required, state.balls_remaining, state.wickets_in_hand) == (13, 10, 4)
+    
+    assert state.deliveries == 3 and state.result is None
+    assert state.current_run_rate == pytest.approx(137 * 6 / 110)
+    assert state.model_input()["required_run_rate"] == pytest.approx(13 * 6 / 10)
+
+
+@pytest.mark.parametrize("fields, balls, result", [
+    (dict(runs_required=4, balls_remaining=2), [BallEvent(runs=6)], "won"),
+    (dict(runs_required=2, balls_remaining=1), [BallEvent(runs=1)], "tied"),
+    (dict(runs_required=3, balls_remaining=1), [BallEvent(runs=1)], "lost"),
+    (dict(runs_required=2, balls_remaining=6, wickets_in_hand=1), [BallEvent(runs=1, wicket=True)], "tied"),
+    (dict(runs_required=9, balls_remaining=6, wickets_in_hand=1), [BallEvent(wicket=True)], "lost"),
+])
+def test_result_when_runs_balls_or_wickets_run_out(fields, balls, result):
+    state = chase(**fields)
+    for ball in balls:
+        state.apply(ball)
+    
+    assert state.result == result
+    with pytest.raises(ValueError, match="already decided"):
+        state.apply(BallEvent())
+
+
+def test_session_limit():
+    limiter = LiveSessionLimiter(max_sessions=1)
+    
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    limiter.release()
+    assert limiter.acquire()
+    assert limiter.stats() == {"active": 1, "max_sessions": 1, "opened": 2, "rejected": 1}
+
+
+def test_live_session_streams_updates_until_decided(client):
+    with client.websocket_connect("/api/live") as websocket:
+        websocket.send_json(dict(MATCH, runs_required=6, balls_remaining=2, wickets_in_hand=3))
+        start = websocket.receive_json()
+        websocket.send_json({"runs": 2})
+        websocket.send_json({"runs": 9})
+        # An update is pushed only when the rounded probability changed
+        messages = receive_until(websocket, "error")
+        websocket.send_json({"runs": 4})
+        messages += receive_until(websocket, "result")
+    
+    assert start["type"] == "state" and start["runs_required"] == 6 and 0.0 <= start["probability"] <= 1.0
+    assert all(message["runs_required"] == 4 for message in messages if message["type"] == "update")
+    assert "runs" in next(message["detail"] for message in messages if message["type"] == "error")
+    assert messages[-1]["result"] == "won" and messages[-1]["probability"] == 1.0
+    assert prediction.live_sessions.active == 0
+
+
+def test_live_session_rejected_at_limit(client, monkeypatch):
+    monkeypatch.setattr(prediction, "live_sessions", LiveSessionLimiter(max_sessions=0))
+    
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/api/live") as websocket:
+            websocket.receive_json()
+    
+    assert closed.value.code == 1013
+    assert prediction.live_sessions.rejected == 1
@@ -0,0 +1,50 @@
+import pytest
+
+from app.ml.lookup_tables import derive_rates, evaluate_tables
+from app.ml.predictor import CricketPredictor
+
+
+def chase_request(match_input, runs_required, balls_remaining, wickets_in_hand, target_match, **fields):
+    current_run_rate, required_run_rate = derive_rates(runs_required, balls_remaining, target_match, 300)
+    return dict(match_input, runs_required=runs_required, balls_remaining=balls_remaining,
+                wickets_in_hand=wickets_in_hand, target_match=target_match, current_run_rate=float(current_run_rate),
+                required_run_rate=float(required_run_rate), **fields)
+
+
+def model_probability(predictor, request):
+    # Explanations always go through the model
+    return predictor.predict(request, "top-k")[1]
+
+
+def test_lookup_stays_within_evaluated_error(model_path, lookup_dir, match_input):
+    predictor = CricketPredictor(model_path)
+    report = evaluate_tables(predictor, predictor.lookup_tables, samples=500, seed=3)
+    (error,) = report.values()
+    worst = error["worst_state"]
+    
+    # On a grid node the table holds the model's own (float32) probability
+    node = chase_request(match_input, 80, 60, 6, 250)
+    assert predictor.predict(node, "none")[1] == pytest.approx(model_probability(predictor, node), abs=1e-6)
+    # The worst sampled state is served from the table with the reported error
+    request = dict(match_input, **dict(worst, wickets_in_hand=int(worst["wickets_in_hand"])))
+    probability = predictor.predict(request, "none")[1]
+    assert abs(probability - model_probability(predictor, request)) <= error["max_error"] + 1e-6
+    assert error["mean_error"] <= error["max_error"] < 0.5
+    assert predictor.lookup_tables.stats()["hits"] == 2 and predictor.lookup_tables.stats()["misses"] == 0
+
+
+@pytest.mark.parametrize("fields", [
+    dict(target_match=350, runs_required=80),  # target beyond the table axis
+    dict(balls_remaining=3),  # below the first balls node
+    dict(wickets_in_hand=0),  # wickets not on the axis
+    dict(venue="Eden Gardens, Kolkata"),  # known venue without a table
+    dict(bowling_team="Nepal"),  # unknown team
+])
+def test_out_of_range_or_unknown_input_falls_back_to_model(model_path, lookup_dir, match_input, fields):
+    predictor = CricketPredictor(model_path)
+    chase = {name: fields.pop(name, default) for name, default in
+             (("runs_required", 80), ("balls_remaining", 60), ("wickets_in_hand", 6), ("target_match", 250))}
+    request = chase_request(match_input, **chase, **fields)
+    
+    assert predictor.predict(request, "none")[1] == model_probability(predictor, request)
+    assert predictor.lookup_tables.stats()["hits"] == 0 and predictor.lookup_tables.stats()["misses"] == 1
@@ -0,0 +1,25 @@
+import builtins
+import sys
+
+from app.services.memory_stats import process_memory
+
+
+def test_process_memory_without_proc_or_resource(monkeypatch):
+    """Neither /proc nor the Unix-only resource module, as on Windows"""
+    real_open, real_import = builtins.open, builtins.__import__
+    
+    def no_proc(path, *args, **kwargs):
+        if str(path).startswith("/proc/"):
+            raise OSError("no /proc")
+        return real_open(path, *args, **kwargs)
+    
+    def no_resource(name, *args, **kwargs):
+        if name == "resource":
+            raise ImportError("No module named 'resource'")
+        return real_import(name, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, "open", no_proc)
+    monkeypatch.setattr(builtins, "__import__", no_resource)
+    monkeypatch.delitem(sys.modules, "resource", raising=False)
+    
+    assert set(process_memory()) == {"pid"}
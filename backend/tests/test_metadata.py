@@ -0,0 +1,26 @@
+from app.config import settings
+
+
+def test_metadata_lists_model_vocabulary(client):
+    response = client.get("/api/metadata")
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_version"] == client.get("/api/health").json()["model_version"]
+    assert "India" in body["teams"] and "Lord's" in body["venues"]
+    assert body["toss_decisions"] == ["bat", "field"]
+    assert body["aliases"]["venues"]["Lords"] == "Lord's"
+    assert response.headers["cache-control"] == f"public, max-age={settings.metadata_max_age}"
+    assert response.headers["etag"].startswith(f'"{body["model_version"]}-')
+
+
+def test_metadata_not_modified(client):
+    etag = client.get("/api/metadata").headers["etag"]
+    
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        response = client.get("/api/metadata", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    
+    assert client.get("/api/metadata", headers={"If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,29 @@
+MATCH = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 80,
+         "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250}
+PROFILE_REQUESTS = 'winwise_http_requests_total{method="GET",route="/api/profiles/{profile_id}",status="403"}'
+PROFILE_LATENCY = 'winwise_http_request_duration_seconds_count{method="GET",route="/api/profiles/{profile_id}"}'
+
+
+def sample(body, series):
+    """Value of one exposed series, 0 when it is absent"""
+    for line in body.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_label_requests_by_route_template(client):
+    before = client.get("/metrics").text
+    client.post("/api/predict", json=MATCH)
+    # Ids that repeat another path segment must not be templated twice
+    for profile_id in ("3f2a9c", "profiles"):
+        client.get(f"/api/profiles/{profile_id}")
+    client.get("/api/no-such-route")
+    
+    body = client.get("/metrics").text
+    
+    assert 'winwise_http_requests_total{method="POST",route="/api/predict",status="200"}' in body
+    assert sample(body, PROFILE_REQUESTS) - sample(before, PROFILE_REQUESTS) == 2
+    assert sample(body, PROFILE_LATENCY) - sample(before, PROFILE_LATENCY) == 2
+    assert 'route="unmatched"' in body
+    assert "3f2a9c" not in body and "/api/{profile_id}" not in body
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.services.micro_batcher import MicroBatcher
+
+
+class FakeExecutor:
+    """Scores rows by echoing them; rows marked "bad" fail in the batch and alone"""
+    
+    def __init__(self, batch_error=None):
+        self.batch_error = batch_error
+        self.calls = []
+    
+    async def run(self, method, *args):
+        self.calls.append((method, args))
+        if method == "predict_batch":
+            if self.batch_error is not None:
+                raise self.batch_error
+            return [ValueError("bad row") if row.get("bad") else (row["id"], 0.5, []) for row in args[0]]
+        row = args[0]
+        if row.get("bad"):
+            raise ValueError("bad row")
+        return row["id"], 0.5, []
+
+
+def run_concurrently(batcher, rows):
+    async def scenario():
+        return await asyncio.gather(*[batcher.submit(row) for row in rows], return_exceptions=True)
+    return asyncio.run(scenario())
+
+
+def test_rows_share_one_batch_call():
+    executor = FakeExecutor()
+    results = run_concurrently(MicroBatcher(executor, window=0.01), [{"id": i} for i in range(5)])
+    
+    assert [result[0] for result in results] == list(range(5))
+    assert [method for method, _ in executor.calls] == ["predict_batch"]
+
+
+def test_failed_row_is_retried_alone_and_others_succeed():
+    executor = FakeExecutor()
+    rows = [{"id": 0}, {"id": 1, "bad": True}, {"id": 2}]
+    results = run_concurrently(MicroBatcher(executor, window=0.01), rows)
+    
+    assert results[0][0] == 0 and results[2][0] == 2
+    assert isinstance(results[1], ValueError)
+    assert [method for method, _ in executor.calls] == ["predict_batch", "predict"]
+
+
+def test_batch_failure_reaches_every_waiter():
+    error = RuntimeError("pool saturated")
+    results = run_concurrently(MicroBatcher(FakeExecutor(batch_error=error), window=0.01),
+                               [{"id": i} for i in range(3)])
+    
+    assert results == [error, error, error]
+
+
+def test_full_batch_flushes_without_waiting():
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, window=60, max_batch_size=2)
+    
+    results = run_concurrently(batcher, [{"id": 0}, {"id": 1}])
+    
+    assert [result[0] for result in results] == [0, 1]
+    assert batcher.stats()["max_observed_batch"] == 2
+
+
+@pytest.mark.parametrize("explain", ["none", "full"])
+def test_options_are_batched_separately(explain):
+    executor = FakeExecutor()
+    batcher = MicroBatcher(executor, window=0.01)
+    
+    async def scenario():
+        return await asyncio.gather(batcher.submit({"id": 0}, "top-k"), batcher.submit({"id": 1}, explain))
+    asyncio.run(scenario())
+    
+    assert sorted(args[1] for _, args in executor.calls) == sorted(["top-k", explain])
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.ml.model_registry import ModelRegistry
+from app.services.model_manager import ModelManager
+from app.services.prediction_service import PredictionService
+
+
+@pytest.fixture
+def registry(model_dir, tmp_path):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    registry.register(str(model_dir), version="v1")
+    registry.register(str(model_dir), version="v2")
+    return registry
+
+
+def test_register_keeps_first_version_active(registry, model_dir):
+    assert registry.versions() == ["v1", "v2"]
+    assert registry.active_version() == "v1"
+    with pytest.raises(ValueError):
+        registry.register(str(model_dir), version="v1")
+    with pytest.raises(KeyError):
+        registry.set_active("v3")
+
+
+def test_activate_and_rollback(registry, monkeypatch):
+    monkeypatch.setattr(settings, "inference_executor", "inline")
+    monkeypatch.setattr(settings, "warmup_rounds", 0)
+    installed = []
+    
+    async def scenario():
+        first = PredictionService(registry.model_path("v1"), model_version="v1")
+        manager = ModelManager(registry, installed.append, first, "v1")
+        
+        assert await manager.activate("v2")
+        assert not await manager.activate("v2")
+        second = manager.current
+        assert (manager.current_version, manager.previous_version) == ("v2", "v1")
+        
+        # Rollback swaps the still-loaded previous service back in
+        assert await manager.rollback() == "v1"
+        assert manager.current is first and manager.previous is second
+        assert (manager.current_version, manager.previous_version) == ("v1", "v2")
+        return first, second, manager
+    
+    first, second, manager = asyncio.run(scenario())
+    assert installed == [second, first]
+    assert first.model_version == "v1" and second.model_version == "v2"
+    assert manager.stats()["swaps"] == 2
+
+
+def test_rollback_without_previous_version(registry):
+    manager = ModelManager(registry, lambda service: None, None, "v1")
+    with pytest.raises(ValueError):
+        asyncio.run(manager.rollback())
+
+
+def test_failed_version_is_recorded(registry, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "inference_executor", "inline")
+    (tmp_path / "registry" / "v2" / "cricket_model.pkl").write_bytes(b"not a model")
+    manager = ModelManager(registry, lambda service: None, None, "v1")
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.activate("v2"))
+    assert (manager.current_version, manager.failed_version) == ("v1", "v2")
@@ -0,0 +1,39 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from threadpoolctl import threadpool_info
+
+from app.ml import model_tuning
+from app.ml.model_tuning import successive_halving
+
+
+def test_search_on_sparse_input():
+    rng = np.random.default_rng(0)
+    X = sp.random(600, 30, density=0.1, format="csr", random_state=0, dtype=np.float32)
+    y = (X[:, :5].sum(axis=1).A1 + rng.normal(0, 0.1, 600) > 0.25).astype(int)
+    candidates = {
+        "rf": RandomForestClassifier(n_estimators=10, random_state=0),
+        "hgb": HistGradientBoostingClassifier(max_iter=10, random_state=0),
+    }
+    
+    report = successive_halving(X[:500], y[:500], X[500:], y[500:], candidates=candidates,
+                                cv=2, n_jobs=1, log=lambda message: None)
+    
+    assert {result["name"] for result in report["finalists"]} == {"rf", "hgb"}
+    assert all(result["single_row_ms"] > 0 for result in report["finalists"])
+
+
+def test_latency_measured_on_one_thread(monkeypatch):
+    seen = []
+    
+    class Probe:
+        def predict_proba(self, X):
+            seen.append(max((pool["num_threads"] for pool in threadpool_info()), default=1))
+            assert not sp.issparse(X)
+            return np.zeros((X.shape[0], 2))
+    
+    monkeypatch.setattr(model_tuning, "SINGLE_ROW_REPEATS", 2)
+    monkeypatch.setattr(model_tuning, "BATCH_REPEATS", 2)
+    model_tuning._measure_latency(Probe(), sp.random(20, 4, density=0.5, format="csr"))
+    
+    assert seen and set(seen) == {1}
@@ -0,0 +1,77 @@
+import pytest
+
+from app.ml.lookup_tables import derive_rates
+from app.ml.name_resolver import NameResolver
+from app.ml.predictor import CricketPredictor
+
+VOCABULARIES = {
+    "batting_team": ["Australia", "India"],
+    "bowling_team": ["Australia", "India"],
+    "toss_winner": ["Australia", "India"],
+    "venue": ["Lord's", "Wankhede Stadium, Mumbai"],
+}
+ALIASES = {
+    "teams": {"IND": "India", "Kings XI Punjab": "Punjab Kings"},
+    "venues": {"Lords": "Lord's", "Wankhede": "Wankhede Stadium"},
+}
+
+
+@pytest.fixture
+def resolver():
+    return NameResolver(VOCABULARIES, ALIASES)
+
+
+@pytest.mark.parametrize("feature, value, expected", [
+    ("batting_team", "India", "India"),
+    ("batting_team", "india", "India"),
+    ("toss_winner", "IND", "India"),
+    ("venue", "lords", "Lord's"),
+    ("venue", "LORD'S", "Lord's"),
+    ("venue", "Lord's, London", "Lord's"),
+    ("venue", "Wankhede Stadium", "Wankhede Stadium, Mumbai"),
+    ("venue", "Wankhede", "Wankhede Stadium, Mumbai"),
+    ("venue", "Unknown Park", "Unknown Park"),
+    ("toss_decision", "BAT", "BAT"),
+])
+def test_resolve(resolver, feature, value, expected):
+    assert resolver.resolve(feature, value) == expected
+
+
+def test_aliases_for_unknown_targets_are_dropped(resolver):
+    assert resolver.aliases == {
+        "teams": {"IND": "India"},
+        "venues": {"Lords": "Lord's", "Wankhede": "Wankhede Stadium, Mumbai"},
+    }
+
+
+def test_shared_ground_name_is_ambiguous():
+    resolver = NameResolver({"venue": ["Oval, London", "Oval, Adelaide"]})
+    assert resolver.resolve("venue", "Oval") == "Oval"
+
+
+def test_predictor_resolves_before_encoding(model_path, match_input):
+    predictor = CricketPredictor(model_path)
+    aliased = dict(match_input, batting_team="IND", bowling_team="australia", venue="LORDS")
+    assert predictor.predict(aliased, "none")[1] == predictor.predict(match_input, "none")[1]
+
+
+@pytest.mark.parametrize("venue", ["Lord's", "Lords", "lord's"])
+def test_lookup_tables_hit_after_resolution(model_path, lookup_dir, match_input, venue):
+    predictor = CricketPredictor(model_path)
+    current_run_rate, required_run_rate = derive_rates(80, 60, 250, 300)
+    request = dict(match_input, venue=venue, toss_winner="India", toss_decision="bat",
+                   current_run_rate=float(current_run_rate), required_run_rate=float(required_run_rate))
+    
+    _, probability, _ = predictor.predict(request, "none")
+    assert predictor.lookup_tables.stats()["hits"] == 1
+    assert probability == pytest.approx(predictor.predict(request, "top-k")[1], abs=0.05)
+
+
+def test_lookup_tables_miss_for_unknown_venue(model_path, lookup_dir, match_input):
+    predictor = CricketPredictor(model_path)
+    current_run_rate, required_run_rate = derive_rates(80, 60, 250, 300)
+    request = dict(match_input, venue="Eden Gardens", current_run_rate=float(current_run_rate),
+                   required_run_rate=float(required_run_rate))
+    
+    predictor.predict(request, "none")
+    assert predictor.lookup_tables.stats()["misses"] == 1
@@ -0,0 +1,100 @@
+import asyncio
+
+from app.config import settings
+from app.models.match import MatchInput
+from app.services.prediction_cache import PredictionCache
+from app.services.prediction_service import PredictionService
+
+
+def test_hits_and_coalescing():
+    cache = PredictionCache(max_size=10, ttl=60)
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+    
+    async def scenario():
+        first = await asyncio.gather(*[cache.get_or_compute("key", compute) for _ in range(3)])
+        return first + [await cache.get_or_compute("key", compute)]
+    
+    assert asyncio.run(scenario()) == ["value"] * 4
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 2, 1)
+
+
+def test_bind_model_invalidates_entries():
+    cache = PredictionCache()
+    
+    async def scenario():
+        cache.bind_model("v1")
+        await cache.get_or_compute("key", lambda: asyncio.sleep(0, "v1 result"))
+        cache.bind_model("v1")
+        same = await cache.get_or_compute("key", lambda: asyncio.sleep(0, "unused"))
+        cache.bind_model("v2")
+        fresh = await cache.get_or_compute("key", lambda: asyncio.sleep(0, "v2 result"))
+        return same, fresh
+    
+    assert asyncio.run(scenario()) == ("v1 result", "v2 result")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_result_of_replaced_model_is_not_stored():
+    cache = PredictionCache()
+    
+    async def scenario():
+        cache.bind_model("v1")
+        
+        async def compute():
+            cache.bind_model("v2")
+            return "v1 result"
+        
+        await cache.get_or_compute("key", compute)
+    
+    asyncio.run(scenario())
+    assert cache.stats()["size"] == 0
+
+
+def test_warm_up_bypasses_cache(model_path, monkeypatch):
+    monkeypatch.setattr(settings, "inference_executor", "thread")
+    monkeypatch.setattr(settings, "inference_workers", 2)
+    monkeypatch.setattr(settings, "micro_batching", True)
+    service = PredictionService(model_path)
+    try:
+        asyncio.run(service.warm_up(rounds=2))
+        cache = service.cache.stats()
+        assert (cache["size"], cache["hits"], cache["misses"], cache["coalesced"]) == (0, 0, 0, 0)
+        assert service.batcher.stats()["batches"] == 0
+        # rounds * (workers * synthetic matches) single calls + one batch call per round
+        assert service.executor.stats()["completed"] == 2 * (2 * 3 + 1)
+    finally:
+        service.shutdown()
+
+
+def test_only_loaded_model_results_are_cached(model_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "inference_executor", "inline")
+    monkeypatch.setattr(settings, "micro_batching", False)
+    match = MatchInput(team1="India", team2="Australia", venue="Lord's", runs_required=80,
+                       balls_remaining=60, wickets_in_hand=6, target_match=250)
+    
+    async def predict_twice(service):
+        return [await service.predict(match, "none") for _ in range(2)]
+    
+    fallback = PredictionService(str(tmp_path / "missing.pkl"))
+    served = PredictionService(model_path)
+    try:
+        assert not fallback.model_loaded
+        asyncio.run(predict_twice(fallback))
+        assert (fallback.cache.stats()["size"], fallback.cache.stats()["misses"]) == (0, 0)
+        
+        first, second = asyncio.run(predict_twice(served))
+        assert first == second
+        assert (served.cache.stats()["misses"], served.cache.stats()["hits"]) == (1, 1)
+        # Keys are per model version, on top of bind_model clearing the cache
+        assert served._cache_key(match, "none", 5, "v1") != served._cache_key(match, "none", 5, "v2")
+        assert served._cache_key(match, "none", 5, served.model_version)[0] == served.model_version
+    finally:
+        fallback.shutdown()
+        served.shutdown()
@@ -0,0 +1,46 @@
+import pytest
+
+from app.config import settings
+
+MATCH = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 80,
+         "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250}
+TOKEN = "secret-token"
+
+
+@pytest.fixture
+def admin(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", TOKEN)
+    monkeypatch.setattr(settings, "profile_sample_rate", 0.0)
+    return client
+
+
+def test_admin_token_turns_profiling_on(admin):
+    response = admin.post("/api/predict", json=MATCH, headers={"X-Profile": "1", "X-Admin-Token": TOKEN})
+    
+    profile_id = response.headers["x-profile-id"]
+    assert f'predictor-profile;desc="{profile_id}"' in response.headers["server-timing"]
+    report = admin.get(f"/api/profiles/{profile_id}", headers={"X-Admin-Token": TOKEN})
+    assert report.status_code == 200 and "predict" in report.text
+    assert admin.get("/api/profiles", headers={"X-Admin-Token": TOKEN}).json()["profiles"][0]["id"] == profile_id
+
+
+def test_sample_rate_turns_profiling_on(admin, monkeypatch):
+    monkeypatch.setattr(settings, "profile_sample_rate", 1.0)
+    
+    response = admin.post("/api/predict", json=MATCH)
+    
+    assert "x-profile-id" in response.headers
+
+
+@pytest.mark.parametrize("headers, url", [
+    ({"X-Profile": "1"}, "/api/predict"),
+    ({"X-Profile": "1", "X-Admin-Token": "wrong"}, "/api/predict"),
+    ({}, "/api/predict?profile=1"),
+    ({"X-Admin-Token": TOKEN}, "/api/predict"),
+])
+def test_unauthenticated_requests_are_not_profiled(admin, headers, url):
+    response = admin.post(url, json=MATCH, headers=headers)
+    
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert "predictor-profile" not in response.headers["server-timing"]
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from fastapi import routing
+from fastapi.responses import JSONResponse
+
+from app.routers import prediction
+from app.services import response_encoding
+from app.services.response_encoding import PlainJSONResponse
+
+
+def response_field(path):
+    route = next(route for route in prediction.router.routes if route.path == path)
+    return route.response_field
+
+
+def fastapi_body(path, content, dump_json):
+    """Bytes FastAPI would send for ``content`` through the route's response_model"""
+    serialized = asyncio.run(routing.serialize_response(field=response_field(path), response_content=content,
+                                                        dump_json=dump_json))
+    return serialized if dump_json else JSONResponse(serialized).body
+
+
+@pytest.fixture
+def predictions(client):
+    match = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 80,
+             "balls_remaining": 60, "wickets_in_hand": 6, "target_match": 250}
+    # JSON floats round-trip exactly, so the decoded bodies are the service's results
+    results = [client.post(f"/api/predict?explain={explain}", json=match).json() for explain in ("none", "full")]
+    # Small floats are where the two serializers differ
+    results.append(dict(results[1], probability=0.5, shap_explanation=[
+        {"feature": "Venue", "value": -7.2e-05, "impact": "negative"},
+        {"feature": "Toss", "value": 1e-17, "impact": "positive"},
+    ]))
+    return results
+
+
+def test_plain_response_matches_response_model(predictions):
+    assert predictions[0]["shap_explanation"] == [] and predictions[1]["shap_explanation"]
+    for content in predictions:
+        expected = fastapi_body("/predict", content, dump_json=response_encoding._PYDANTIC_JSON)
+        assert PlainJSONResponse(content).body == expected
+
+
+def test_stdlib_encoder_matches_jsonable_encoder_path(predictions, monkeypatch):
+    # FastAPI releases without dump_json run jsonable_encoder then JSONResponse.render
+    monkeypatch.setattr(response_encoding, "_PYDANTIC_JSON", False)
+    for content in predictions:
+        assert PlainJSONResponse(content).body == fastapi_body("/predict", content, dump_json=False)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.models.match import ScenarioRange, WicketsRange
+from app.services.scenario_grid import build_chase_grid
+
+CHASE = dict(runs_required=20, balls_remaining=6, wickets_in_hand=2, target=250, match_type="ODI")
+
+
+def test_unreachable_scenarios_are_not_scored():
+    grid = build_chase_grid(runs=[0, 6, 12, 24], balls=[0, 1, 3], wickets=[0, 1, 2], **CHASE)
+    reachable = grid.reachable.reshape(grid.shape)
+    
+    # No runs and no wickets off zero balls
+    assert reachable[0, 0].tolist() == [True, False, False, False]
+    assert not reachable[1:, 0].any()
+    # At most six runs and one wicket a ball
+    assert reachable[0, 1].tolist() == [True, True, False, False]
+    assert not reachable[2, 1].any()
+    assert reachable[2, 2].tolist() == [True, True, True, False]
+    assert not (grid.scored & ~grid.reachable).any()
+
+
+def test_terminal_states_are_decided_by_the_rules():
+    grid = build_chase_grid(runs=[0, 18], balls=[0, 3, 6], wickets=[0, 2], **CHASE)
+    terminal = grid.terminal.reshape(grid.shape)
+    result = grid.terminal_probability.reshape(grid.shape)
+    
+    # Out of balls, or all out, with runs still required: lost
+    assert terminal[0, 2, 0] and result[0, 2, 0] == 0.0
+    assert terminal[1, 1, 0] and result[1, 1, 0] == 0.0
+    # 18 of the 20 runs off all six balls is still short
+    assert terminal[0, 2, 1] and result[0, 2, 1] == 0.0
+    # Open states go to the model
+    assert not terminal[0, 1, 0] and grid.scored.reshape(grid.shape)[0, 1, 0]
+
+
+@pytest.mark.parametrize("chase", [
+    dict(CHASE, balls_remaining=-1),
+    dict(CHASE, wickets_in_hand=11),
+    dict(CHASE, wickets_in_hand=-1),
+])
+def test_invalid_chase_state_is_rejected(chase):
+    with pytest.raises(ValueError, match="Chase state is invalid"):
+        build_chase_grid(runs=[0], balls=[0], wickets=[0], **chase)
+
+
+def test_curve_endpoint_returns_null_for_unreachable_cells(client):
+    match = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 20,
+             "balls_remaining": 6, "wickets_in_hand": 2, "target_match": 250}
+    response = client.post("/api/predict/curve", json={
+        "match": match, "runs": {"start": 0, "stop": 24, "step": 12},
+        "balls": {"start": 0, "stop": 6, "step": 6}, "wickets": {"start": 0, "stop": 1},
+    })
+    
+    assert response.status_code == 200
+    probabilities = np.array(response.json()["probabilities"], dtype=object)
+    assert probabilities[0, 0].tolist()[1:] == [None, None]
+    assert probabilities[1, 0].tolist() == [None, None, None]
+    assert probabilities[0, 1, 0] == 0.0 and probabilities[0, 1, 2] == 1.0
+    assert 0.0 <= probabilities[0, 0, 0] <= 1.0
+
+
+@pytest.mark.parametrize("axis", [
+    {"start": 0, "stop": 501},
+    {"start": 6, "stop": 0},
+    {"start": 0, "stop": 6, "step": 0},
+])
+def test_out_of_bounds_scenario_range_is_rejected(axis):
+    with pytest.raises(ValidationError):
+        ScenarioRange(**axis)
+    with pytest.raises(ValidationError):
+        WicketsRange(start=0, stop=11)
+
+
+def test_oversized_grid_is_rejected_before_building_values(client, monkeypatch):
+    def values(self):
+        raise AssertionError("values() built for an oversized grid")
+    monkeypatch.setattr(ScenarioRange, "values", values)
+    match = {"team1": "India", "team2": "Australia", "venue": "Lord's", "runs_required": 400,
+             "balls_remaining": 300, "wickets_in_hand": 10, "target_match": 450}
+    response = client.post("/api/predict/curve", json={
+        "match": match, "runs": {"start": 0, "stop": 500},
+        "balls": {"start": 0, "stop": 300}, "wickets": {"start": 0, "stop": 10},
+    })
+    
+    assert response.status_code == 422
+    assert "limit" in response.json()["detail"]
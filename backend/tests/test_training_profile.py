@@ -0,0 +1,40 @@
+import builtins
+import sys
+
+from app.ml.training_profile import PhaseProfiler
+
+
+def test_phases_without_proc_or_resource(monkeypatch):
+    """Windows has neither /proc nor the resource module: no memory figures, no crash"""
+    real_open, real_import = builtins.open, builtins.__import__
+    
+    def no_proc(path, *args, **kwargs):
+        if str(path).startswith("/proc/"):
+            raise OSError("no /proc")
+        return real_open(path, *args, **kwargs)
+    
+    def no_resource(name, *args, **kwargs):
+        if name == "resource":
+            raise ImportError("No module named 'resource'")
+        return real_import(name, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, "open", no_proc)
+    monkeypatch.setattr(builtins, "__import__", no_resource)
+    monkeypatch.delitem(sys.modules, "resource", raising=False)
+    
+    profiler = PhaseProfiler()
+    with profiler.phase("fit"):
+        pass
+    
+    assert profiler.phases[0]["peak_rss_mib"] is None
+    assert profiler.phases[0]["rss_delta_mib"] is None
+    assert "fit" in profiler.report()
+
+
+def test_phases_record_peak_memory():
+    profiler = PhaseProfiler()
+    with profiler.phase("load"):
+        data = bytearray(8 << 20)
+    del data
+    
+    assert profiler.phases[0]["peak_rss_mib"] > 0
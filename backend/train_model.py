@@ -2,6 +2,8 @@
 Script to train the cricket prediction model
 Run this script after installing dependencies to train and save the model
 """
+import argparse
+import json
 import sys
 import os
 from pathlib import Path
@@ -10,17 +12,64 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app.ml.model_trainer import CricketModelTrainer
+from app.ml.model_registry import ModelRegistry
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the cricket prediction model")
+    parser.add_argument("--compact", action="store_true",
+                        help="Also export the pickle-free compact model (models/cricket_model.npz)")
+    parser.add_argument("--data", default=None,
+                        help="Feature file, CSV or Parquet (default: ../cricket_features.csv)")
+    parser.add_argument("--compact-schema", action="store_true",
+                        help="Load with categorical and int16/float32 columns to cut memory")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Rows per CSV chunk with --compact-schema (default: single pass)")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="Cores used to fit the forest (default: all)")
+    parser.add_argument("--tune", action="store_true",
+                        help="Compare forest and gradient boosting candidates instead of training")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Wall-clock budget for --tune in seconds (default: no limit)")
+    parser.add_argument("--update", metavar="NEW_DATA", default=None,
+                        help="Add trees fitted on NEW_DATA (CSV or Parquet) to the saved model instead of retraining")
+    parser.add_argument("--new-trees", type=int, default=20, help="Trees added by --update")
+    parser.add_argument("--max-trees", type=int, default=None,
+                        help="With --update, drop the oldest trees beyond this count")
+    default_registry = os.environ.get("MODEL_REGISTRY_DIR") or str(Path(__file__).parent / "models" / "registry")
+    parser.add_argument("--publish", metavar="REGISTRY", nargs="?", const=default_registry, default=None,
+                        help="Register the saved model as the new active version in the model registry "
+                             "(default: MODEL_REGISTRY_DIR or models/registry); serving workers pick it up")
+    parser.add_argument("--report", default=None, help="Write the --tune report to this JSON file")
+    return parser.parse_args()
+
+def publish(args, models_dir: Path):
+    """Copy the saved model into the registry as the new active version"""
+    if not args.publish:
+        return
+    version = ModelRegistry(args.publish).register(str(models_dir), activate=True)
+    print(f"✓ Published model version {version} to {args.publish}")
 
 def main():
+    args = parse_args()
     print("=" * 60)
     print("Cricket Match Prediction Model Training")
     print("=" * 60)
     
     # Initialize trainer
-    trainer = CricketModelTrainer()
+    trainer = CricketModelTrainer(compact_schema=args.compact_schema, n_jobs=args.n_jobs,
+                                  chunksize=args.chunksize)
+    
+    if args.update:
+        models_dir = Path(__file__).parent / "models"
+        trainer.load_model(str(models_dir))
+        trainer.update(args.update, n_new_trees=args.new_trees, max_trees=args.max_trees)
+        model_path = trainer.save_model(str(models_dir), compact=args.compact)
+        print(f"\n✓ Updated model saved to: {model_path}")
+        publish(args, models_dir)
+        return
     
     # Path to cricket data
-    data_path = Path(__file__).parent.parent / "cricket_features.csv"
+    data_path = Path(args.data) if args.data else Path(__file__).parent.parent / "cricket_features.csv"
     
     if not data_path.exists():
         print(f"\n❌ Error: Data file not found at {data_path}")
@@ -30,19 +79,28 @@ def main():
     
     print(f"\n✓ Found data file: {data_path}")
     
+    if args.tune:
+        report = trainer.tune(str(data_path), budget_seconds=args.budget)
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReport saved to: {args.report}")
+        return
+    
     try:
         # Train the model
         model, accuracy = trainer.train(str(data_path))
         
         # Save the model
         models_dir = Path(__file__).parent / "models"
-        model_path = trainer.save_model(str(models_dir))
+        model_path = trainer.save_model(str(models_dir), compact=args.compact)
         
         print("\n" + "=" * 60)
         print("✓ Training Complete!")
         print("=" * 60)
         print(f"Model Accuracy: {accuracy:.2%}")
         print(f"Model saved to: {model_path}")
+        publish(args, models_dir)
         print("\nYou can now start the FastAPI server and make predictions!")
         
     except Exception as e: